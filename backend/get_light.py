@@ -1,27 +1,586 @@
+import argparse
 import cloudscraper
+import gzip
+import hashlib
 import json
+import os
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
 
-def download_god_roll_data():
-    url = "https://www.light.gg/god-roll/roll-appraiser/data/"
+import light_binary
+import light_download
+import light_normalize
+import light_snapshots
+import light_sqlite
+import precompress
+from light_files import atomic_write_bytes, make_temp_path, remove_stale_variants
+from light_normalize import ITEM_TABLES
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+URL = "https://www.light.gg/god-roll/roll-appraiser/data/"
+LIGHT_DIR = Path(__file__).resolve().parent / 'light'
+JSON_PATH = LIGHT_DIR / 'rollAppraiserData.json'
+MANIFEST_PATH = LIGHT_DIR / 'rollAppraiserData.meta.json'
+SHARDS_DIR = LIGHT_DIR / 'shards'
+SHARD_MANIFEST_PATH = SHARDS_DIR / 'manifest.json'
+NORMALIZED_PATH = LIGHT_DIR / 'rollAppraiserData.normalized.json'
+BINARY_PATH = LIGHT_DIR / 'rollAppraiserData.bin'
+SNAPSHOTS_DIR = LIGHT_DIR / 'snapshots'
+# Dotfile so the static server doesn't expose it
+RUN_LOG_PATH = LIGHT_DIR / '.download-log.json'
+RUN_LOG_KEEP = 50
+# Kept outside backend/light: the server queries it, it is not a static download
+SQLITE_PATH = Path(__file__).resolve().parent / 'rollAppraiser.db'
+
+# Matches the quality scripts/download_light_json_process_trait_enhanced-mapping.js uses
+DEFAULT_BROTLI_QUALITY = 5
+GZIP_LEVEL = 9
+# Only used to refresh a .zst that precompress.py already published
+ZSTD_LEVEL = 19
+
+def load_manifest():
+    """Load the sidecar manifest describing the currently published data."""
+    try:
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_manifest(manifest):
+    atomic_write_bytes(MANIFEST_PATH, json.dumps(manifest, indent=2).encode('utf-8'))
+    remove_stale_variants(MANIFEST_PATH, [MANIFEST_PATH])
+
+def conditional_headers(manifest, outputs):
+    """Build If-None-Match / If-Modified-Since headers from the last successful run.
+
+    Validators are only sent when every output of this mode is still on disk,
+    otherwise a 304 would leave us with nothing to serve.
+    """
+    if not all(path.exists() for path in outputs):
+        return {}
+
+    headers = {}
+    if manifest.get('etag'):
+        headers['If-None-Match'] = manifest['etag']
+    if manifest.get('last_modified'):
+        headers['If-Modified-Since'] = manifest['last_modified']
+    return headers
+
+def open_encoders(brotli_quality=DEFAULT_BROTLI_QUALITY, write_gzip=False):
+    """Return (path, process, finish) triples for each file a refresh publishes.
+
+    The plain JSON is always written because
+    scripts/download_light_json_process_trait_enhanced-mapping.js reads it. A .gz or
+    .zst already on disk is re-encoded too, so a refresh replaces every variant the
+    server negotiates instead of leaving it stale or deleting it.
+    """
+    encoders = [(JSON_PATH, lambda chunk: chunk, lambda: b'')]
+
+    if HAS_BROTLI:
+        compressor = brotli.Compressor(quality=brotli_quality)
+        encoders.append((Path(f"{JSON_PATH}.br"), compressor.process, compressor.finish))
+
+    if write_gzip or Path(f"{JSON_PATH}.gz").exists():
+        # wbits=31 makes zlib emit a gzip container instead of a raw zlib stream
+        gzip_compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        encoders.append((Path(f"{JSON_PATH}.gz"), gzip_compressor.compress, gzip_compressor.flush))
+
+    if HAS_ZSTD and Path(f"{JSON_PATH}.zst").exists():
+        zstd_compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        encoders.append((Path(f"{JSON_PATH}.zst"), zstd_compressor.compress, zstd_compressor.flush))
+
+    return encoders
+
+def append_run_log(entry):
+    """Add one run's transfer metrics to RUN_LOG_PATH, keeping the last RUN_LOG_KEEP runs."""
+    try:
+        with open(RUN_LOG_PATH, 'r', encoding='utf-8') as f:
+            runs = json.load(f)
+    except (OSError, ValueError):
+        runs = []
+    runs = (runs + [entry])[-RUN_LOG_KEEP:]
+    atomic_write_bytes(RUN_LOG_PATH, json.dumps(runs, indent=2).encode('utf-8'))
+
+def encode_to_temp(chunks, brotli_quality=DEFAULT_BROTLI_QUALITY, write_gzip=False):
+    """Feed `chunks` through the encoders into temp files beside their final paths.
+
+    Returns ({final_path: temp_path}, sha256 of the raw bytes, raw byte count).
+    """
+    encoders = open_encoders(brotli_quality, write_gzip)
+    temp_paths = {path: make_temp_path(path) for path, _, _ in encoders}
+    hasher = hashlib.sha256()
+    raw_bytes = 0
+
+    handles = [open(temp_paths[path], 'wb') for path, _, _ in encoders]
+    try:
+        for chunk in chunks:
+            raw_bytes += len(chunk)
+            hasher.update(chunk)
+            for (_, process, _), handle in zip(encoders, handles):
+                handle.write(process(chunk))
+
+        for (_, _, finish), handle in zip(encoders, handles):
+            handle.write(finish())
+    finally:
+        for handle in handles:
+            handle.close()
+
+    return temp_paths, hasher.hexdigest(), raw_bytes
+
+def save_json_to_temp(chunks, brotli_quality=DEFAULT_BROTLI_QUALITY, write_gzip=False):
+    """Parse the downloaded body and write it, re-serialized, through the encoders.
+
+    Returns ({final_path: temp_path}, digest) where the digest is taken over a
+    canonical (sorted-key, compact) serialization so that key order or
+    whitespace changes upstream don't count as new content.
+    """
+    data = json.loads(b''.join(chunks))
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    digest = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    del canonical
+
+    payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    del data
+    temp_paths, _, _ = encode_to_temp([payload], brotli_quality, write_gzip)
+    return temp_paths, digest
+
+def stream_to_temp(chunks, brotli_quality=DEFAULT_BROTLI_QUALITY, write_gzip=False):
+    """Feed the downloaded body through the encoders into temp files, chunk by chunk.
+
+    The body is never parsed or buffered as a whole, so peak memory stays flat no
+    matter how large the dataset grows. The digest covers the raw response bytes.
+    """
+    temp_paths, digest, raw_bytes = encode_to_temp(chunks, brotli_quality, write_gzip)
+    print(f"Streamed {raw_bytes / 1024 / 1024:.2f} MB of roll appraiser data")
+    return temp_paths, digest
+
+def refresh_god_roll_data(stream=False, brotli_quality=DEFAULT_BROTLI_QUALITY,
+                          write_gzip=False, force=False, url=URL,
+                          timeout=light_download.DEFAULT_TIMEOUT, retries=light_download.DEFAULT_RETRIES):
+    """Conditionally download the dataset and atomically publish it if it changed.
+
+    A 304 from light.gg, or a payload whose content hash matches the manifest,
+    leaves the served files untouched so clients keep their cached copy. The
+    transfer resumes and retries on its own (see light_download) and every run's
+    metrics are appended to RUN_LOG_PATH.
+    Returns True on success (including "nothing to do").
+    """
+    if stream:
+        if not HAS_BROTLI:
+            print("Error: streaming mode requires the 'brotli' package (pip install brotli)")
+            return False
+        hash_basis = 'raw'
+    else:
+        hash_basis = 'canonical-json'
+    outputs = [path for path, _, _ in open_encoders(brotli_quality, write_gzip)]
+
+    manifest = load_manifest()
+    headers = {} if force else conditional_headers(manifest, outputs)
 
     scraper = cloudscraper.create_scraper()
+    temp_paths = {}
+    body_path = make_temp_path(JSON_PATH)
+    run = {'started_at': datetime.now(timezone.utc).isoformat(), 'url': url, 'mode': 'stream' if stream else 'json'}
     try:
-        response = scraper.get(url)
-        response.raise_for_status()
+        transfer = light_download.download(scraper, url, body_path, headers, timeout, retries)
+        run.update(transfer)
+        if transfer['http_status'] == 304:
+            print("Roll appraiser data not modified upstream (304); nothing to do.")
+            run['result'] = 'not-modified'
+            return True
+        print(f"Downloaded {transfer['bytes'] / 1024 / 1024:.2f} MB in {transfer['duration_seconds']:.1f}s "
+              f"({(transfer['bytes_per_second'] or 0) / 1024 / 1024:.2f} MB/s, "
+              f"first byte after {transfer['ttfb_seconds'] or 0:.2f}s, {transfer['attempts']} attempt(s))")
 
-        # Parse the JSON response
-        data = response.json()
+        chunks = light_download.iter_decoded(body_path, transfer['content_encoding'])
+        if stream:
+            temp_paths, digest = stream_to_temp(chunks, brotli_quality, write_gzip)
+        else:
+            temp_paths, digest = save_json_to_temp(chunks, brotli_quality, write_gzip)
 
-        # Save the data to a file named 'lightgg.json'
-        with open('backend/light/rollAppraiserData.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False)
+        etag = transfer['etag']
+        last_modified = transfer['last_modified']
 
-        print("Successfully downloaded and saved the data to backend/light/rollAppraiserData.json")
+        unchanged = (
+            not force
+            and manifest.get('sha256') == digest
+            and manifest.get('hash_basis') == hash_basis
+            and all(path.exists() for path in outputs)
+        )
+
+        run['result'] = 'unchanged' if unchanged else 'published'
+        if unchanged:
+            print("Roll appraiser data content is unchanged; keeping the published files.")
+        else:
+            for final_path, temp_path in temp_paths.items():
+                os.replace(temp_path, final_path)
+                print(f"Published {final_path.relative_to(LIGHT_DIR.parent.parent)}")
+            # Only a variant this run had no encoder for (e.g. a .zst without
+            # zstandard installed) is left holding old data
+            remove_stale_variants(JSON_PATH, temp_paths)
+
+        manifest.update({
+            'etag': etag,
+            'last_modified': last_modified,
+            'sha256': digest,
+            'hash_basis': hash_basis,
+            'checked_at': datetime.now(timezone.utc).isoformat(),
+        })
+        if not unchanged:
+            manifest['published_at'] = manifest['checked_at']
+            manifest['outputs'] = {path.name: path.stat().st_size for path in outputs}
+        write_manifest(manifest)
+        return True
 
     except Exception as e:
         # cloudscraper can raise its own specific exceptions, but a general
         # catch-all is fine here.
         print(f"An error occurred: {e}")
+        run.update(result='failed', error=str(e))
+        return False
+    finally:
+        body_path.unlink(missing_ok=True)
+        for temp_path in temp_paths.values():
+            temp_path.unlink(missing_ok=True)
+        append_run_log(run)
+
+def load_published_data():
+    """Load the dataset the manifest's digest describes.
+
+    Refreshes from before the plain JSON was always written published only the .br
+    in --stream mode, leaving any rollAppraiserData.json stale; the manifest's
+    outputs say which file is current. Without a manifest, the JSON is preferred.
+    """
+    br_path = Path(f"{JSON_PATH}.br")
+    outputs = load_manifest().get('outputs') or {}
+    streamed = br_path.name in outputs and JSON_PATH.name not in outputs
+
+    if JSON_PATH.exists() and not streamed:
+        with open(JSON_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    if br_path.exists() and HAS_BROTLI:
+        return json.loads(brotli.decompress(br_path.read_bytes()))
+
+    raise FileNotFoundError(f"No published roll appraiser data found in {LIGHT_DIR}")
+
+def shard_index(item_hash, shard_count):
+    """Bucket an itemHash into a shard. Clients can compute this without the manifest."""
+    return int(item_hash) % shard_count
+
+def write_compressed_variants(path, payload, brotli_quality=DEFAULT_BROTLI_QUALITY, write_gzip=False):
+    """Atomically write `payload` as `path`.br (and `path`.gz) for the server to negotiate.
+
+    A .gz or .zst already on disk (e.g. from precompress.py) is re-encoded as well;
+    only a variant there is no encoder for is removed, since it now holds old data.
+    `path` itself is left to the caller. Returns the total number of compressed
+    bytes written.
+    """
+    variants = {'.br': brotli.compress(payload, quality=brotli_quality)}
+    if write_gzip or Path(f"{path}.gz").exists():
+        variants['.gz'] = gzip.compress(payload, GZIP_LEVEL, mtime=0)
+    if HAS_ZSTD and Path(f"{path}.zst").exists():
+        variants['.zst'] = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+
+    for suffix, compressed in variants.items():
+        atomic_write_bytes(Path(f"{path}{suffix}"), compressed)
+    remove_stale_variants(path, [path, *(Path(f"{path}{suffix}") for suffix in variants)])
+    return sum(len(compressed) for compressed in variants.values())
+
+def build_shards(shard_count, brotli_quality=DEFAULT_BROTLI_QUALITY, write_gzip=False, force=False):
+    """Split the per-weapon tables into itemHash-bucketed, pre-compressed shards.
+
+    Each shard is a RollAppraiserData-shaped subset holding only the items that
+    hash into it, so a client can fetch just the shards for the weapons it owns.
+    shards/manifest.json maps every itemHash to its shard and carries a short
+    content hash per shard for use as a cache-busting `?v=` query parameter;
+    shard file names stay stable, so a refresh replaces them in place instead
+    of leaving old shards behind.
+    """
+    if not HAS_BROTLI:
+        print("Error: sharded output requires the 'brotli' package (pip install brotli)")
+        return False
+
+    source_digest = load_manifest().get('sha256')
+    try:
+        with open(SHARD_MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+
+    if (not force and source_digest
+            and previous.get('version') == source_digest
+            and previous.get('shardCount') == shard_count):
+        print("Shards are already up to date.")
+        return True
+
+    data = load_published_data()
+    shards = [{table: {} for table in ITEM_TABLES} for _ in range(shard_count)]
+    items = {}
+    for table in ITEM_TABLES:
+        for item_hash, value in data.get(table, {}).items():
+            index = shard_index(item_hash, shard_count)
+            shards[index][table][item_hash] = value
+            items[item_hash] = index
+    del data
+
+    SHARDS_DIR.mkdir(exist_ok=True)
+    shard_entries = []
+    total_bytes = 0
+    for index, shard in enumerate(shards):
+        payload = json.dumps(shard, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        name = f"shard-{index:03d}.json"
+        total_bytes += write_compressed_variants(SHARDS_DIR / name, payload, brotli_quality, write_gzip)
+        shard_entries.append({
+            'file': name,
+            'v': hashlib.sha256(payload).hexdigest()[:12],
+            'items': sum(len(shard[table]) for table in ITEM_TABLES),
+        })
+
+    # Drop shards left over from a run with a larger shard count
+    for stale in SHARDS_DIR.glob('shard-*.json*'):
+        index = int(stale.name.split('.')[0].split('-')[1])
+        if index >= shard_count:
+            stale.unlink()
+
+    manifest = {
+        'version': source_digest,
+        'shardCount': shard_count,
+        'shards': shard_entries,
+        'items': dict(sorted(items.items(), key=lambda item: int(item[0]))),
+    }
+    manifest_payload = json.dumps(manifest, separators=(',', ':')).encode('utf-8')
+    atomic_write_bytes(SHARD_MANIFEST_PATH, manifest_payload)
+    write_compressed_variants(SHARD_MANIFEST_PATH, manifest_payload, brotli_quality, write_gzip)
+
+    print(f"Wrote {shard_count} shards covering {len(items)} items "
+          f"({total_bytes / 1024 / 1024:.2f} MB compressed)")
+    return True
+
+def build_normalized(brotli_quality=DEFAULT_BROTLI_QUALITY, write_gzip=False, force=False):
+    """Write rollAppraiserData.normalized.json (plus pre-compressed variants).
+
+    See light_normalize for the layout. The served rollAppraiserData.json is left
+    as-is because RollAppraiserUtils still reads the raw PascalCase tables.
+    """
+    manifest = load_manifest()
+    source_digest = manifest.get('sha256')
+    previous = manifest.get('normalized') or {}
+
+    if not force and source_digest and previous.get('version') == source_digest and NORMALIZED_PATH.exists():
+        print("Normalized data is already up to date.")
+        return True
+
+    raw = load_published_data()
+    normalized = light_normalize.normalize(raw)
+    normalized['version'] = source_digest
+    light_normalize.print_size_report(raw, normalized)
+    del raw
+
+    payload = light_normalize.dumps(normalized)
+    atomic_write_bytes(NORMALIZED_PATH, payload)
+    compressed_bytes = 0
+    if HAS_BROTLI:
+        compressed_bytes = write_compressed_variants(NORMALIZED_PATH, payload, brotli_quality, write_gzip)
+    else:
+        remove_stale_variants(NORMALIZED_PATH, [NORMALIZED_PATH])
+
+    manifest['normalized'] = {
+        'version': source_digest,
+        'bytes': len(payload),
+        'compressed_bytes': compressed_bytes,
+    }
+    write_manifest(manifest)
+
+    print(f"Wrote {NORMALIZED_PATH.name} ({len(payload) / 1024 / 1024:.2f} MB"
+          + (f", {compressed_bytes / 1024 / 1024:.2f} MB compressed)" if compressed_bytes else ")"))
+    return True
+
+def build_binary(brotli_quality=DEFAULT_BROTLI_QUALITY, write_gzip=False, force=False):
+    """Encode the normalized data as rollAppraiserData.bin and verify the round trip.
+
+    See light_binary for the layout. Needs rollAppraiserData.normalized.json.
+    """
+    manifest = load_manifest()
+    source_digest = manifest.get('sha256')
+    previous = manifest.get('binary') or {}
+
+    if not force and source_digest and previous.get('version') == source_digest and BINARY_PATH.exists():
+        print("Columnar binary data is already up to date.")
+        return True
+
+    with open(NORMALIZED_PATH, 'r', encoding='utf-8') as f:
+        normalized = json.load(f)
+
+    try:
+        payload = light_binary.encode(normalized)
+    except ValueError as e:
+        print(f"Error: cannot encode {BINARY_PATH.name}: {e}")
+        return False
+    atomic_write_bytes(BINARY_PATH, payload)
+    compressed_bytes = 0
+    if HAS_BROTLI:
+        compressed_bytes = write_compressed_variants(BINARY_PATH, payload, brotli_quality, write_gzip)
+    else:
+        remove_stale_variants(BINARY_PATH, [BINARY_PATH])
+
+    if light_binary.HAS_NUMPY:
+        problems = light_binary.verify(BINARY_PATH, normalized)
+        for problem in problems:
+            print(f"✗ {problem}")
+        if problems:
+            print(f"Error: {BINARY_PATH.name} does not round-trip against {NORMALIZED_PATH.name}")
+            return False
+        print(f"✓ {BINARY_PATH.name} round-trips exactly against {NORMALIZED_PATH.name}")
+    else:
+        print("Note: NumPy not found, skipping the columnar round-trip check.")
+
+    manifest['binary'] = {
+        'version': source_digest,
+        'bytes': len(payload),
+        'compressed_bytes': compressed_bytes,
+    }
+    write_manifest(manifest)
+
+    print(f"Wrote {BINARY_PATH.name} ({len(payload) / 1024 / 1024:.2f} MB"
+          + (f", {compressed_bytes / 1024 / 1024:.2f} MB compressed)" if compressed_bytes else ")"))
+    return True
+
+def build_snapshot(keep=light_snapshots.DEFAULT_KEEP, brotli_quality=DEFAULT_BROTLI_QUALITY):
+    """Add the current normalized data to the snapshot history and publish its delta patch."""
+    if not HAS_BROTLI:
+        print("Error: snapshot history requires the 'brotli' package (pip install brotli)")
+        return False
+
+    with open(NORMALIZED_PATH, 'r', encoding='utf-8') as f:
+        normalized = json.load(f)
+
+    entry = light_snapshots.publish_snapshot(normalized, SNAPSHOTS_DIR, atomic_write_bytes, keep, brotli_quality)
+    if entry is None:
+        print("Snapshot history is already up to date.")
+        return True
+
+    print(f"Published snapshot v{entry['version']} ({entry['snapshotBytes'] / 1024 / 1024:.2f} MB compressed)")
+    patch = entry['patch']
+    if patch:
+        print(f"  Patch v{patch['from']} -> v{entry['version']}: {patch['bytes'] / 1024:.1f} KB")
+        for table, counts in patch['counts'].items():
+            print(f"    {table}: +{counts['added']} ~{counts['changed']} -{counts['removed']}")
+    return True
+
+def build_sqlite(force=False):
+    """Load the normalized data into the indexed SQLite store the server queries.
+
+    See light_sqlite for the tables. The database is rebuilt beside SQLITE_PATH and
+    swapped in atomically. Needs rollAppraiserData.normalized.json.
+    """
+    manifest = load_manifest()
+    source_digest = manifest.get('sha256')
+
+    meta = light_sqlite.read_meta(SQLITE_PATH)
+    if (not force and source_digest and meta.get('version') == source_digest
+            and meta.get('schema') == str(light_sqlite.STORE_SCHEMA_VERSION)):
+        print("SQLite store is already up to date.")
+        return True
+
+    with open(NORMALIZED_PATH, 'r', encoding='utf-8') as f:
+        normalized = json.load(f)
+
+    try:
+        counts = light_sqlite.build_database(normalized, SQLITE_PATH)
+    except Exception as e:
+        print(f"Error building {SQLITE_PATH.name}: {e}")
+        return False
+
+    manifest['sqlite'] = {
+        'version': source_digest,
+        'bytes': SQLITE_PATH.stat().st_size,
+        'rows': counts,
+    }
+    write_manifest(manifest)
+
+    print(f"Wrote {SQLITE_PATH.name} ({SQLITE_PATH.stat().st_size / 1024 / 1024:.2f} MB, "
+          f"{sum(counts.values()):,} rows)")
+    return True
+
+def download_god_roll_data(force=False):
+    return refresh_god_roll_data(force=force)
+
+def stream_god_roll_data(brotli_quality=DEFAULT_BROTLI_QUALITY, write_gzip=False, force=False):
+    return refresh_god_roll_data(True, brotli_quality, write_gzip, force)
+
+def main():
+    parser = argparse.ArgumentParser(description="Download light.gg roll appraiser data.")
+    parser.add_argument('--url', default=URL,
+                        help="data URL (e.g. a local light_standin.py server for benchmarking)")
+    parser.add_argument('--timeout', type=float, default=light_download.DEFAULT_TIMEOUT,
+                        help=f"seconds to wait for a connection or the next chunk "
+                             f"(default: {light_download.DEFAULT_TIMEOUT})")
+    parser.add_argument('--retries', type=int, default=light_download.DEFAULT_RETRIES,
+                        help=f"retries with exponential backoff, resuming where the transfer stopped "
+                             f"(default: {light_download.DEFAULT_RETRIES})")
+    parser.add_argument('--stream', action='store_true',
+                        help="stream the response straight into rollAppraiserData.json and its "
+                             ".br/.gz/.zst variants without parsing or re-serializing it")
+    parser.add_argument('--gzip', action='store_true',
+                        help="also write gzip fallbacks (*.gz) of the data and --shards output")
+    parser.add_argument('--brotli-quality', type=int, default=DEFAULT_BROTLI_QUALITY,
+                        help=f"brotli quality for the .br of the data and --shards output (default: {DEFAULT_BROTLI_QUALITY})")
+    parser.add_argument('--force', action='store_true',
+                        help="skip the conditional request and content-hash check and always republish")
+    parser.add_argument('--shards', type=int, default=0, metavar='N',
+                        help="also split the per-weapon tables into N itemHash-bucketed shards "
+                             "under backend/light/shards")
+    parser.add_argument('--normalize', action='store_true',
+                        help="also write rollAppraiserData.normalized.json with typed fields, "
+                             "pre-resolved enhanced perks and unused payload stripped")
+    parser.add_argument('--binary', action='store_true',
+                        help="also write the columnar rollAppraiserData.bin (implies --normalize)")
+    parser.add_argument('--sqlite', action='store_true',
+                        help="also load the data into the indexed backend/rollAppraiser.db "
+                             "used by /api/roll_appraisal (implies --normalize)")
+    parser.add_argument('--snapshots', type=int, default=0, metavar='K',
+                        help="keep the last K normalized snapshots under backend/light/snapshots "
+                             "and publish a delta patch per version (implies --normalize)")
+    parser.add_argument('--precompress', action='store_true',
+                        help="finish by re-encoding every artifact in backend/light with the best "
+                             "br/gzip/zstd settings (see precompress.py)")
+    args = parser.parse_args()
+
+    if not refresh_god_roll_data(args.stream, args.brotli_quality, args.gzip, args.force,
+                                 args.url, args.timeout, args.retries):
+        return
+
+    if args.normalize or args.binary or args.sqlite or args.snapshots > 0:
+        if not build_normalized(args.brotli_quality, args.gzip, args.force):
+            return
+
+    if args.binary:
+        build_binary(args.brotli_quality, args.gzip, args.force)
+
+    if args.sqlite:
+        build_sqlite(args.force)
+
+    if args.snapshots > 0:
+        build_snapshot(args.snapshots, args.brotli_quality)
+
+    if args.shards > 0:
+        build_shards(args.shards, args.brotli_quality, args.gzip, args.force)
+
+    if args.precompress:
+        precompress.precompress_dir(LIGHT_DIR, force=args.force)
 
 if __name__ == "__main__":
-    download_god_roll_data()
+    main()
@@ -0,0 +1,277 @@
+"""
+Roll Appraiser Columnar Binary Format
+Encodes normalized roll appraiser data (see light_normalize) as fixed-width,
+little-endian column arrays so it can be memory-mapped with NumPy or wrapped in
+JS typed arrays without a JSON parse.
+
+File layout:
+    8 bytes   magic b'D2LRABIN'
+    4 bytes   uint32 header length
+    N bytes   UTF-8 JSON header: {"format", "version", "items", "columns": {name: {dtype, offset, count}}}
+    ...       column data, every column starting on an 8-byte boundary
+
+Rows for each table are grouped by item in `itemHash` order (sorted ascending).
+`<Table>.offsets` has items + 1 entries; rows for the item at index i are
+[offsets[i], offsets[i + 1]). Hash columns use 0 for "no hash", as in the
+normalized JSON.
+
+Usage:
+    python light_binary.py encode <normalized.json> <output.bin>
+    python light_binary.py verify <normalized.json> <output.bin>
+"""
+
+import json
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+MAGIC = b'D2LRABIN'
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+# array typecode for each little-endian dtype written to the file
+TYPECODES = {'<u4': 'I', '<u2': 'H', '|u1': 'B', '|i1': 'b', '<f8': 'd'}
+# [min, max] each integer dtype can hold
+INTEGER_RANGES = {'<u4': (0, 2**32 - 1), '<u2': (0, 2**16 - 1), '|u1': (0, 2**8 - 1), '|i1': (-2**7, 2**7 - 1)}
+
+# (column, dtype) per table, in the order of the normalized row (keyed tables lead with the key)
+TABLE_COLUMNS = {
+    'PerkStats': [
+        ('key', '<u4'), ('perkHash', '<u4'), ('rank', '<u2'), ('count', '<u4'),
+        ('perkIdx', '|i1'), ('enhancedHash', '<u4'), ('show', '|u1'),
+    ],
+    'TraitStats': [
+        ('perk4Hash', '<u4'), ('perk4EnhancedHash', '<u4'), ('perk5Hash', '<u4'),
+        ('perk5EnhancedHash', '<u4'), ('count', '<u4'), ('show', '|u1'),
+    ],
+    'MWStats': [('key', '<u4'), ('rank', '<u2'), ('count', '<u4'), ('show', '|u1')],
+    'ReviewSummary': [('reviewCount', '<u4'), ('pveAvg', '<f8'), ('pvpAvg', '<f8'), ('overallAvg', '<f8')],
+}
+KEYED_TABLES = ('PerkStats', 'MWStats')
+BOOL_COLUMNS = {'show'}
+
+def _typed_array(name, dtype, values):
+    bounds = INTEGER_RANGES.get(dtype)
+    if bounds and values:
+        low, high = min(values), max(values)
+        if low < bounds[0] or high > bounds[1]:
+            raise ValueError(f"Column {name} holds values in [{low}, {high}], outside the {dtype} range "
+                             f"[{bounds[0]}, {bounds[1]}]; the format's column types need widening")
+    column = array(TYPECODES[dtype], values)
+    if column.itemsize != int(dtype[2:]):
+        raise RuntimeError(f"array typecode {column.typecode!r} is not {dtype[2:]} bytes on this platform")
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column
+
+def _table_rows(table, value):
+    """Yield flat rows for one item's entry in a normalized table."""
+    if table in KEYED_TABLES:
+        for key, row in value.items():
+            yield [int(key), *row]
+    elif table == 'ReviewSummary':
+        yield value
+    else:
+        yield from value
+
+def encode(normalized):
+    """Return the columnar binary encoding of a normalized dataset as bytes.
+
+    Raises ValueError naming the column if a value does not fit its dtype.
+    """
+    item_hashes = sorted({int(item_hash) for table in TABLE_COLUMNS for item_hash in normalized.get(table, {})})
+
+    columns = {'itemHash': ('<u4', item_hashes)}
+    for table, table_columns in TABLE_COLUMNS.items():
+        entries = normalized.get(table, {})
+        values = [[] for _ in table_columns]
+        offsets = [0]
+        for item_hash in item_hashes:
+            value = entries.get(str(item_hash))
+            if value is not None:
+                for row in _table_rows(table, value):
+                    for column_values, field in zip(values, row):
+                        column_values.append(field)
+            offsets.append(len(values[0]))
+
+        columns[f"{table}.offsets"] = ('<u4', offsets)
+        for (name, dtype), column_values in zip(table_columns, values):
+            columns[f"{table}.{name}"] = (dtype, column_values)
+
+    enhanced = sorted((int(standard), enhanced) for standard, enhanced in normalized.get('EnhancedPerks', {}).items())
+    columns['EnhancedPerks.standard'] = ('<u4', [standard for standard, _ in enhanced])
+    columns['EnhancedPerks.enhanced'] = ('<u4', [enhanced_hash for _, enhanced_hash in enhanced])
+
+    blobs = {name: _typed_array(name, dtype, values).tobytes() for name, (dtype, values) in columns.items()}
+
+    def build_header(data_start):
+        layout = {}
+        offset = data_start
+        for name, (dtype, values) in columns.items():
+            layout[name] = {'dtype': dtype, 'offset': offset, 'count': len(values)}
+            offset += -(-len(blobs[name]) // ALIGNMENT) * ALIGNMENT
+        return json.dumps({
+            'format': FORMAT_VERSION,
+            'version': normalized.get('version'),
+            'items': len(item_hashes),
+            'columns': layout,
+        }, separators=(',', ':')).encode('utf-8')
+
+    # The header records absolute offsets, which depend on the header's own length;
+    # iterate until the padded length stops changing (normally two passes).
+    data_start = 0
+    while True:
+        header = build_header(data_start)
+        needed = -(-(len(MAGIC) + 4 + len(header)) // ALIGNMENT) * ALIGNMENT
+        if needed == data_start:
+            break
+        data_start = needed
+
+    out = bytearray(MAGIC)
+    out += struct.pack('<I', len(header))
+    out += header
+    for name, blob in blobs.items():
+        out += b'\0' * (-len(out) % ALIGNMENT)
+        out += blob
+    out += b'\0' * (-len(out) % ALIGNMENT)
+    return bytes(out)
+
+class ColumnarData:
+    """Read-only NumPy view over columnar data.
+
+    `source` is a file path (memory-mapped) or the bytes returned by encode().
+    """
+
+    def __init__(self, source):
+        if not HAS_NUMPY:
+            raise RuntimeError("Reading the columnar format requires NumPy (pip install numpy)")
+
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._buffer = np.frombuffer(source, dtype=np.uint8)
+        else:
+            self._buffer = np.memmap(source, dtype=np.uint8, mode='r')
+        if bytes(self._buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError("Not a roll appraiser columnar file")
+
+        header_length = struct.unpack_from('<I', self._buffer, len(MAGIC))[0]
+        header_start = len(MAGIC) + 4
+        self.header = json.loads(bytes(self._buffer[header_start:header_start + header_length]))
+        if self.header['format'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar format {self.header['format']}")
+
+        self.columns = {
+            name: np.frombuffer(self._buffer, dtype=np.dtype(spec['dtype']), count=spec['count'],
+                                offset=spec['offset'])
+            for name, spec in self.header['columns'].items()
+        }
+        self.item_hashes = self.columns['itemHash']
+
+    @property
+    def version(self):
+        return self.header.get('version')
+
+    def item_index(self, item_hash):
+        """Index of `item_hash` in the sorted item column, or None."""
+        index = int(np.searchsorted(self.item_hashes, int(item_hash)))
+        if index < len(self.item_hashes) and self.item_hashes[index] == int(item_hash):
+            return index
+        return None
+
+    def row_range(self, table, item_hash):
+        """(start, stop) row range of `item_hash` within `table`; empty if the item is absent."""
+        index = self.item_index(item_hash)
+        if index is None:
+            return 0, 0
+        offsets = self.columns[f"{table}.offsets"]
+        return int(offsets[index]), int(offsets[index + 1])
+
+    def to_normalized(self):
+        """Rebuild the normalized JSON form (without schema/fields metadata)."""
+        result = {}
+        for table, table_columns in TABLE_COLUMNS.items():
+            offsets = self.columns[f"{table}.offsets"].tolist()
+            values = [self.columns[f"{table}.{name}"].tolist() for name, _ in table_columns]
+            for position, (name, _) in enumerate(table_columns):
+                if name in BOOL_COLUMNS:
+                    values[position] = [bool(value) for value in values[position]]
+            rows = list(zip(*values))
+
+            entries = {}
+            for index, item_hash in enumerate(self.item_hashes.tolist()):
+                start, stop = offsets[index], offsets[index + 1]
+                if start == stop:
+                    continue
+                item_rows = rows[start:stop]
+                if table in KEYED_TABLES:
+                    entries[str(item_hash)] = {str(row[0]): list(row[1:]) for row in item_rows}
+                elif table == 'ReviewSummary':
+                    entries[str(item_hash)] = list(item_rows[0])
+                else:
+                    entries[str(item_hash)] = [list(row) for row in item_rows]
+            result[table] = entries
+
+        result['EnhancedPerks'] = {
+            str(standard): enhanced
+            for standard, enhanced in zip(self.columns['EnhancedPerks.standard'].tolist(),
+                                          self.columns['EnhancedPerks.enhanced'].tolist())
+        }
+        return result
+
+def verify(bin_path, normalized):
+    """Compare a columnar file against the normalized JSON it was built from.
+
+    Returns a list of human-readable mismatches; empty means the round trip is exact.
+    """
+    decoded = ColumnarData(bin_path)
+    problems = []
+    if decoded.version != normalized.get('version'):
+        problems.append(f"version: {decoded.version!r} != {normalized.get('version')!r}")
+
+    rebuilt = decoded.to_normalized()
+    for section, expected in ((table, normalized.get(table, {})) for table in (*TABLE_COLUMNS, 'EnhancedPerks')):
+        actual = rebuilt[section]
+        if actual == expected:
+            continue
+        missing = expected.keys() - actual.keys()
+        extra = actual.keys() - expected.keys()
+        changed = [key for key in expected.keys() & actual.keys() if expected[key] != actual[key]]
+        problems.append(f"{section}: {len(missing)} missing, {len(extra)} extra, {len(changed)} differing"
+                        + (f" (e.g. {sorted(changed)[0]})" if changed else ''))
+    return problems
+
+def main():
+    if len(sys.argv) != 4 or sys.argv[1] not in ('encode', 'verify'):
+        print("Usage:")
+        print("  python light_binary.py encode <normalized.json> <output.bin>")
+        print("  python light_binary.py verify <normalized.json> <output.bin>")
+        sys.exit(1)
+
+    command, json_path, bin_path = sys.argv[1:]
+    with open(json_path, 'r', encoding='utf-8') as f:
+        normalized = json.load(f)
+
+    if command == 'encode':
+        try:
+            payload = encode(normalized)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        with open(bin_path, 'wb') as f:
+            f.write(payload)
+        print(f"Wrote {bin_path} ({len(payload) / 1024 / 1024:.2f} MB)")
+    else:
+        problems = verify(bin_path, normalized)
+        for problem in problems:
+            print(f"✗ {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"✓ {bin_path} round-trips exactly against {json_path}")
+
+if __name__ == "__main__":
+    main()
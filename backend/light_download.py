@@ -0,0 +1,200 @@
+"""
+Resumable Downloader
+Fetches one URL into a local file chunk by chunk. A dropped connection or a
+truncated body is resumed with an HTTP Range request from the last byte written;
+timeouts, connection errors and 408/429/5xx responses are retried with
+exponential backoff.
+
+The body is stored exactly as sent (still content-encoded), because Range offsets
+count encoded bytes; iter_decoded() undoes the Content-Encoding afterwards.
+"""
+
+import os
+import time
+import zlib
+
+import requests
+import urllib3
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_RETRIES = 5
+DEFAULT_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+CHUNK_SIZE = 64 * 1024
+
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+# Only ask for encodings iter_decoded() can undo
+ACCEPT_ENCODING = 'gzip, deflate, br' if HAS_BROTLI else 'gzip, deflate'
+
+class DownloadError(Exception):
+    """The download failed for good (non-retryable status or retries exhausted)."""
+
+class RetryableError(Exception):
+    """A transient failure worth another attempt."""
+
+# Connection resets, timeouts and bodies cut short, as raised by requests or while reading raw urllib3 chunks
+TRANSIENT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    urllib3.exceptions.HTTPError,
+    RetryableError,
+)
+
+def parse_content_range(value):
+    """'bytes 100-199/200' -> (100, 200); the total is None when the server sends '*'."""
+    try:
+        unit, _, spec = value.partition(' ')
+        byte_range, _, total = spec.partition('/')
+        if unit != 'bytes':
+            raise ValueError(unit)
+        return int(byte_range.split('-')[0]), None if total == '*' else int(total)
+    except (AttributeError, ValueError):
+        raise RetryableError(f"Malformed Content-Range {value!r}")
+
+def download(session, url, dest_path, headers=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+             backoff=DEFAULT_BACKOFF, chunk_size=CHUNK_SIZE):
+    """Download `url` into `dest_path`, resuming and retrying as needed.
+
+    `headers` are sent with the first request (e.g. conditional validators);
+    resumed requests replace them with Range/If-Range. Returns a stats dict with
+    the final HTTP status (304 leaves `dest_path` empty), response validators and
+    timings. Raises DownloadError when the transfer cannot be completed.
+    """
+    stats = {
+        'url': url,
+        'http_status': None,
+        'etag': None,
+        'last_modified': None,
+        'content_encoding': None,
+        'bytes': 0,
+        'total_bytes': None,
+        'attempts': 0,
+        'resumes': 0,
+        'ttfb_seconds': None,
+        'duration_seconds': None,
+        'bytes_per_second': None,
+    }
+    start = time.perf_counter()
+    written = 0
+    validator = None
+
+    with open(dest_path, 'wb') as f:
+        for attempt in range(retries + 1):
+            stats['attempts'] = attempt + 1
+            request_headers = {'Accept-Encoding': ACCEPT_ENCODING, **(headers or {})}
+            if written:
+                request_headers.pop('If-None-Match', None)
+                request_headers.pop('If-Modified-Since', None)
+                request_headers['Range'] = f"bytes={written}-"
+                if validator:
+                    # If the resource changed since the first response, the server sends it whole
+                    request_headers['If-Range'] = validator
+
+            try:
+                with session.get(url, headers=request_headers, stream=True, timeout=timeout) as response:
+                    if response.status_code == 304:
+                        # Also possible on a resumed request (If-Range); either way our copy is current
+                        if written:
+                            print("Server answered the resumed request with 304; discarding the partial body")
+                            f.seek(0)
+                            f.truncate()
+                            written = 0
+                        stats['http_status'] = 304
+                        break
+                    if response.status_code in RETRY_STATUSES:
+                        raise RetryableError(f"HTTP {response.status_code}")
+                    response.raise_for_status()
+
+                    if response.status_code == 206:
+                        range_start, total = parse_content_range(response.headers.get('Content-Range'))
+                        if range_start != written:
+                            raise RetryableError(f"Server resumed at byte {range_start}, expected {written}")
+                        stats['resumes'] += 1
+                    else:
+                        if written:
+                            print("Server sent the full body instead of resuming; restarting from byte 0")
+                            f.seek(0)
+                            f.truncate()
+                            written = 0
+                        stats['etag'] = response.headers.get('ETag')
+                        stats['last_modified'] = response.headers.get('Last-Modified')
+                        stats['content_encoding'] = response.headers.get('Content-Encoding')
+                        # Weak ETags are not allowed in If-Range
+                        etag = stats['etag']
+                        validator = etag if etag and not etag.startswith('W/') else stats['last_modified']
+                        length = response.headers.get('Content-Length')
+                        total = int(length) if length and length.isdigit() else None
+
+                    stats['http_status'] = 200
+                    stats['total_bytes'] = total
+                    for chunk in response.raw.stream(chunk_size, decode_content=False):
+                        if stats['ttfb_seconds'] is None:
+                            stats['ttfb_seconds'] = round(time.perf_counter() - start, 4)
+                        f.write(chunk)
+                        written += len(chunk)
+
+                    if total is not None and written < total:
+                        raise RetryableError(f"Connection closed after {written} of {total} bytes")
+                break
+
+            except TRANSIENT_ERRORS as e:
+                if attempt == retries:
+                    raise DownloadError(f"Giving up after {attempt + 1} attempts: {e}") from e
+                delay = min(backoff * 2 ** attempt, MAX_BACKOFF)
+                resume_note = f", resuming at byte {written:,}" if written else ""
+                print(f"Download attempt {attempt + 1} failed ({e}); retrying in {delay:.1f}s{resume_note}")
+                time.sleep(delay)
+            except requests.HTTPError as e:
+                raise DownloadError(str(e)) from e
+
+        f.flush()
+        os.fsync(f.fileno())
+
+    duration = time.perf_counter() - start
+    stats['bytes'] = written
+    stats['duration_seconds'] = round(duration, 4)
+    stats['bytes_per_second'] = round(written / duration) if duration else None
+    return stats
+
+def _is_zlib_header(head):
+    """True if `head` starts with a zlib (RFC 1950) header rather than raw deflate data."""
+    return len(head) >= 2 and head[0] & 0x0F == 8 and head[0] >> 4 <= 7 and (head[0] << 8 | head[1]) % 31 == 0
+
+def iter_decoded(path, content_encoding=None, chunk_size=CHUNK_SIZE):
+    """Yield the decoded body of a file written by download()."""
+    encoding = (content_encoding or 'identity').strip().lower()
+    if encoding in ('gzip', 'x-gzip'):
+        # wbits=47 accepts both gzip and zlib containers
+        decompressor = zlib.decompressobj(47)
+        process, finish = decompressor.decompress, decompressor.flush
+    elif encoding == 'deflate':
+        # "deflate" should be zlib-wrapped, but many servers send raw deflate data
+        with open(path, 'rb') as f:
+            head = f.read(2)
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS if _is_zlib_header(head) else -zlib.MAX_WBITS)
+        process, finish = decompressor.decompress, decompressor.flush
+    elif encoding == 'br':
+        if not HAS_BROTLI:
+            raise DownloadError("Response is brotli-encoded but the 'brotli' package is not installed")
+        decompressor = brotli.Decompressor()
+        process, finish = decompressor.process, bytes
+    elif encoding == 'identity':
+        process, finish = bytes, bytes
+    else:
+        raise DownloadError(f"Unsupported Content-Encoding {content_encoding!r}")
+
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            decoded = process(chunk)
+            if decoded:
+                yield decoded
+    tail = finish()
+    if tail:
+        yield tail
@@ -0,0 +1,46 @@
+"""
+File helpers shared by the roll appraiser tooling.
+Everything under backend/light is served live, so outputs are always written to a
+temp file in the same directory and renamed into place.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+def make_temp_path(path):
+    """Create an empty temp file next to `path` so a later os.replace stays on one filesystem."""
+    path = Path(path)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    # mkstemp creates files as 0600; keep published files readable like a normal open() would
+    os.close(fd)
+    os.chmod(temp_name, path.stat().st_mode & 0o777 if path.exists() else 0o644)
+    return Path(temp_name)
+
+def atomic_write_bytes(path, data):
+    """Write `data` to a temp file beside `path`, fsync it and rename it into place."""
+    temp_path = make_temp_path(path)
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+# Content-encoded siblings the server negotiates in place of a file
+ENCODED_SUFFIXES = ('.br', '.gz', '.zst')
+
+def remove_stale_variants(path, kept):
+    """Delete `path` and its encoded siblings, except the paths listed in `kept`.
+
+    Call after rewriting an artifact: a .gz or .zst left by an earlier run (e.g.
+    precompress.py) would otherwise keep being served with the old content.
+    """
+    kept = {Path(kept_path) for kept_path in kept}
+    for suffix in ('', *ENCODED_SUFFIXES):
+        variant = Path(f"{path}{suffix}")
+        if variant not in kept:
+            variant.unlink(missing_ok=True)
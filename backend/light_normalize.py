@@ -0,0 +1,186 @@
+"""
+Roll Appraiser Data Normalizer
+Turns the raw light.gg roll appraiser payload into a compact, fully typed form
+that can be queried with direct keyed lookups.
+
+Normalized layout (schema 1):
+    PerkStats:     {itemHash: {perkHash: [perkHash, rank, count, perkIdx, enhancedHash, show]}}
+                   Enhanced perk hashes from EnhancedPerks are added as extra keys that
+                   point at the standard perk's row, so an enhanced roll resolves in one
+                   lookup. Like RollAppraiserUtils.getPerkRank, only that mapping is
+                   used; a row's own PerkEnhancedHash is stored but never aliased.
+    TraitStats:    {itemHash: [[perk4Hash, perk4EnhancedHash, perk5Hash, perk5EnhancedHash, count, show], ...]}
+                   Order is preserved because the combo rank is derived from position
+                   (see COMBOS_PER_RANK).
+    MWStats:       {itemHash: {perkHash: [rank, count, show]}}
+    ReviewSummary: {itemHash: [reviewCount, pveAvg, pvpAvg, overallAvg]}
+    EnhancedPerks: {standardHash: enhancedHash}
+
+Missing hashes are stored as 0, which Bungie never uses as a real hash.
+"""
+
+import json
+
+SCHEMA_VERSION = 1
+
+ITEM_TABLES = ('PerkStats', 'TraitStats', 'MWStats', 'ReviewSummary')
+
+# Trait combos come in groups of four (standard/enhanced variants of the same pair),
+# so a combo's rank is position // COMBOS_PER_RANK + 1
+COMBOS_PER_RANK = 4
+
+FIELDS = {
+    'PerkStats': ['perkHash', 'rank', 'count', 'perkIdx', 'enhancedHash', 'show'],
+    'TraitStats': ['perk4Hash', 'perk4EnhancedHash', 'perk5Hash', 'perk5EnhancedHash', 'count', 'show'],
+    'MWStats': ['rank', 'count', 'show'],
+    'ReviewSummary': ['reviewCount', 'pveAvg', 'pvpAvg', 'overallAvg'],
+}
+
+def to_hash(value):
+    """Cast a possibly-null hash to int, using 0 for "no hash"."""
+    return int(value) if value else 0
+
+def extract_enhanced_mapping(weapons):
+    """Build {standardHash: enhancedHash} from the Weapons blob's random roll columns.
+
+    Mirrors extractStandardToEnhancedMapping in
+    scripts/download_light_json_process_trait_enhanced-mapping.js: a perk name
+    seen with exactly two hashes is a standard/enhanced pair, and the lower hash
+    is the standard one.
+    """
+    name_to_hashes = {}
+    for weapon in (weapons or {}).values():
+        for socket_column in weapon.get('RandomRolls') or []:
+            if not isinstance(socket_column, list):
+                continue
+            for perk in socket_column:
+                if not perk.get('ItemHash') or not perk.get('Name'):
+                    continue
+                hashes = name_to_hashes.setdefault(perk['Name'], [])
+                if perk['ItemHash'] not in hashes:
+                    hashes.append(perk['ItemHash'])
+
+    mapping = {}
+    for hashes in name_to_hashes.values():
+        if len(hashes) == 2:
+            standard, enhanced = sorted(hashes)
+            mapping[int(standard)] = int(enhanced)
+    return mapping
+
+def normalize_perk_stats(weapon_perks, enhanced_mapping):
+    table = {}
+    for column in weapon_perks:
+        for perk in column:
+            perk_hash = int(perk['PerkHash'])
+            # The client returns the first match, so the first occurrence wins
+            if perk_hash in table:
+                continue
+            table[perk_hash] = [
+                perk_hash,
+                int(perk['Rank']),
+                int(perk['Count']),
+                int(perk['PerkIDX']),
+                to_hash(perk.get('PerkEnhancedHash')),
+                bool(perk['Show']),
+            ]
+
+    # Alias enhanced hashes after all direct hashes so a real row is never shadowed
+    for perk_hash, row in list(table.items()):
+        alias = enhanced_mapping.get(perk_hash, 0)
+        if alias and alias not in table:
+            table[alias] = row
+    return {str(perk_hash): row for perk_hash, row in table.items()}
+
+def normalize_trait_stats(weapon_traits):
+    # Some payloads key the combos by index instead of using a list
+    traits = weapon_traits.values() if isinstance(weapon_traits, dict) else weapon_traits
+    return [
+        [
+            to_hash(trait.get('Perk4Hash')),
+            to_hash(trait.get('Perk4EnhancedHash')),
+            to_hash(trait.get('Perk5Hash')),
+            to_hash(trait.get('Perk5EnhancedHash')),
+            int(trait['Count']),
+            bool(trait['Show']),
+        ]
+        for trait in traits
+    ]
+
+def normalize_mw_stats(weapon_mws):
+    table = {}
+    for mw in weapon_mws:
+        perk_hash = int(mw['PerkHash'])
+        if perk_hash not in table:
+            table[perk_hash] = [int(mw['Rank']), int(mw['Count']), bool(mw['Show'])]
+    return {str(perk_hash): row for perk_hash, row in table.items()}
+
+def normalize_review_summary(review):
+    return [
+        int(review['ReviewCount']),
+        float(review['PVEAvg']),
+        float(review['PVPAvg']),
+        float(review['OverallAvg']),
+    ]
+
+def normalize(data):
+    """Return the normalized form of a raw light.gg payload.
+
+    Only the per-weapon tables and the enhanced perk mapping are kept; the
+    Weapons blob, MasterworkMods, stat lists and DateSaved strings are dropped
+    because the client never reads them.
+    """
+    enhanced_mapping = extract_enhanced_mapping(data.get('Weapons'))
+
+    return {
+        'schema': SCHEMA_VERSION,
+        'fields': FIELDS,
+        'PerkStats': {
+            str(item_hash): normalize_perk_stats(perks, enhanced_mapping)
+            for item_hash, perks in data.get('PerkStats', {}).items()
+        },
+        'TraitStats': {
+            str(item_hash): normalize_trait_stats(traits)
+            for item_hash, traits in data.get('TraitStats', {}).items()
+        },
+        'MWStats': {
+            str(item_hash): normalize_mw_stats(mws)
+            for item_hash, mws in data.get('MWStats', {}).items()
+        },
+        'ReviewSummary': {
+            str(item_hash): normalize_review_summary(review)
+            for item_hash, review in data.get('ReviewSummary', {}).items()
+        },
+        'EnhancedPerks': {str(standard): enhanced for standard, enhanced in sorted(enhanced_mapping.items())},
+    }
+
+def dumps(data):
+    """Compact serialization used for everything written from normalized data."""
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def size_report(raw, normalized):
+    """Return [(section, raw_bytes, normalized_bytes)] for every top-level key, largest first."""
+    rows = []
+    for key in sorted(set(raw) | set(normalized)):
+        rows.append((
+            key,
+            len(dumps(raw[key])) if key in raw else 0,
+            len(dumps(normalized[key])) if key in normalized else 0,
+        ))
+    return sorted(rows, key=lambda row: -row[1])
+
+def print_size_report(raw, normalized):
+    rows = size_report(raw, normalized)
+    width = max(len('Section'), *(len(row[0]) for row in rows))
+
+    header = f"{'Section':<{width}} | {'Raw':>10} | {'Normalized':>10} | {'Saved':>6}"
+    print(header)
+    print('-' * len(header))
+    for key, raw_bytes, normalized_bytes in rows:
+        saved = f"{(1 - normalized_bytes / raw_bytes) * 100:.0f}%" if raw_bytes else '-'
+        print(f"{key:<{width}} | {raw_bytes:>10,} | {normalized_bytes:>10,} | {saved:>6}")
+
+    raw_total = sum(row[1] for row in rows)
+    normalized_total = sum(row[2] for row in rows)
+    print('-' * len(header))
+    print(f"{'Total':<{width}} | {raw_total:>10,} | {normalized_total:>10,} | "
+          f"{(1 - normalized_total / raw_total) * 100:.0f}%")
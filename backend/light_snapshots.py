@@ -0,0 +1,180 @@
+"""
+Roll Appraiser Snapshot History
+Keeps a rolling window of normalized snapshots (see light_normalize) and publishes
+a small per-itemHash delta patch between each consecutive pair.
+
+Directory layout (backend/light/snapshots):
+    manifest.json              {"latest": N, "versions": [{"version", "source", "sha256", "snapshot", "patch"}]}
+    v00012.json.br             full normalized snapshot for version 12
+    patch-00011-00012.json.br  delta that turns version 11 into version 12
+
+A client holding version N applies every patch from N + 1 up to "latest" in order;
+if N has fallen out of the window it downloads the latest snapshot instead.
+
+Patch format:
+    {"from": N - 1, "to": N, "fromSha256": ..., "toSha256": ..., "version": <source digest>,
+     "tables": {table: {"added": {itemHash: value}, "changed": {itemHash: value}, "removed": [itemHash]}}}
+
+Each table entry is replaced whole, so a patch never needs to know the row layout.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+from light_files import ENCODED_SUFFIXES, remove_stale_variants
+from light_normalize import ITEM_TABLES, dumps
+
+# EnhancedPerks is keyed by standard perk hash rather than itemHash but diffs the same way
+PATCHED_TABLES = (*ITEM_TABLES, 'EnhancedPerks')
+DEFAULT_KEEP = 5
+MANIFEST_NAME = 'manifest.json'
+
+def snapshot_digest(normalized):
+    """Order-independent digest of the tables a patch reproduces."""
+    canonical = json.dumps({table: normalized.get(table, {}) for table in PATCHED_TABLES},
+                           sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def diff(old, new):
+    """Return {table: {"added", "changed", "removed"}} between two normalized datasets."""
+    tables = {}
+    for table in PATCHED_TABLES:
+        old_entries = old.get(table, {})
+        new_entries = new.get(table, {})
+        tables[table] = {
+            'added': {key: value for key, value in new_entries.items() if key not in old_entries},
+            'changed': {
+                key: value for key, value in new_entries.items()
+                if key in old_entries and old_entries[key] != value
+            },
+            'removed': sorted(key for key in old_entries if key not in new_entries),
+        }
+    return tables
+
+def apply_patch(base, patch):
+    """Apply a patch to a normalized dataset and return the result.
+
+    Raises ValueError if the base or the result does not match the hashes the
+    patch was built for.
+    """
+    if snapshot_digest(base) != patch['fromSha256']:
+        raise ValueError(f"Patch {patch['from']}->{patch['to']} does not apply to this base")
+
+    result = dict(base)
+    for table, delta in patch['tables'].items():
+        entries = dict(base.get(table, {}))
+        for key in delta['removed']:
+            entries.pop(key, None)
+        entries.update(delta['added'])
+        entries.update(delta['changed'])
+        result[table] = entries
+    result['version'] = patch['version']
+
+    if snapshot_digest(result) != patch['toSha256']:
+        raise ValueError(f"Patch {patch['from']}->{patch['to']} produced unexpected data")
+    return result
+
+def read_compressed_json(path):
+    return json.loads(brotli.decompress(Path(path).read_bytes()))
+
+def load_manifest(snapshot_dir):
+    try:
+        with open(Path(snapshot_dir) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'latest': 0, 'versions': []}
+
+def write_compressed(path, compressed, write_bytes, keep_plain=False):
+    """Write the brotli `compressed` bytes as `path`.br and drop its other, now stale, variants."""
+    br_path = Path(f"{path}.br")
+    write_bytes(br_path, compressed)
+    remove_stale_variants(path, [br_path, path] if keep_plain else [br_path])
+
+def publish_snapshot(normalized, snapshot_dir, write_bytes, keep=DEFAULT_KEEP, brotli_quality=5):
+    """Record `normalized` as the next version and publish the patch from the previous one.
+
+    `write_bytes(path, data)` is used for every file so callers can supply an
+    atomic writer. Snapshots older than the last `keep` versions are pruned.
+    Returns the new manifest entry, or None if the data matches the latest version.
+    """
+    if not HAS_BROTLI:
+        raise RuntimeError("Snapshot history requires the 'brotli' package (pip install brotli)")
+
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(exist_ok=True)
+    manifest = load_manifest(snapshot_dir)
+    digest = snapshot_digest(normalized)
+
+    previous = manifest['versions'][-1] if manifest['versions'] else None
+    if previous and previous['sha256'] == digest:
+        return None
+
+    version = manifest['latest'] + 1
+    entry = {
+        'version': version,
+        'source': normalized.get('version'),
+        'sha256': digest,
+        'snapshot': f"v{version:05d}.json",
+        'patch': None,
+    }
+
+    snapshot_bytes = brotli.compress(dumps(normalized), quality=brotli_quality)
+    write_compressed(snapshot_dir / entry['snapshot'], snapshot_bytes, write_bytes)
+    entry['snapshotBytes'] = len(snapshot_bytes)
+
+    previous_path = snapshot_dir / f"{previous['snapshot']}.br" if previous else None
+    if previous_path and previous_path.exists():
+        base = read_compressed_json(previous_path)
+        tables = diff(base, normalized)
+        patch = {
+            'from': previous['version'],
+            'to': version,
+            'fromSha256': previous['sha256'],
+            'toSha256': digest,
+            'version': normalized.get('version'),
+            'tables': tables,
+        }
+        # Never publish a patch that doesn't reproduce the snapshot
+        apply_patch(base, patch)
+
+        patch_name = f"patch-{previous['version']:05d}-{version:05d}.json"
+        patch_bytes = brotli.compress(dumps(patch), quality=brotli_quality)
+        write_compressed(snapshot_dir / patch_name, patch_bytes, write_bytes)
+        entry['patch'] = {
+            'from': previous['version'],
+            'file': patch_name,
+            'bytes': len(patch_bytes),
+            'counts': {
+                table: {kind: len(delta[kind]) for kind in ('added', 'changed', 'removed')}
+                for table, delta in tables.items()
+            },
+        }
+
+    manifest['latest'] = version
+    manifest['versions'] = (manifest['versions'] + [entry])[-keep:]
+
+    manifest_bytes = json.dumps(manifest, indent=2).encode('utf-8')
+    write_bytes(snapshot_dir / MANIFEST_NAME, manifest_bytes)
+    write_compressed(snapshot_dir / MANIFEST_NAME, brotli.compress(manifest_bytes, quality=brotli_quality),
+                     write_bytes, keep_plain=True)
+
+    # Drop snapshots and patches that fell out of the window. Files still referenced
+    # keep every encoded variant, e.g. the .gz/.zst precompress.py adds.
+    referenced = {MANIFEST_NAME}
+    for kept in manifest['versions']:
+        referenced.add(kept['snapshot'])
+        if kept['patch']:
+            referenced.add(kept['patch']['file'])
+    for path in snapshot_dir.iterdir():
+        name = path.stem if path.suffix in ENCODED_SUFFIXES else path.name
+        if path.is_file() and name not in referenced and not path.name.startswith('.'):
+            path.unlink()
+
+    return entry
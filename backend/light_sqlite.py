@@ -0,0 +1,246 @@
+"""
+Roll Appraiser SQLite Store
+Loads normalized roll appraiser data (see light_normalize) into an indexed SQLite
+database so the backend can answer per-weapon appraisal queries from disk pages
+instead of shipping the whole dataset to every client.
+
+Tables (all WITHOUT ROWID, clustered on their primary key):
+    perk_stats        (item_hash, perk_hash) -> standard perk row; enhanced hashes are aliases
+    trait_combos      (item_hash, position)  -> combo row, rank = position // combos_per_rank + 1
+    trait_combo_keys  (item_hash, perk4_hash, perk5_hash) -> position of the first matching combo
+    mw_stats          (item_hash, perk_hash) -> masterwork row
+    review_summary    (item_hash)            -> review averages
+    enhanced_perks    (standard_hash)        -> enhanced_hash
+    meta              (key)                  -> schema / version / built_at / combos_per_rank
+
+The database is built in a temp file next to the target and renamed over it, so
+readers never see a half-loaded store. It is left in WAL mode; readers should
+open it read-only and reopen it when the file changes.
+
+Usage:
+    python light_sqlite.py build <normalized.json> <output.db>
+    python light_sqlite.py verify <normalized.json> <output.db>
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from light_files import make_temp_path
+from light_normalize import COMBOS_PER_RANK
+
+STORE_SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+CREATE TABLE perk_stats (
+    item_hash INTEGER NOT NULL,
+    perk_hash INTEGER NOT NULL,
+    standard_hash INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    perk_idx INTEGER NOT NULL,
+    enhanced_hash INTEGER NOT NULL,
+    show INTEGER NOT NULL,
+    PRIMARY KEY (item_hash, perk_hash)
+) WITHOUT ROWID;
+CREATE TABLE trait_combos (
+    item_hash INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    perk4_hash INTEGER NOT NULL,
+    perk4_enhanced_hash INTEGER NOT NULL,
+    perk5_hash INTEGER NOT NULL,
+    perk5_enhanced_hash INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    show INTEGER NOT NULL,
+    PRIMARY KEY (item_hash, position)
+) WITHOUT ROWID;
+CREATE TABLE trait_combo_keys (
+    item_hash INTEGER NOT NULL,
+    perk4_hash INTEGER NOT NULL,
+    perk5_hash INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (item_hash, perk4_hash, perk5_hash)
+) WITHOUT ROWID;
+CREATE TABLE mw_stats (
+    item_hash INTEGER NOT NULL,
+    perk_hash INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    show INTEGER NOT NULL,
+    PRIMARY KEY (item_hash, perk_hash)
+) WITHOUT ROWID;
+CREATE TABLE review_summary (
+    item_hash INTEGER PRIMARY KEY,
+    review_count INTEGER NOT NULL,
+    pve_avg REAL NOT NULL,
+    pvp_avg REAL NOT NULL,
+    overall_avg REAL NOT NULL
+);
+CREATE TABLE enhanced_perks (
+    standard_hash INTEGER PRIMARY KEY,
+    enhanced_hash INTEGER NOT NULL
+);
+"""
+
+def perk_rows(normalized):
+    for item_hash, perks in normalized.get('PerkStats', {}).items():
+        for perk_hash, (standard_hash, rank, count, perk_idx, enhanced_hash, show) in perks.items():
+            yield int(item_hash), int(perk_hash), standard_hash, rank, count, perk_idx, enhanced_hash, int(show)
+
+def trait_rows(normalized):
+    for item_hash, traits in normalized.get('TraitStats', {}).items():
+        for position, (perk4, perk4_enhanced, perk5, perk5_enhanced, count, show) in enumerate(traits):
+            yield (int(item_hash), position, position // COMBOS_PER_RANK + 1,
+                   perk4, perk4_enhanced, perk5, perk5_enhanced, count, int(show))
+
+def trait_key_rows(normalized):
+    """(item, perk4, perk5, position) for every hash pairing; the first combo in list order wins."""
+    for item_hash, traits in normalized.get('TraitStats', {}).items():
+        item = int(item_hash)
+        seen = set()
+        for position, (perk4, perk4_enhanced, perk5, perk5_enhanced, _, _) in enumerate(traits):
+            for column4 in {perk4, perk4_enhanced} - {0}:
+                for column5 in {perk5, perk5_enhanced} - {0}:
+                    if (column4, column5) not in seen:
+                        seen.add((column4, column5))
+                        yield item, column4, column5, position
+
+def mw_rows(normalized):
+    for item_hash, masterworks in normalized.get('MWStats', {}).items():
+        for perk_hash, (rank, count, show) in masterworks.items():
+            yield int(item_hash), int(perk_hash), rank, count, int(show)
+
+def review_rows(normalized):
+    for item_hash, (review_count, pve, pvp, overall) in normalized.get('ReviewSummary', {}).items():
+        yield int(item_hash), review_count, pve, pvp, overall
+
+def enhanced_rows(normalized):
+    for standard_hash, enhanced_hash in normalized.get('EnhancedPerks', {}).items():
+        yield int(standard_hash), enhanced_hash
+
+# table -> (row generator, column count)
+TABLE_ROWS = {
+    'perk_stats': (perk_rows, 8),
+    'trait_combos': (trait_rows, 9),
+    'trait_combo_keys': (trait_key_rows, 4),
+    'mw_stats': (mw_rows, 5),
+    'review_summary': (review_rows, 5),
+    'enhanced_perks': (enhanced_rows, 2),
+}
+
+def _remove_sidecars(path):
+    for suffix in ('-wal', '-shm', '-journal'):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+def build_database(normalized, db_path):
+    """Load `normalized` into a fresh database at `db_path`; return {table: row count}."""
+    db_path = Path(db_path)
+    temp_path = make_temp_path(db_path)
+    counts = {}
+    try:
+        conn = sqlite3.connect(temp_path, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("BEGIN")
+            # executescript() would commit first; run the DDL inside the load transaction instead
+            for statement in SCHEMA.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+            for table, (rows, column_count) in TABLE_ROWS.items():
+                # Sorting by primary key keeps the clustered B-trees append-only during the load
+                table_rows = sorted(rows(normalized))
+                placeholders = ', '.join('?' * column_count)
+                conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})", table_rows)
+                counts[table] = len(table_rows)
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ('schema', str(STORE_SCHEMA_VERSION)),
+                ('version', normalized.get('version') or ''),
+                ('built_at', datetime.now(timezone.utc).isoformat()),
+                # The server derives a combo's index within its rank from this
+                ('combos_per_rank', str(COMBOS_PER_RANK)),
+            ])
+            conn.execute("COMMIT")
+            conn.execute("ANALYZE")
+            # Fold the WAL into the main file so the renamed database is self-contained
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+        _remove_sidecars(temp_path)
+        os.replace(temp_path, db_path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        _remove_sidecars(temp_path)
+        raise
+    return counts
+
+def connect_readonly(db_path):
+    return sqlite3.connect(f"file:{Path(db_path).as_posix()}?mode=ro", uri=True)
+
+def read_meta(db_path):
+    """The meta table as a dict, or {} if the database is missing or unreadable."""
+    if not Path(db_path).exists():
+        return {}
+    try:
+        conn = connect_readonly(db_path)
+        try:
+            return dict(conn.execute("SELECT key, value FROM meta"))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return {}
+
+def verify(db_path, normalized):
+    """Compare row counts in the database against the normalized data.
+
+    Returns a list of human-readable mismatches; empty means every table is complete.
+    """
+    problems = []
+    conn = connect_readonly(db_path)
+    try:
+        version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if (version[0] if version else None) != (normalized.get('version') or ''):
+            problems.append(f"version: {version[0] if version else None!r} != {normalized.get('version')!r}")
+        for table, (rows, _) in TABLE_ROWS.items():
+            expected = sum(1 for _ in rows(normalized))
+            actual = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            if actual != expected:
+                problems.append(f"{table}: {actual} rows, expected {expected}")
+    finally:
+        conn.close()
+    return problems
+
+def main():
+    if len(sys.argv) != 4 or sys.argv[1] not in ('build', 'verify'):
+        print("Usage:")
+        print("  python light_sqlite.py build <normalized.json> <output.db>")
+        print("  python light_sqlite.py verify <normalized.json> <output.db>")
+        sys.exit(1)
+
+    command, json_path, db_path = sys.argv[1:]
+    with open(json_path, 'r', encoding='utf-8') as f:
+        normalized = json.load(f)
+
+    if command == 'build':
+        counts = build_database(normalized, db_path)
+        for table, count in counts.items():
+            print(f"  {table}: {count:,} rows")
+        print(f"Wrote {db_path} ({os.path.getsize(db_path) / 1024 / 1024:.2f} MB)")
+    else:
+        problems = verify(db_path, normalized)
+        for problem in problems:
+            print(f"✗ {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"✓ {db_path} matches {json_path}")
+
+if __name__ == "__main__":
+    main()
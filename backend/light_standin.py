@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Local light.gg Stand-in
+Serves a fixture file over HTTP so get_light.py's downloader can be exercised and
+benchmarked without the network. Every path returns the fixture, with ETag /
+Last-Modified validators, conditional 304s and single-range (bytes=N-) support.
+
+Failure modes (each applies to the first K requests, then the server behaves):
+    --fail K        respond with --fail-status (default 503)
+    --truncate K    close the connection after --truncate-at bytes of the body
+    --rate B        throttle every body to B bytes/s
+    --ttfb S        wait S seconds before sending any response
+
+Usage:
+    python light_standin.py <fixture.json> [--port 8765] [--encoding gzip|br] [--no-range]
+                            [--fail K] [--truncate K --truncate-at BYTES] [--rate BYTES_PER_S] [--ttfb S]
+
+    python get_light.py --url http://127.0.0.1:8765/data.json
+
+tests/test_light_download.py starts it in-process with serve(state, port=0).
+"""
+
+import argparse
+import gzip
+import hashlib
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+DEFAULT_PORT = 8765
+SEND_CHUNK = 16 * 1024
+
+class StandinState:
+    """Fixture body plus the counters that drive the failure modes."""
+
+    def __init__(self, fixture, encoding=None, allow_range=True, fail=0, fail_status=503,
+                 truncate=0, truncate_at=None, rate=None, ttfb=0.0):
+        raw = Path(fixture).read_bytes()
+        if encoding == 'gzip':
+            self.body = gzip.compress(raw, mtime=0)
+        elif encoding == 'br':
+            if not HAS_BROTLI:
+                raise RuntimeError("--encoding br requires the 'brotli' package (pip install brotli)")
+            self.body = brotli.compress(raw, quality=5)
+        else:
+            self.body = raw
+        self.encoding = encoding
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:16]}"'
+        self.last_modified = formatdate(Path(fixture).stat().st_mtime, usegmt=True)
+        self.allow_range = allow_range
+        self.fail = fail
+        self.fail_status = fail_status
+        self.truncate = truncate
+        self.truncate_at = truncate_at if truncate_at is not None else len(self.body) // 2
+        self.rate = rate
+        self.ttfb = ttfb
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def next_request(self):
+        with self.lock:
+            self.requests += 1
+            return self.requests
+
+def make_handler(state):
+    class StandinHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            number = state.next_request()
+            if state.ttfb:
+                time.sleep(state.ttfb)
+
+            if number <= state.fail:
+                self.send_response(state.fail_status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            if self.headers.get('If-None-Match') == state.etag:
+                self.send_response(304)
+                self.send_header('ETag', state.etag)
+                self.end_headers()
+                return
+
+            start = 0
+            range_header = self.headers.get('Range')
+            if_range = self.headers.get('If-Range')
+            if (range_header and state.allow_range and range_header.startswith('bytes=')
+                    and if_range in (None, state.etag, state.last_modified)):
+                start = int(range_header[len('bytes='):].split('-')[0] or 0)
+
+            if start >= len(state.body) > 0:
+                self.send_response(416)
+                self.send_header('Content-Range', f"bytes */{len(state.body)}")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            body = state.body[start:]
+            self.send_response(206 if start else 200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', state.etag)
+            self.send_header('Last-Modified', state.last_modified)
+            self.send_header('Accept-Ranges', 'bytes' if state.allow_range else 'none')
+            if start:
+                self.send_header('Content-Range', f"bytes {start}-{len(state.body) - 1}/{len(state.body)}")
+            if state.encoding:
+                self.send_header('Content-Encoding', state.encoding)
+            self.end_headers()
+
+            limit = len(body)
+            if number <= state.fail + state.truncate:
+                limit = min(limit, state.truncate_at)
+                self.close_connection = True
+
+            sent = 0
+            began = time.perf_counter()
+            while sent < limit:
+                chunk = body[sent:min(sent + SEND_CHUNK, limit)]
+                try:
+                    self.wfile.write(chunk)
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+                sent += len(chunk)
+                if state.rate:
+                    # Sleep until the average rate is back under the limit
+                    ahead = sent / state.rate - (time.perf_counter() - began)
+                    if ahead > 0:
+                        time.sleep(ahead)
+
+        def log_message(self, format, *args):
+            print(f"[standin] {self.address_string()} {format % args}")
+
+    return StandinHandler
+
+def serve(state, host='127.0.0.1', port=DEFAULT_PORT):
+    """Start the stand-in on a background thread; returns the server (call .shutdown() to stop)."""
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a roll appraiser fixture with simulated network faults.")
+    parser.add_argument('fixture', help="file to serve (e.g. a saved rollAppraiserData.json)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--encoding', choices=['gzip', 'br'], default=None,
+                        help="serve the fixture with this Content-Encoding")
+    parser.add_argument('--no-range', action='store_true', help="ignore Range headers")
+    parser.add_argument('--fail', type=int, default=0, metavar='K',
+                        help="answer the first K requests with --fail-status")
+    parser.add_argument('--fail-status', type=int, default=503)
+    parser.add_argument('--truncate', type=int, default=0, metavar='K',
+                        help="cut the body short on the K requests after the failed ones")
+    parser.add_argument('--truncate-at', type=int, default=None, metavar='BYTES',
+                        help="bytes of body to send before cutting (default: half)")
+    parser.add_argument('--rate', type=int, default=None, metavar='BYTES_PER_S',
+                        help="throttle bodies to this many bytes per second")
+    parser.add_argument('--ttfb', type=float, default=0.0, metavar='SECONDS',
+                        help="delay before every response")
+    args = parser.parse_args()
+
+    state = StandinState(args.fixture, args.encoding, not args.no_range, args.fail, args.fail_status,
+                         args.truncate, args.truncate_at, args.rate, args.ttfb)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"Serving {args.fixture} ({len(state.body):,} bytes) on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Light Artifact Precompressor
+Encodes every artifact under backend/light with brotli, gzip and zstd at a sweep of
+levels, runs the encodes on a process pool, and keeps the smallest output per
+encoding as <file>.br / <file>.gz / <file>.zst for the server to negotiate.
+
+The default sweep stops at brotli 9 and zstd 19, which keeps a refresh of the
+65 MB dataset to seconds; --exhaustive adds brotli 11 and zstd 22. Each source
+is read (or decoded from its .br/.gz) once and memory-mapped by the workers, so
+memory does not grow with --jobs.
+
+Sizes and encode times for every (codec, level) are recorded in
+backend/light/.precompress-report.json (dotfiles are not served). Sources whose
+size and mtime match the last report are skipped unless --force is given.
+
+Usage:
+    python precompress.py [directory] [--jobs N] [--br 5,9] [--gzip 6,9] [--zstd 3,19] [--exhaustive] [--force]
+"""
+
+import argparse
+import gzip
+import json
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+from light_files import ENCODED_SUFFIXES, atomic_write_bytes, make_temp_path
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+LIGHT_DIR = Path(__file__).resolve().parent / 'light'
+REPORT_NAME = '.precompress-report.json'
+
+# codec -> file suffix the server looks for
+SUFFIXES = {'br': '.br', 'gzip': '.gz', 'zstd': '.zst'}
+COMPRESSED_SUFFIXES = set(ENCODED_SUFFIXES)
+DEFAULT_LEVELS = {'br': [5, 9], 'gzip': [6, 9], 'zstd': [3, 19]}
+# Brotli 11 and zstd 22 take minutes on the full dataset for a few percent
+EXHAUSTIVE_LEVELS = {'br': [5, 9, 11], 'gzip': [6, 9], 'zstd': [3, 19, 22]}
+
+def available_codecs():
+    codecs = ['gzip']
+    if HAS_BROTLI:
+        codecs.insert(0, 'br')
+    if HAS_ZSTD:
+        codecs.append('zstd')
+    return codecs
+
+def compress(codec, level, data):
+    if codec == 'br':
+        # A 16 MiB window lets brotli find matches across the whole of our larger JSON files
+        return brotli.compress(data, quality=level, lgwin=24)
+    if codec == 'gzip':
+        return gzip.compress(data, level, mtime=0)
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    raise ValueError(f"Unknown codec {codec}")
+
+def read_source(source):
+    """Return the uncompressed bytes for `source`, decoding an existing variant if needed."""
+    if source.exists():
+        return source.read_bytes()
+
+    br_path = Path(f"{source}.br")
+    if br_path.exists() and HAS_BROTLI:
+        return brotli.decompress(br_path.read_bytes())
+    return gzip.decompress(Path(f"{source}.gz").read_bytes())
+
+def plain_source(source):
+    """Return (path, temp) where `path` holds the uncompressed bytes of `source`.
+
+    A source that only exists as a .br/.gz is decoded once into a dotfile temp
+    beside it (`temp` is that path, for the caller to delete; otherwise None).
+    """
+    if source.exists():
+        return source, None
+    temp_path = make_temp_path(source)
+    temp_path.write_bytes(read_source(source))
+    return temp_path, temp_path
+
+def encode_task(source, plain_path, codec, level):
+    """Worker: encode one (source, codec, level) into a temp file beside the final output.
+
+    The uncompressed bytes are memory-mapped from `plain_path`, so every worker
+    shares the same page-cache copy instead of holding its own.
+    """
+    with open(plain_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        with (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else memoryview(b'')) as data:
+            start = time.perf_counter()
+            compressed = compress(codec, level, data)
+            seconds = time.perf_counter() - start
+
+    temp_path = make_temp_path(Path(f"{source}{SUFFIXES[codec]}"))
+    temp_path.write_bytes(compressed)
+    return {
+        'codec': codec,
+        'level': level,
+        'bytes': len(compressed),
+        'seconds': round(seconds, 4),
+        'temp': str(temp_path),
+    }
+
+def find_sources(directory):
+    """Every artifact under `directory`, named by its uncompressed path.
+
+    Files that only exist pre-compressed (e.g. a --stream download or shards)
+    are included and decoded from their .br/.gz variant.
+    """
+    sources = set()
+    for path in directory.rglob('*'):
+        if not path.is_file() or path.name.startswith('.'):
+            continue
+        if path.suffix in COMPRESSED_SUFFIXES:
+            base = path.with_suffix('')
+            if path.suffix == '.zst' and not base.exists():
+                continue
+            sources.add(base)
+        else:
+            sources.add(path)
+    return sorted(sources)
+
+def source_signature(source):
+    """[size, mtime_ns, name] of whichever file the source bytes come from."""
+    for candidate in (source, Path(f"{source}.br"), Path(f"{source}.gz")):
+        if candidate.exists():
+            stat = candidate.stat()
+            return [stat.st_size, stat.st_mtime_ns, candidate.name]
+    return None
+
+def load_report(directory):
+    try:
+        with open(directory / REPORT_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'files': {}}
+
+def precompress_dir(directory=LIGHT_DIR, levels=None, jobs=None, force=False, exhaustive=False):
+    """Precompress every artifact in `directory` and return the report dict.
+
+    `levels` defaults to DEFAULT_LEVELS, or EXHAUSTIVE_LEVELS with `exhaustive`.
+    """
+    directory = Path(directory)
+    levels = levels or (EXHAUSTIVE_LEVELS if exhaustive else DEFAULT_LEVELS)
+    codecs = [codec for codec in available_codecs() if levels.get(codec)]
+    if not HAS_BROTLI:
+        print("Note: 'brotli' not installed, skipping .br variants (pip install brotli)")
+    if not HAS_ZSTD:
+        print("Note: 'zstandard' not installed, skipping .zst variants (pip install zstandard)")
+
+    report = load_report(directory)
+    pending = []
+    for source in find_sources(directory):
+        relative = source.relative_to(directory).as_posix()
+        signature = source_signature(source)
+        previous = report['files'].get(relative)
+        up_to_date = (
+            previous
+            and previous.get('signature') == signature
+            and all(
+                codec in previous['best']
+                and (previous['best'][codec] is None or Path(f"{source}{SUFFIXES[codec]}").exists())
+                for codec in codecs
+            )
+        )
+        if up_to_date and not force:
+            print(f"Up to date: {relative}")
+            continue
+        pending.append(source)
+
+    if not pending:
+        return report
+
+    plain_paths = {}
+    decoded_temps = []
+    try:
+        for source in pending:
+            plain_paths[source], temp_path = plain_source(source)
+            if temp_path:
+                decoded_temps.append(temp_path)
+
+        # Submit the big, high-level encodes first so they don't end up as stragglers
+        tasks = sorted(
+            ((source, plain_paths[source], codec, level)
+             for source in pending for codec in codecs for level in levels[codec]),
+            key=lambda task: (-task[1].stat().st_size, -task[3]),
+        )
+        results = {source: [] for source in pending}
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {executor.submit(encode_task, *task): task[0] for task in tasks}
+            for future in as_completed(futures):
+                results[futures[future]].append(future.result())
+        source_sizes = {source: plain_paths[source].stat().st_size for source in pending}
+    finally:
+        for temp_path in decoded_temps:
+            temp_path.unlink(missing_ok=True)
+
+    for source in pending:
+        relative = source.relative_to(directory).as_posix()
+        source_bytes = source_sizes[source]
+        signature = source_signature(source)
+        entry = {'source_bytes': source_bytes, 'signature': signature, 'results': [], 'best': {}}
+
+        for codec in codecs:
+            candidates = sorted(
+                (result for result in results[source] if result['codec'] == codec),
+                key=lambda result: (result['bytes'], result['seconds']),
+            )
+            best = candidates[0]
+            output = Path(f"{source}{SUFFIXES[codec]}")
+            # Tiny files can grow when compressed; serving those would cost bytes, not save them
+            if best['bytes'] >= source_bytes and source.exists():
+                output.unlink(missing_ok=True)
+                entry['best'][codec] = None
+            else:
+                os.replace(best['temp'], output)
+                entry['best'][codec] = {'level': best['level'], 'bytes': best['bytes']}
+            # The winner's temp file is gone after os.replace; every other one is left over
+            for candidate in candidates:
+                Path(candidate['temp']).unlink(missing_ok=True)
+
+        # A variant this run could not re-encode (codec missing or disabled) holds old content
+        for codec, suffix in SUFFIXES.items():
+            if codec not in codecs:
+                Path(f"{source}{suffix}").unlink(missing_ok=True)
+
+        # When the source was only available as one of the variants we just replaced
+        # (e.g. a --stream download), record the signature of the new file instead
+        if signature[2] != source.name:
+            entry['signature'] = source_signature(source)
+        entry['results'] = sorted(
+            ({key: value for key, value in result.items() if key != 'temp'} for result in results[source]),
+            key=lambda result: (result['codec'], result['level']),
+        )
+        report['files'][relative] = entry
+        print_entry(relative, entry)
+
+    report['generated_at'] = datetime.now(timezone.utc).isoformat()
+    atomic_write_bytes(directory / REPORT_NAME, json.dumps(report, indent=2).encode('utf-8'))
+    return report
+
+def print_entry(relative, entry):
+    print(f"\n{relative} ({entry['source_bytes']:,} bytes)")
+    for result in entry['results']:
+        best = (entry['best'][result['codec']] or {}).get('level') == result['level']
+        ratio = result['bytes'] / entry['source_bytes'] * 100 if entry['source_bytes'] else 0
+        print(f"  {'*' if best else ' '} {result['codec']:<4} {result['level']:>2}: "
+              f"{result['bytes']:>12,} bytes ({ratio:5.1f}%) in {result['seconds']:.2f}s")
+
+def parse_levels(value):
+    return [int(level) for level in value.split(',') if level.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompress backend/light artifacts with br, gzip and zstd.")
+    parser.add_argument('directory', nargs='?', default=str(LIGHT_DIR),
+                        help="directory to precompress (default: backend/light)")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument('--br', type=parse_levels, default=None,
+                        help="comma-separated brotli qualities to try (default: 5,9)")
+    parser.add_argument('--gzip', type=parse_levels, default=None,
+                        help="comma-separated gzip levels to try (default: 6,9)")
+    parser.add_argument('--zstd', type=parse_levels, default=None,
+                        help="comma-separated zstd levels to try (default: 3,19)")
+    parser.add_argument('--exhaustive', action='store_true',
+                        help="default to the slow full sweep: brotli 5,9,11, gzip 6,9, zstd 3,19,22")
+    parser.add_argument('--force', action='store_true',
+                        help="re-encode sources even if they are unchanged since the last run")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    defaults = EXHAUSTIVE_LEVELS if args.exhaustive else DEFAULT_LEVELS
+    levels = {codec: getattr(args, codec) or defaults[codec] for codec in SUFFIXES}
+    precompress_dir(Path(args.directory), levels, args.jobs, args.force)
+    print(f"\nPrecompression finished in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Roll Appraiser Query Engine
+Python counterpart of src/app/utils/rollAppraiserUtils.ts for backend and batch
+jobs. Loads the normalized dataset (see light_normalize) once into keyed indexes
+so every lookup is a single dict hit, and puts an LRU cache in front of the
+composite weapon ranking.
+
+Usage:
+    python roll_appraiser.py <itemHash> [perkHash ...] [--mw <masterworkHash>] [--data <path>]
+"""
+
+import argparse
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
+
+import light_normalize
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+LIGHT_DIR = Path(__file__).resolve().parent / 'light'
+NORMALIZED_PATH = LIGHT_DIR / 'rollAppraiserData.normalized.json'
+DEFAULT_CACHE_SIZE = 4096
+
+class PerkRank(NamedTuple):
+    rank: int
+    count: int
+    perk_hash: int
+    perk_enhanced_hash: Optional[int]
+    show: bool
+    perk_index: Optional[int] = None
+
+class TraitComboRank(NamedTuple):
+    rank: int
+    index_in_rank: int
+    count: int
+    perk4_hash: int
+    perk4_enhanced_hash: Optional[int]
+    perk5_hash: int
+    perk5_enhanced_hash: Optional[int]
+    show: bool
+
+class ReviewSummary(NamedTuple):
+    review_count: int
+    pve_average: float
+    pvp_average: float
+    overall_average: float
+
+class WeaponPerkRank(NamedTuple):
+    perk_hash: int
+    rank: int
+    count: int
+    perk_enhanced_hash: Optional[int]
+    show: bool
+
+class WeaponRanking(NamedTuple):
+    item_hash: int
+    perk_rankings: Tuple[WeaponPerkRank, ...]
+    trait_combo_ranking: Optional[TraitComboRank]
+    masterwork_ranking: Optional[PerkRank]
+    review_summary: Optional[ReviewSummary]
+
+def load_dataset(path=NORMALIZED_PATH):
+    """Load a normalized (or raw light.gg) dataset from .json or .json.br and return it normalized."""
+    path = Path(path)
+    if path.suffix == '.br':
+        if not HAS_BROTLI:
+            raise RuntimeError("Reading .br files requires the 'brotli' package (pip install brotli)")
+        data = json.loads(brotli.decompress(path.read_bytes()))
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+    if data.get('schema') != light_normalize.SCHEMA_VERSION:
+        data = light_normalize.normalize(data)
+    return data
+
+def _optional_hash(value):
+    return value or None
+
+class RollAppraiser:
+    """Keyed indexes over one normalized dataset.
+
+    Hashes may be passed as ints or numeric strings, like the TypeScript API.
+    """
+
+    def __init__(self, data, cache_size=DEFAULT_CACHE_SIZE):
+        self.version = data.get('version')
+        self.perks = {}
+        self.traits = {}
+        self.masterworks = {}
+        self.reviews = {}
+
+        for item_hash, perks in data['PerkStats'].items():
+            item = int(item_hash)
+            for perk_hash, row in perks.items():
+                self.perks[item, int(perk_hash)] = PerkRank(
+                    rank=row[1],
+                    count=row[2],
+                    perk_hash=row[0],
+                    perk_enhanced_hash=_optional_hash(row[4]),
+                    show=row[5],
+                    perk_index=row[3] or None,
+                )
+
+        for item_hash, traits in data['TraitStats'].items():
+            item = int(item_hash)
+            for position, (perk4, perk4_enhanced, perk5, perk5_enhanced, count, show) in enumerate(traits):
+                combo = TraitComboRank(
+                    rank=position // light_normalize.COMBOS_PER_RANK + 1,
+                    index_in_rank=position % light_normalize.COMBOS_PER_RANK,
+                    count=count,
+                    perk4_hash=perk4,
+                    perk4_enhanced_hash=_optional_hash(perk4_enhanced),
+                    perk5_hash=perk5,
+                    perk5_enhanced_hash=_optional_hash(perk5_enhanced),
+                    show=show,
+                )
+                # Either hash of each column matches; the first combo in list order wins
+                for column4 in {perk4, perk4_enhanced} - {0}:
+                    for column5 in {perk5, perk5_enhanced} - {0}:
+                        self.traits.setdefault((item, column4, column5), combo)
+
+        for item_hash, masterworks in data['MWStats'].items():
+            item = int(item_hash)
+            for perk_hash, (rank, count, show) in masterworks.items():
+                self.masterworks[item, int(perk_hash)] = PerkRank(
+                    rank=rank,
+                    count=count,
+                    perk_hash=int(perk_hash),
+                    perk_enhanced_hash=None,
+                    show=show,
+                )
+
+        for item_hash, (review_count, pve, pvp, overall) in data['ReviewSummary'].items():
+            self.reviews[int(item_hash)] = ReviewSummary(review_count, pve, pvp, overall)
+
+        self.items = (
+            {item for item, _ in self.perks}
+            | {item for item, _, _ in self.traits}
+            | {item for item, _ in self.masterworks}
+            | set(self.reviews)
+        )
+        self._cached_weapon_ranking = lru_cache(maxsize=cache_size)(self._weapon_ranking)
+
+    @classmethod
+    def from_file(cls, path=NORMALIZED_PATH, cache_size=DEFAULT_CACHE_SIZE):
+        return cls(load_dataset(path), cache_size)
+
+    def get_perk_rank(self, item_hash, perk_hash):
+        """Ranking of one perk on one weapon.
+
+        Enhanced perks resolve to their standard row through the EnhancedPerks
+        mapping only, as in RollAppraiserUtils.getPerkRank.
+        """
+        return self.perks.get((int(item_hash), int(perk_hash)))
+
+    def get_mw_rank(self, item_hash, mw_perk_hash):
+        return self.masterworks.get((int(item_hash), int(mw_perk_hash)))
+
+    def get_trait_combo_rank(self, item_hash, perk4_hash, perk5_hash):
+        return self.traits.get((int(item_hash), int(perk4_hash), int(perk5_hash)))
+
+    def get_review_summary(self, item_hash):
+        return self.reviews.get(int(item_hash))
+
+    def has_data_for_weapon(self, item_hash):
+        return int(item_hash) in self.items
+
+    def get_weapon_ranking(self, item_hash, perk_hashes=(), mw_hash=None):
+        """All rankings for one roll, mirroring RollAppraiserUtils.getWeaponData.
+
+        The last two perk hashes are treated as the trait columns. Results are
+        cached per (item, perks, masterwork).
+        """
+        return self._cached_weapon_ranking(
+            int(item_hash),
+            tuple(int(perk_hash) for perk_hash in perk_hashes),
+            int(mw_hash) if mw_hash else None,
+        )
+
+    def cache_info(self):
+        return self._cached_weapon_ranking.cache_info()
+
+    def _weapon_ranking(self, item_hash, perk_hashes, mw_hash):
+        perk_rankings = []
+        for perk_hash in perk_hashes:
+            perk_rank = self.perks.get((item_hash, perk_hash))
+            if perk_rank:
+                perk_rankings.append(WeaponPerkRank(
+                    perk_hash=perk_hash,
+                    rank=perk_rank.rank,
+                    count=perk_rank.count,
+                    perk_enhanced_hash=perk_rank.perk_enhanced_hash,
+                    show=perk_rank.show,
+                ))
+
+        trait_combo = None
+        if len(perk_hashes) >= 2:
+            trait_combo = self.traits.get((item_hash, perk_hashes[-2], perk_hashes[-1]))
+
+        return WeaponRanking(
+            item_hash=item_hash,
+            perk_rankings=tuple(perk_rankings),
+            trait_combo_ranking=trait_combo,
+            masterwork_ranking=self.masterworks.get((item_hash, mw_hash)) if mw_hash else None,
+            review_summary=self.reviews.get(item_hash),
+        )
+
+def to_jsonable(value):
+    """Recursively turn the NamedTuple results into plain dicts/lists for printing."""
+    if hasattr(value, '_asdict'):
+        return {key: to_jsonable(field) for key, field in value._asdict().items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(field) for field in value]
+    return value
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up roll appraiser rankings for one weapon roll.")
+    parser.add_argument('item_hash', type=int)
+    parser.add_argument('perk_hashes', type=int, nargs='*',
+                        help="perk hashes in column order; the last two are the trait columns")
+    parser.add_argument('--mw', type=int, default=None, help="masterwork plug hash")
+    parser.add_argument('--data', default=str(NORMALIZED_PATH),
+                        help="normalized or raw dataset (.json or .json.br)")
+    args = parser.parse_args()
+
+    appraiser = RollAppraiser.from_file(args.data)
+    ranking = appraiser.get_weapon_ranking(args.item_hash, args.perk_hashes, args.mw)
+    print(json.dumps(to_jsonable(ranking), indent=2))
+
+if __name__ == "__main__":
+    main()
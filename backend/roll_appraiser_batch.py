@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Batch Roll Appraiser
+Scores thousands of weapon rolls in one NumPy pass. Every lookup table is a sorted
+uint64 composite key array, and each batch is joined against it with
+np.searchsorted, so cost grows with the batch size rather than with Python-level
+dict walks. Semantics match roll_appraiser.RollAppraiser (and RollAppraiserUtils).
+
+Input JSONL (one profile per line):
+    {"profile": "...", "items": [{"itemHash": 123, "perks": [p1, p2, ...], "masterwork": 456}, ...]}
+
+Output JSONL (one line per input line):
+    {"profile": "...", "items": [{"itemHash", "perkRanks", "perkCounts", "traitRank", "traitCount",
+                                  "masterworkRank", "masterworkCount"}, ...]}
+Missing rankings are null.
+
+Usage:
+    python roll_appraiser_batch.py <inventories.jsonl> [-o scores.jsonl] [--data <path>] [--batch-rows N]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+import light_binary
+from light_normalize import COMBOS_PER_RANK
+from roll_appraiser import LIGHT_DIR, NORMALIZED_PATH, load_dataset
+
+BINARY_PATH = LIGHT_DIR / 'rollAppraiserData.bin'
+DEFAULT_BATCH_ROWS = 50_000
+
+# Trait keys pack (item index, perk4 id, perk5 id) into one uint64
+TRAIT_ITEM_SHIFT = 48
+TRAIT_PERK_SHIFT = 24
+
+class BatchResult(NamedTuple):
+    """Per-roll results. Where a *_found mask is False there is no data and the
+    rank and count are 0; elsewhere 0 is a real value."""
+    perk_rank: np.ndarray          # (n, k) int32
+    perk_count: np.ndarray         # (n, k) int64
+    perk_found: np.ndarray         # (n, k) bool
+    trait_rank: np.ndarray         # (n,) int32
+    trait_count: np.ndarray        # (n,) int64
+    trait_found: np.ndarray        # (n,) bool
+    masterwork_rank: np.ndarray    # (n,) int32
+    masterwork_count: np.ndarray   # (n,) int64
+    masterwork_found: np.ndarray   # (n,) bool
+
+def _lookup(sorted_keys, query_keys, valid):
+    """Join `query_keys` against `sorted_keys`; return (positions, found mask)."""
+    if len(sorted_keys) == 0:
+        return np.zeros(query_keys.shape, dtype=np.intp), np.zeros(query_keys.shape, dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_keys, query_keys), len(sorted_keys) - 1)
+    return positions, valid & (sorted_keys[positions] == query_keys)
+
+def _gather(values, positions, found, dtype):
+    return np.where(found, values[positions], 0).astype(dtype)
+
+class BatchAppraiser:
+    def __init__(self, columnar):
+        columns = columnar.columns
+        self.version = columnar.version
+        self.item_hashes = columns['itemHash'].astype(np.uint64)
+
+        def rows_to_items(table):
+            offsets = columns[f"{table}.offsets"].astype(np.int64)
+            return np.repeat(np.arange(len(self.item_hashes), dtype=np.uint64), np.diff(offsets)), offsets
+
+        # (item index << 32 | perk hash) for perks (enhanced aliases included) and masterworks
+        perk_items, _ = rows_to_items('PerkStats')
+        perk_keys = (perk_items << np.uint64(32)) | columns['PerkStats.key'].astype(np.uint64)
+        order = np.argsort(perk_keys, kind='stable')
+        self.perk_keys = perk_keys[order]
+        self.perk_rank = columns['PerkStats.rank'][order].astype(np.int32)
+        self.perk_count = columns['PerkStats.count'][order].astype(np.int64)
+
+        mw_items, _ = rows_to_items('MWStats')
+        mw_keys = (mw_items << np.uint64(32)) | columns['MWStats.key'].astype(np.uint64)
+        order = np.argsort(mw_keys, kind='stable')
+        self.mw_keys = mw_keys[order]
+        self.mw_rank = columns['MWStats.rank'][order].astype(np.int32)
+        self.mw_count = columns['MWStats.count'][order].astype(np.int64)
+
+        self._build_trait_index(columns, *rows_to_items('TraitStats'))
+
+    def _build_trait_index(self, columns, trait_items, offsets):
+        perk4 = columns['TraitStats.perk4Hash'].astype(np.uint64)
+        perk4_enhanced = columns['TraitStats.perk4EnhancedHash'].astype(np.uint64)
+        perk5 = columns['TraitStats.perk5Hash'].astype(np.uint64)
+        perk5_enhanced = columns['TraitStats.perk5EnhancedHash'].astype(np.uint64)
+
+        # Trait perk hashes are remapped to dense ids so three fields fit in 64 bits
+        all_perks = np.concatenate([perk4, perk4_enhanced, perk5, perk5_enhanced])
+        self.trait_perks = np.unique(all_perks[all_perks != 0])
+        if len(self.item_hashes) >= 1 << (64 - TRAIT_ITEM_SHIFT) or len(self.trait_perks) >= 1 << TRAIT_PERK_SHIFT:
+            raise ValueError("Dataset too large for the packed trait key layout")
+
+        def perk_ids(hashes):
+            return np.searchsorted(self.trait_perks, hashes).astype(np.uint64)
+
+        # Each row matches on either hash of each column: four candidate keys per row,
+        # laid out row-major so the first occurrence of a key is the earliest row
+        column4 = np.stack([perk4, perk4, perk4_enhanced, perk4_enhanced], axis=1)
+        column5 = np.stack([perk5, perk5_enhanced, perk5, perk5_enhanced], axis=1)
+        keys = (
+            (trait_items[:, None] << np.uint64(TRAIT_ITEM_SHIFT))
+            | (perk_ids(column4) << np.uint64(TRAIT_PERK_SHIFT))
+            | perk_ids(column5)
+        ).ravel()
+        valid = ((column4 != 0) & (column5 != 0)).ravel()
+        flat_positions = np.flatnonzero(valid)
+
+        self.trait_keys, first = np.unique(keys[valid], return_index=True)
+        rows = flat_positions[first] // 4
+        position_in_item = rows - offsets[trait_items[rows].astype(np.int64)]
+        self.trait_rank = (position_in_item // COMBOS_PER_RANK + 1).astype(np.int32)
+        self.trait_count = columns['TraitStats.count'][rows].astype(np.int64)
+
+    @classmethod
+    def from_file(cls, path=None):
+        """Load from rollAppraiserData.bin (memory-mapped) or any dataset roll_appraiser can read."""
+        if path is None:
+            path = BINARY_PATH if BINARY_PATH.exists() else NORMALIZED_PATH
+        path = Path(path)
+        if path.suffix == '.bin':
+            return cls(light_binary.ColumnarData(path))
+        return cls(light_binary.ColumnarData(light_binary.encode(load_dataset(path))))
+
+    def appraise(self, item_hashes, perk_hashes, masterwork_hashes=None, perk_lengths=None):
+        """Score a batch of rolls.
+
+        item_hashes: (n,) item hashes.
+        perk_hashes: (n, k) perk hashes in column order, left-aligned and padded.
+        masterwork_hashes: optional (n,) masterwork plug hashes, 0 for none.
+        perk_lengths: optional (n,) number of perk columns in each row (default: k).
+            As in RollAppraiser.get_weapon_ranking, the last two columns of a row
+            are its trait columns, whatever hashes they hold.
+        """
+        item_hashes = np.asarray(item_hashes, dtype=np.uint64)
+        perk_hashes = np.asarray(perk_hashes, dtype=np.uint64).reshape(len(item_hashes), -1)
+        rows = np.arange(len(item_hashes))
+        if perk_lengths is None:
+            perk_lengths = np.full(len(item_hashes), perk_hashes.shape[1], dtype=np.int64)
+        perk_lengths = np.minimum(np.asarray(perk_lengths, dtype=np.int64), perk_hashes.shape[1])
+
+        item_positions, item_found = _lookup(self.item_hashes, item_hashes, np.ones(len(item_hashes), dtype=bool))
+        item_index = item_positions.astype(np.uint64)
+
+        in_roll = np.arange(perk_hashes.shape[1])[None, :] < perk_lengths[:, None]
+        perk_query = (item_index[:, None] << np.uint64(32)) | perk_hashes
+        positions, perk_found = _lookup(self.perk_keys, perk_query, item_found[:, None] & in_roll)
+        perk_rank = _gather(self.perk_rank, positions, perk_found, np.int32)
+        perk_count = _gather(self.perk_count, positions, perk_found, np.int64)
+
+        has_traits = perk_lengths >= 2
+        perk4 = perk_hashes[rows, np.maximum(perk_lengths - 2, 0)]
+        perk5 = perk_hashes[rows, np.maximum(perk_lengths - 1, 0)]
+        perk4_positions, perk4_found = _lookup(self.trait_perks, perk4, has_traits)
+        perk5_positions, perk5_found = _lookup(self.trait_perks, perk5, has_traits)
+        trait_query = (
+            (item_index << np.uint64(TRAIT_ITEM_SHIFT))
+            | (perk4_positions.astype(np.uint64) << np.uint64(TRAIT_PERK_SHIFT))
+            | perk5_positions.astype(np.uint64)
+        )
+        positions, trait_found = _lookup(self.trait_keys, trait_query, item_found & perk4_found & perk5_found)
+        trait_rank = _gather(self.trait_rank, positions, trait_found, np.int32)
+        trait_count = _gather(self.trait_count, positions, trait_found, np.int64)
+
+        if masterwork_hashes is None:
+            masterwork_hashes = np.zeros(len(item_hashes), dtype=np.uint64)
+        masterwork_hashes = np.asarray(masterwork_hashes, dtype=np.uint64)
+        mw_query = (item_index << np.uint64(32)) | masterwork_hashes
+        positions, masterwork_found = _lookup(self.mw_keys, mw_query, item_found & (masterwork_hashes != 0))
+        masterwork_rank = _gather(self.mw_rank, positions, masterwork_found, np.int32)
+        masterwork_count = _gather(self.mw_count, positions, masterwork_found, np.int64)
+
+        return BatchResult(perk_rank, perk_count, perk_found, trait_rank, trait_count, trait_found,
+                           masterwork_rank, masterwork_count, masterwork_found)
+
+def score_profiles(appraiser, profiles):
+    """Score a list of parsed JSONL profiles in a single appraise() call."""
+    items = [item for profile in profiles for item in profile.get('items', [])]
+    width = max((len(item.get('perks') or []) for item in items), default=0)
+
+    item_hashes = np.zeros(len(items), dtype=np.uint64)
+    perk_hashes = np.zeros((len(items), max(width, 1)), dtype=np.uint64)
+    masterwork_hashes = np.zeros(len(items), dtype=np.uint64)
+    perk_lengths = np.zeros(len(items), dtype=np.int64)
+    for row, item in enumerate(items):
+        item_hashes[row] = int(item['itemHash'])
+        perks = [int(perk) for perk in item.get('perks') or []]
+        perk_hashes[row, :len(perks)] = perks
+        perk_lengths[row] = len(perks)
+        masterwork_hashes[row] = int(item.get('masterwork') or 0)
+
+    # Convert to Python lists once; per-element NumPy scalar access dominates otherwise
+    result = BatchResult(*(column.tolist() for column in
+                           appraiser.appraise(item_hashes, perk_hashes, masterwork_hashes, perk_lengths)))
+
+    def nullable(value, found):
+        return value if found else None
+
+    row = 0
+    scored = []
+    for profile in profiles:
+        scored_items = []
+        for item in profile.get('items', []):
+            perk_count = len(item.get('perks') or [])
+            scored_items.append({
+                'itemHash': int(item['itemHash']),
+                'perkRanks': [nullable(rank, found) for rank, found
+                              in zip(result.perk_rank[row][:perk_count], result.perk_found[row])],
+                'perkCounts': [nullable(count, found) for count, found
+                               in zip(result.perk_count[row][:perk_count], result.perk_found[row])],
+                'traitRank': nullable(result.trait_rank[row], result.trait_found[row]),
+                'traitCount': nullable(result.trait_count[row], result.trait_found[row]),
+                'masterworkRank': nullable(result.masterwork_rank[row], result.masterwork_found[row]),
+                'masterworkCount': nullable(result.masterwork_count[row], result.masterwork_found[row]),
+            })
+            row += 1
+        scored.append({'profile': profile.get('profile'), 'items': scored_items})
+    return scored
+
+def iter_batches(lines, batch_rows):
+    """Group parsed profiles so each batch holds roughly `batch_rows` rolls."""
+    batch, rows = [], 0
+    for line in lines:
+        if not line.strip():
+            continue
+        profile = json.loads(line)
+        batch.append(profile)
+        rows += len(profile.get('items', []))
+        if rows >= batch_rows:
+            yield batch
+            batch, rows = [], 0
+    if batch:
+        yield batch
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a JSONL dump of inventories against roll appraiser data.")
+    parser.add_argument('input', help="inventories JSONL ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="scores JSONL (default: stdout)")
+    parser.add_argument('--data', default=None,
+                        help="rollAppraiserData.bin, or a normalized/raw .json(.br) (default: backend/light)")
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS,
+                        help=f"rolls per vectorized pass (default: {DEFAULT_BATCH_ROWS})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    appraiser = BatchAppraiser.from_file(args.data)
+    load_seconds = time.perf_counter() - start
+
+    source = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    profiles = rolls = 0
+    start = time.perf_counter()
+    try:
+        for batch in iter_batches(source, args.batch_rows):
+            for scored in score_profiles(appraiser, batch):
+                sink.write(json.dumps(scored, separators=(',', ':')) + '\n')
+                profiles += 1
+                rolls += len(scored['items'])
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    seconds = time.perf_counter() - start
+    print(f"Loaded data in {load_seconds:.2f}s; scored {profiles} profiles ({rolls} rolls) in {seconds:.2f}s "
+          f"({profiles / seconds if seconds else 0:.0f} profiles/s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,6 @@ import bodyParser from 'body-parser';
 import cors from 'cors';
 import crypto from 'crypto';
 import express from 'express';
-import expressStaticGzip from 'express-static-gzip';
 import fs from 'fs';
 import https from 'https';
 import path from 'path';
@@ -464,28 +463,76 @@ const apiRouter = express.Router();
 app.use('/api', apiRouter);
 
 // Serve static files with compression support
-app.use(
-  '/backend/light',
-  expressStaticGzip(path.join(__dirname, 'light'), {
-    enableBrotli: true,
-    orderPreference: ['br'],
-    customCompressions: [
-      {
-        encodingName: 'br',
-        fileExtension: 'br',
-      },
-    ],
-    setHeaders: (res, reqPath) => {
-      // Set cache headers for the large JSON file
-      if (reqPath.includes('rollAppraiserData.json')) {
-        res.setHeader('Cache-Control', 'public, max-age=86400'); // 24 hours
-        console.log(
-          `📦 Serving ${reqPath} - Content-Encoding: ${res.getHeader('Content-Encoding') || 'none'}`,
-        );
+const lightDir = path.join(__dirname, 'light');
+// Pre-compressed variants written by get_light.py / precompress.py, in preference order
+const LIGHT_ENCODINGS = [
+  { name: 'br', suffix: '.br' },
+  { name: 'zstd', suffix: '.zst' },
+  { name: 'gzip', suffix: '.gz' },
+];
+
+const setLightCacheHeaders = (res, filePath) => {
+  // Set cache headers for the large JSON file
+  if (filePath.includes('rollAppraiserData.json')) {
+    res.setHeader('Cache-Control', 'public, max-age=86400'); // 24 hours
+    console.log(`📦 Serving ${filePath} - Content-Encoding: ${res.getHeader('Content-Encoding') || 'none'}`);
+  } else if (/[\\/](shards|snapshots)[\\/]/.test(filePath)) {
+    // Shard URLs carry a ?v=<content hash> from the manifest and snapshot/patch names
+    // include their version, so neither changes in place; the manifests themselves
+    // have to be revalidated to pick up new versions.
+    res.setHeader(
+      'Cache-Control',
+      filePath.includes('manifest.json') ? 'no-cache' : 'public, max-age=31536000, immutable',
+    );
+  }
+};
+
+// Encoded variants are looked up on every request instead of being indexed once at
+// startup, so shards, snapshots and patches published while the server is running are
+// negotiated right away and a variant removed by a refresh is never advertised.
+app.use('/backend/light', async (req, res, next) => {
+  if (req.method !== 'GET' && req.method !== 'HEAD') {
+    return next();
+  }
+
+  let relativePath;
+  try {
+    relativePath = decodeURIComponent(req.path);
+  } catch {
+    return next();
+  }
+  const filePath = path.join(lightDir, relativePath);
+  if (!filePath.startsWith(lightDir + path.sep) || relativePath.split('/').some((part) => part.startsWith('.'))) {
+    return next();
+  }
+
+  res.vary('Accept-Encoding');
+  for (const { name, suffix } of LIGHT_ENCODINGS) {
+    if (!req.acceptsEncodings(name)) {
+      continue;
+    }
+    const variantPath = filePath + suffix;
+    try {
+      if (!(await fs.promises.stat(variantPath)).isFile()) {
+        continue;
       }
-    },
-  }),
-);
+    } catch {
+      continue;
+    }
+
+    // send() keeps a Content-Type that is already set, so the variant is typed as the original
+    res.type(path.extname(filePath));
+    res.setHeader('Content-Encoding', name);
+    setLightCacheHeaders(res, filePath);
+    return res.sendFile(variantPath, (err) => {
+      if (err && !res.headersSent) {
+        next(err);
+      }
+    });
+  }
+  return next();
+});
+app.use('/backend/light', express.static(lightDir, { setHeaders: setLightCacheHeaders }));
 
 // Mock endpoint for /platform_info - does not require authentication
 apiRouter.get('/platform_info', (_req, res) => {
@@ -696,6 +743,138 @@ apiRouter.get('/loadout_share', (req, res) => {
   }
 });
 
+// Roll appraiser store written by `python get_light.py --sqlite`. Refreshes rename a new
+// file over it, so reopen whenever the file on disk is no longer the one we have open.
+const rollAppraiserDbPath = path.join(__dirname, 'rollAppraiser.db');
+let rollAppraiserDb = null;
+let rollAppraiserDbStat = null;
+let rollAppraiserQueries = null;
+
+function getRollAppraiserQueries() {
+  let stat;
+  try {
+    stat = fs.statSync(rollAppraiserDbPath);
+  } catch {
+    return null;
+  }
+
+  if (
+    !rollAppraiserDb ||
+    stat.ino !== rollAppraiserDbStat.ino ||
+    stat.mtimeMs !== rollAppraiserDbStat.mtimeMs
+  ) {
+    rollAppraiserDb?.close();
+    rollAppraiserDb = new Database(rollAppraiserDbPath, { readonly: true, fileMustExist: true });
+    rollAppraiserDbStat = stat;
+    // Written by light_sqlite from light_normalize.COMBOS_PER_RANK so the grouping lives in one place
+    const combosPerRank = Number(
+      rollAppraiserDb.prepare("SELECT value FROM meta WHERE key = 'combos_per_rank'").get()?.value,
+    );
+    if (!Number.isInteger(combosPerRank) || combosPerRank < 1) {
+      console.error(
+        `${rollAppraiserDbPath} has no combos_per_rank; rebuild it with \`python get_light.py --sqlite\``,
+      );
+      rollAppraiserQueries = null;
+      return null;
+    }
+    rollAppraiserQueries = {
+      combosPerRank,
+      perk: rollAppraiserDb.prepare(`
+        SELECT rank, count, enhanced_hash AS perkEnhancedHash, show
+        FROM perk_stats WHERE item_hash = ? AND perk_hash = ?
+      `),
+      traitCombo: rollAppraiserDb.prepare(`
+        SELECT t.position, t.rank, t.count, t.perk4_hash AS perk4Hash,
+          t.perk4_enhanced_hash AS perk4EnhancedHash, t.perk5_hash AS perk5Hash,
+          t.perk5_enhanced_hash AS perk5EnhancedHash, t.show
+        FROM trait_combo_keys k
+        JOIN trait_combos t ON t.item_hash = k.item_hash AND t.position = k.position
+        WHERE k.item_hash = ? AND k.perk4_hash = ? AND k.perk5_hash = ?
+      `),
+      masterwork: rollAppraiserDb.prepare(`
+        SELECT rank, count, show FROM mw_stats WHERE item_hash = ? AND perk_hash = ?
+      `),
+      reviewSummary: rollAppraiserDb.prepare(`
+        SELECT review_count AS reviewCount, pve_avg AS pveAverage, pvp_avg AS pvpAverage,
+          overall_avg AS overallAverage
+        FROM review_summary WHERE item_hash = ?
+      `),
+    };
+  }
+  return rollAppraiserQueries;
+}
+
+// Appraise one roll - GET /roll_appraisal?itemHash={hash}&perks={hash,hash,...}&mw={hash}
+// Perks are in column order; the last two are the trait columns (as in rollAppraiserUtils.ts).
+apiRouter.get('/roll_appraisal', (req, res) => {
+  const itemHash = Number(req.query.itemHash);
+  const perkHashes = (req.query.perks || '').split(',').filter(Boolean).map(Number);
+  const mwHash = req.query.mw ? Number(req.query.mw) : null;
+
+  if (!Number.isInteger(itemHash) || !perkHashes.every(Number.isInteger)) {
+    return res
+      .status(400)
+      .json({ error: 'Bad Request', message: 'itemHash and perks must be numeric hashes' });
+  }
+
+  try {
+    const queries = getRollAppraiserQueries();
+    if (!queries) {
+      return res
+        .status(503)
+        .json({ error: 'Service Unavailable', message: 'Roll appraiser data is not loaded' });
+    }
+
+    const perkRankings = [];
+    for (const perkHash of perkHashes) {
+      const perk = queries.perk.get(itemHash, perkHash);
+      if (perk) {
+        perkRankings.push({
+          perkHash,
+          rank: perk.rank,
+          count: perk.count,
+          perkEnhancedHash: perk.perkEnhancedHash || undefined,
+          show: Boolean(perk.show),
+        });
+      }
+    }
+
+    let traitComboRanking;
+    if (perkHashes.length >= 2) {
+      const combo = queries.traitCombo.get(itemHash, perkHashes.at(-2), perkHashes.at(-1));
+      if (combo) {
+        const { position, ...rest } = combo;
+        traitComboRanking = {
+          ...rest,
+          indexInRank: position % queries.combosPerRank,
+          perk4EnhancedHash: combo.perk4EnhancedHash || undefined,
+          perk5EnhancedHash: combo.perk5EnhancedHash || undefined,
+          show: Boolean(combo.show),
+        };
+      }
+    }
+
+    const masterwork = mwHash ? queries.masterwork.get(itemHash, mwHash) : undefined;
+
+    res.json({
+      itemHash,
+      perkRankings,
+      traitComboRanking,
+      masterworkRanking: masterwork && {
+        ...masterwork,
+        perkHash: mwHash,
+        show: Boolean(masterwork.show),
+      },
+      reviewSummary: queries.reviewSummary.get(itemHash),
+    });
+  } catch (error) {
+    console.error('Error appraising roll:', error);
+    res
+      .status(500)
+      .json({ error: 'Internal Server Error', message: 'Failed to appraise roll' });
+  }
+});
+
 // Create and start HTTPS server
 const httpsServer = https.createServer(credentials, app);
 httpsServer.listen(PORT, () => {
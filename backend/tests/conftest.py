@@ -0,0 +1,70 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# The backend scripts import their sibling modules directly
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+def make_raw_dataset(seed=2018, items=8, perks=24):
+    """A small light.gg-shaped payload.
+
+    Even-numbered perks have an enhanced version listed next to them in the
+    Weapons RandomRolls, so the enhanced mapping is exercised, and the first
+    perk row of every item has a count of 0.
+    """
+    rng = random.Random(seed)
+    hashes = rng.sample(range(1, 2**32), items + perks * 2)
+    item_hashes, perk_hashes = hashes[:items], hashes[items:]
+    pool = []
+    for index in range(perks):
+        standard, enhanced = sorted(perk_hashes[2 * index:2 * index + 2])
+        pool.append((f"Perk {index}", standard, enhanced if index % 2 == 0 else None))
+
+    def plugs(column):
+        for name, standard, enhanced in column:
+            yield {'ItemHash': standard, 'Name': name}
+            if enhanced:
+                yield {'ItemHash': enhanced, 'Name': name}
+
+    data = {'Weapons': {}, 'PerkStats': {}, 'TraitStats': {}, 'MWStats': {}, 'ReviewSummary': {},
+            'MasterworkMods': {'unused': True}}
+    for item_hash in item_hashes:
+        columns = [rng.sample(pool, 4) for _ in range(5)]
+        data['Weapons'][str(item_hash)] = {'Name': f"Weapon {item_hash}",
+                                           'RandomRolls': [list(plugs(column)) for column in columns]}
+        data['PerkStats'][str(item_hash)] = [
+            [{'PerkHash': standard, 'PerkEnhancedHash': enhanced, 'Rank': rank + 1,
+              'Count': 0 if (index, rank) == (0, 0) else rng.randint(1, 5000), 'PerkIDX': index,
+              'Show': rng.random() < 0.8}
+             for rank, (_, standard, enhanced) in enumerate(column)]
+            for index, column in enumerate(columns)
+        ]
+        traits = []
+        for _ in range(10):
+            (_, perk4, perk4_enhanced), (_, perk5, perk5_enhanced) = rng.sample(columns[3] + columns[4], 2)
+            traits.append({'Perk4Hash': perk4, 'Perk4EnhancedHash': perk4_enhanced, 'Perk5Hash': perk5,
+                           'Perk5EnhancedHash': perk5_enhanced, 'Count': rng.randint(1, 500),
+                           'Show': rng.random() < 0.5, 'DateSaved': None})
+        data['TraitStats'][str(item_hash)] = traits
+        data['MWStats'][str(item_hash)] = [
+            {'PerkHash': standard, 'Rank': rank + 1, 'Count': rng.randint(1, 500), 'Show': True}
+            for rank, (_, standard, _) in enumerate(rng.sample(pool, 3))
+        ]
+        pve, pvp = rng.randint(0, 50) / 10, rng.randint(0, 50) / 10
+        data['ReviewSummary'][str(item_hash)] = {'ReviewCount': rng.randint(1, 500), 'PVEAvg': pve,
+                                                 'PVPAvg': pvp, 'OverallAvg': (pve + pvp) / 2}
+    # Some payloads key one item's combos by index instead of using a list
+    keyed = str(item_hashes[-1])
+    data['TraitStats'][keyed] = {str(index): trait for index, trait in enumerate(data['TraitStats'][keyed])}
+    return data
+
+@pytest.fixture
+def raw_dataset():
+    return make_raw_dataset()
+
+@pytest.fixture
+def normalized_dataset(raw_dataset):
+    import light_normalize
+    return light_normalize.normalize(raw_dataset)
@@ -0,0 +1,46 @@
+"""light_binary: normalize -> encode -> verify round trips and column range checks."""
+
+import pytest
+
+import light_binary
+
+pytestmark = pytest.mark.skipif(not light_binary.HAS_NUMPY, reason="needs NumPy")
+
+@pytest.fixture
+def bin_path(normalized_dataset, tmp_path):
+    normalized_dataset['version'] = 'test-version'
+    path = tmp_path / 'data.bin'
+    path.write_bytes(light_binary.encode(normalized_dataset))
+    return path
+
+def test_round_trip(normalized_dataset, bin_path):
+    assert light_binary.verify(bin_path, normalized_dataset) == []
+
+    decoded = light_binary.ColumnarData(bin_path)
+    assert decoded.version == 'test-version'
+    rebuilt = decoded.to_normalized()
+    for section in (*light_binary.TABLE_COLUMNS, 'EnhancedPerks'):
+        assert rebuilt[section] == normalized_dataset[section]
+
+def test_verify_reports_differences(normalized_dataset, bin_path):
+    item_hash = next(iter(normalized_dataset['MWStats']))
+    perk_hash = next(iter(normalized_dataset['MWStats'][item_hash]))
+    normalized_dataset['MWStats'][item_hash][perk_hash][1] += 1
+
+    problems = light_binary.verify(bin_path, normalized_dataset)
+    assert len(problems) == 1
+    assert problems[0].startswith('MWStats: 0 missing, 0 extra, 1 differing')
+
+def test_row_ranges(normalized_dataset, bin_path):
+    decoded = light_binary.ColumnarData(bin_path)
+    for item_hash, traits in normalized_dataset['TraitStats'].items():
+        start, stop = decoded.row_range('TraitStats', item_hash)
+        assert stop - start == len(traits)
+    assert decoded.row_range('TraitStats', 1) == (0, 0)
+
+def test_out_of_range_values_name_their_column(normalized_dataset):
+    item_hash = next(iter(normalized_dataset['PerkStats']))
+    next(iter(normalized_dataset['PerkStats'][item_hash].values()))[3] = 200
+
+    with pytest.raises(ValueError, match=r'PerkStats\.perkIdx .*\|i1'):
+        light_binary.encode(normalized_dataset)
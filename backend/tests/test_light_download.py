@@ -0,0 +1,150 @@
+"""light_download against a local light_standin: retries, resumes, fallbacks, 304s and decoding."""
+
+import json
+import random
+import zlib
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import light_download
+import light_standin
+
+@pytest.fixture
+def fixture_path(tmp_path):
+    # Incompressible enough that a truncated gzip/br body still spans several chunks
+    rng = random.Random(2018)
+    data = {str(rng.getrandbits(32)): [rng.random() for _ in range(8)] for _ in range(4000)}
+    path = tmp_path / 'fixture.json'
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return path
+
+@pytest.fixture
+def standin():
+    servers = []
+
+    def start(fixture, **options):
+        state = light_standin.StandinState(fixture, **options)
+        server = light_standin.serve(state, port=0)
+        servers.append(server)
+        return state, f"http://127.0.0.1:{server.server_address[1]}/data.json"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def fetch(url, dest, headers=None, retries=3):
+    with requests.Session() as session:
+        return light_download.download(session, url, dest, headers, timeout=5, retries=retries, backoff=0)
+
+def decoded(path, stats):
+    return b''.join(light_download.iter_decoded(path, stats['content_encoding']))
+
+def test_plain_download(fixture_path, standin, tmp_path):
+    state, url = standin(fixture_path)
+    stats = fetch(url, tmp_path / 'body')
+
+    assert decoded(tmp_path / 'body', stats) == fixture_path.read_bytes()
+    assert stats['http_status'] == 200
+    assert (stats['attempts'], stats['resumes']) == (1, 0)
+    assert stats['etag'] == state.etag
+
+def test_retries_failed_requests(fixture_path, standin, tmp_path):
+    state, url = standin(fixture_path, fail=2)
+    stats = fetch(url, tmp_path / 'body')
+
+    assert decoded(tmp_path / 'body', stats) == fixture_path.read_bytes()
+    assert (stats['attempts'], stats['resumes']) == (3, 0)
+    assert state.requests == 3
+
+def test_gives_up_after_retries(fixture_path, standin, tmp_path):
+    _, url = standin(fixture_path, fail=5)
+    with pytest.raises(light_download.DownloadError):
+        fetch(url, tmp_path / 'body', retries=2)
+
+def test_resumes_truncated_body(fixture_path, standin, tmp_path):
+    state, url = standin(fixture_path, truncate=2, truncate_at=20_000)
+    stats = fetch(url, tmp_path / 'body')
+
+    assert decoded(tmp_path / 'body', stats) == fixture_path.read_bytes()
+    # Each resumed request is cut again at truncate_at bytes of its own body
+    assert (stats['attempts'], stats['resumes']) == (3, 2)
+    assert stats['bytes'] == len(state.body)
+
+def test_restarts_when_range_is_ignored(fixture_path, standin, tmp_path):
+    state, url = standin(fixture_path, allow_range=False, truncate=1, truncate_at=20_000)
+    stats = fetch(url, tmp_path / 'body')
+
+    assert decoded(tmp_path / 'body', stats) == fixture_path.read_bytes()
+    assert (stats['attempts'], stats['resumes']) == (2, 0)
+    assert stats['bytes'] == len(state.body)
+
+@pytest.mark.skipif(not light_standin.HAS_BROTLI, reason="needs the 'brotli' package")
+def test_resumes_brotli_encoded_body(fixture_path, standin, tmp_path):
+    state, url = standin(fixture_path, encoding='br', truncate=1)
+    stats = fetch(url, tmp_path / 'body')
+
+    # Range offsets count encoded bytes, so the stored body is still brotli
+    assert (tmp_path / 'body').read_bytes() == state.body
+    assert stats['content_encoding'] == 'br'
+    assert decoded(tmp_path / 'body', stats) == fixture_path.read_bytes()
+    assert (stats['attempts'], stats['resumes']) == (2, 1)
+
+def test_not_modified(fixture_path, standin, tmp_path):
+    state, url = standin(fixture_path, encoding='gzip')
+    first = fetch(url, tmp_path / 'first')
+    stats = fetch(url, tmp_path / 'second', headers={'If-None-Match': first['etag']})
+
+    assert stats['http_status'] == 304
+    assert (stats['attempts'], stats['resumes']) == (1, 0)
+    assert (tmp_path / 'second').read_bytes() == b''
+    assert state.requests == 2
+
+@pytest.mark.parametrize('wbits', [zlib.MAX_WBITS, -zlib.MAX_WBITS], ids=['zlib', 'raw'])
+def test_decodes_zlib_and_raw_deflate(fixture_path, tmp_path, wbits):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, wbits)
+    body = compressor.compress(fixture_path.read_bytes()) + compressor.flush()
+    (tmp_path / 'body').write_bytes(body)
+
+    assert decoded(tmp_path / 'body', {'content_encoding': 'deflate'}) == fixture_path.read_bytes()
+
+class CannedResponse:
+    def __init__(self, status_code, body=b'', headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.raw = SimpleNamespace(stream=lambda chunk_size, decode_content: iter([body]))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+class CannedSession:
+    """Replays `responses` in order and records the headers of each request."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def get(self, url, headers, stream, timeout):
+        self.sent.append(headers)
+        return self.responses.pop(0)
+
+def test_not_modified_on_resumed_request(tmp_path):
+    session = CannedSession(
+        CannedResponse(200, b'partial', {'ETag': '"v1"', 'Content-Length': '100'}),
+        CannedResponse(304),
+    )
+    stats = light_download.download(session, 'http://example.invalid/', tmp_path / 'body', timeout=5, backoff=0)
+
+    assert session.sent[1]['Range'] == 'bytes=7-'
+    assert session.sent[1]['If-Range'] == '"v1"'
+    assert stats['http_status'] == 304
+    assert stats['bytes'] == 0
+    assert (tmp_path / 'body').read_bytes() == b''
@@ -0,0 +1,39 @@
+"""light_normalize: typed rows, enhanced perk aliases and stripped payload."""
+
+import json
+
+import light_normalize
+
+def test_keeps_only_the_item_tables(raw_dataset, normalized_dataset):
+    assert normalized_dataset['schema'] == light_normalize.SCHEMA_VERSION
+    assert set(normalized_dataset) == {'schema', 'fields', *light_normalize.ITEM_TABLES, 'EnhancedPerks'}
+    for table in light_normalize.ITEM_TABLES:
+        assert normalized_dataset[table].keys() == raw_dataset[table].keys()
+
+def test_perk_rows(raw_dataset, normalized_dataset):
+    item_hash, columns = next(iter(raw_dataset['PerkStats'].items()))
+    perk = columns[1][2]
+    row = normalized_dataset['PerkStats'][item_hash][str(perk['PerkHash'])]
+
+    assert row == [perk['PerkHash'], perk['Rank'], perk['Count'], perk['PerkIDX'],
+                   perk['PerkEnhancedHash'] or 0, perk['Show']]
+
+def test_enhanced_hashes_alias_the_standard_row(normalized_dataset):
+    enhanced_perks = normalized_dataset['EnhancedPerks']
+    assert enhanced_perks
+
+    aliased = 0
+    for perks in normalized_dataset['PerkStats'].values():
+        for key, row in perks.items():
+            if int(key) != row[0]:
+                assert enhanced_perks[str(row[0])] == int(key)
+                aliased += 1
+    assert aliased
+
+def test_trait_order_is_preserved(raw_dataset, normalized_dataset):
+    for item_hash, traits in raw_dataset['TraitStats'].items():
+        traits = traits.values() if isinstance(traits, dict) else traits
+        assert [row[4] for row in normalized_dataset['TraitStats'][item_hash]] == [trait['Count'] for trait in traits]
+
+def test_dumps_round_trips(normalized_dataset):
+    assert json.loads(light_normalize.dumps(normalized_dataset)) == normalized_dataset
@@ -0,0 +1,80 @@
+"""light_snapshots: publishing versions and replaying their patches like a client would."""
+
+import copy
+
+import pytest
+
+import light_snapshots
+from light_files import atomic_write_bytes
+
+pytestmark = pytest.mark.skipif(not light_snapshots.HAS_BROTLI, reason="needs the 'brotli' package")
+
+def next_version(normalized, label):
+    """A copy of `normalized` with one item changed, one removed and one added."""
+    updated = copy.deepcopy(normalized)
+    updated['version'] = label
+    changed, removed = list(updated['MWStats'])[:2]
+    for row in updated['MWStats'][changed].values():
+        row[1] += 1
+    del updated['MWStats'][removed]
+    updated['ReviewSummary'][str(int(changed) ^ 1)] = [1, 1.0, 2.0, 1.5]
+    return updated
+
+@pytest.fixture
+def history(normalized_dataset, tmp_path):
+    """Three published versions; returns (snapshot_dir, [normalized v1, v2, v3])."""
+    versions = [dict(normalized_dataset, version='v1')]
+    versions.append(next_version(versions[0], 'v2'))
+    versions.append(next_version(versions[1], 'v3'))
+    for normalized in versions:
+        light_snapshots.publish_snapshot(normalized, tmp_path, atomic_write_bytes)
+    return tmp_path, versions
+
+def read_patch(snapshot_dir, entry):
+    return light_snapshots.read_compressed_json(snapshot_dir / f"{entry['patch']['file']}.br")
+
+def test_patch_chain_reproduces_latest(history):
+    snapshot_dir, versions = history
+    manifest = light_snapshots.load_manifest(snapshot_dir)
+    assert manifest['latest'] == 3
+
+    # A client holding v1 applies every later patch in order
+    client = light_snapshots.read_compressed_json(snapshot_dir / f"{manifest['versions'][0]['snapshot']}.br")
+    for entry in manifest['versions'][1:]:
+        client = light_snapshots.apply_patch(client, read_patch(snapshot_dir, entry))
+
+    latest = light_snapshots.read_compressed_json(snapshot_dir / f"{manifest['versions'][-1]['snapshot']}.br")
+    assert client == latest
+    assert light_snapshots.snapshot_digest(client) == light_snapshots.snapshot_digest(versions[-1])
+    assert client['version'] == 'v3'
+
+def test_patch_rejects_the_wrong_base(history):
+    snapshot_dir, versions = history
+    last = light_snapshots.load_manifest(snapshot_dir)['versions'][-1]
+
+    with pytest.raises(ValueError, match='does not apply'):
+        light_snapshots.apply_patch(versions[0], read_patch(snapshot_dir, last))
+
+def test_patch_rejects_unexpected_result(history):
+    snapshot_dir, versions = history
+    last = light_snapshots.load_manifest(snapshot_dir)['versions'][-1]
+    patch = read_patch(snapshot_dir, last)
+    patch['toSha256'] = '0' * 64
+
+    with pytest.raises(ValueError, match='unexpected data'):
+        light_snapshots.apply_patch(versions[1], patch)
+
+def test_unchanged_data_is_not_republished(history):
+    snapshot_dir, versions = history
+    assert light_snapshots.publish_snapshot(versions[-1], snapshot_dir, atomic_write_bytes) is None
+
+def test_prunes_versions_outside_the_window(history):
+    snapshot_dir, versions = history
+    light_snapshots.publish_snapshot(next_version(versions[-1], 'v4'), snapshot_dir, atomic_write_bytes, keep=2)
+
+    manifest = light_snapshots.load_manifest(snapshot_dir)
+    assert [entry['version'] for entry in manifest['versions']] == [3, 4]
+    assert sorted(path.name for path in snapshot_dir.iterdir()) == [
+        'manifest.json', 'manifest.json.br', 'patch-00002-00003.json.br', 'patch-00003-00004.json.br',
+        'v00003.json.br', 'v00004.json.br',
+    ]
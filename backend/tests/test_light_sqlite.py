@@ -0,0 +1,78 @@
+"""light_sqlite: the store answers the server's queries exactly like RollAppraiser."""
+
+import pytest
+
+import light_normalize
+import light_sqlite
+from roll_appraiser import RollAppraiser
+
+# The lookups /api/roll_appraisal prepares in server.js
+PERK_QUERY = """
+    SELECT rank, count, enhanced_hash, show
+    FROM perk_stats WHERE item_hash = ? AND perk_hash = ?
+"""
+TRAIT_QUERY = """
+    SELECT t.position, t.rank, t.count, t.perk4_hash, t.perk4_enhanced_hash,
+           t.perk5_hash, t.perk5_enhanced_hash, t.show
+    FROM trait_combo_keys k
+    JOIN trait_combos t ON t.item_hash = k.item_hash AND t.position = k.position
+    WHERE k.item_hash = ? AND k.perk4_hash = ? AND k.perk5_hash = ?
+"""
+MW_QUERY = "SELECT rank, count, show FROM mw_stats WHERE item_hash = ? AND perk_hash = ?"
+REVIEW_QUERY = "SELECT review_count, pve_avg, pvp_avg, overall_avg FROM review_summary WHERE item_hash = ?"
+
+@pytest.fixture
+def store(normalized_dataset, tmp_path):
+    normalized_dataset['version'] = 'test-version'
+    db_path = tmp_path / 'rollAppraiser.db'
+    light_sqlite.build_database(normalized_dataset, db_path)
+    conn = light_sqlite.connect_readonly(db_path)
+    yield db_path, conn
+    conn.close()
+
+def test_meta_and_row_counts(normalized_dataset, store):
+    db_path, _ = store
+    meta = light_sqlite.read_meta(db_path)
+
+    assert meta['schema'] == str(light_sqlite.STORE_SCHEMA_VERSION)
+    assert meta['version'] == 'test-version'
+    assert meta['combos_per_rank'] == str(light_normalize.COMBOS_PER_RANK)
+    assert light_sqlite.verify(db_path, normalized_dataset) == []
+
+def test_read_meta_without_database(tmp_path):
+    assert light_sqlite.read_meta(tmp_path / 'missing.db') == {}
+
+def test_lookups_match_roll_appraiser(normalized_dataset, store):
+    _, conn = store
+    appraiser = RollAppraiser(normalized_dataset)
+
+    for (item_hash, perk_hash), expected in appraiser.perks.items():
+        assert conn.execute(PERK_QUERY, (item_hash, perk_hash)).fetchone() == (
+            expected.rank, expected.count, expected.perk_enhanced_hash or 0, int(expected.show))
+
+    for (item_hash, perk4, perk5), expected in appraiser.traits.items():
+        position, rank, count, *hashes, show = conn.execute(TRAIT_QUERY, (item_hash, perk4, perk5)).fetchone()
+        assert (rank, position % light_normalize.COMBOS_PER_RANK, count, show) == (
+            expected.rank, expected.index_in_rank, expected.count, int(expected.show))
+        assert hashes == [expected.perk4_hash, expected.perk4_enhanced_hash or 0,
+                          expected.perk5_hash, expected.perk5_enhanced_hash or 0]
+
+    for (item_hash, perk_hash), expected in appraiser.masterworks.items():
+        assert conn.execute(MW_QUERY, (item_hash, perk_hash)).fetchone() == (
+            expected.rank, expected.count, int(expected.show))
+
+    for item_hash, expected in appraiser.reviews.items():
+        assert conn.execute(REVIEW_QUERY, (item_hash,)).fetchone() == tuple(expected)
+
+def test_misses_match_roll_appraiser(normalized_dataset, store):
+    _, conn = store
+    appraiser = RollAppraiser(normalized_dataset)
+    item_hash = next(iter(normalized_dataset['TraitStats']))
+    perk4, _, perk5, _, _, _ = normalized_dataset['TraitStats'][item_hash][0]
+
+    # Swapping the columns is a different combo, and 0 never matches
+    for key in ((perk5, perk4), (perk4, 0), (0, perk5)):
+        expected = appraiser.get_trait_combo_rank(item_hash, *key)
+        assert (conn.execute(TRAIT_QUERY, (int(item_hash), *key)).fetchone() is None) == (expected is None)
+    assert conn.execute(PERK_QUERY, (1, perk4)).fetchone() is None
+    assert appraiser.get_perk_rank(1, perk4) is None
@@ -0,0 +1,76 @@
+"""roll_appraiser_batch: vectorized results equal RollAppraiser roll by roll."""
+
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+
+import light_binary
+from roll_appraiser import RollAppraiser
+from roll_appraiser_batch import BatchAppraiser, score_profiles
+
+def make_rolls(normalized, count=400, seed=9):
+    """Rolls mixing real perks, trait pairs in either hash, zeros, short rolls and unknown items."""
+    rng = random.Random(seed)
+    items = list(normalized['TraitStats'])
+    rolls = []
+    for _ in range(count):
+        item_hash = rng.choice(items)
+        perks = [int(perk) for perk in normalized['PerkStats'][item_hash]]
+        perk4, perk4_enhanced, perk5, perk5_enhanced, _, _ = rng.choice(normalized['TraitStats'][item_hash])
+        roll = [rng.choice(perks + [0]) for _ in range(rng.randint(0, 3))]
+        roll += [rng.choice([perk4, perk4_enhanced, 0]), rng.choice([perk5, perk5_enhanced, perk4])]
+        if rng.random() < 0.15:
+            roll = roll[:rng.randint(0, 2)]
+        masterworks = [int(perk) for perk in normalized['MWStats'].get(item_hash, {})]
+        masterwork = rng.choice(masterworks + [0, 1])
+        if rng.random() < 0.05:
+            item_hash = '1'
+        rolls.append({'itemHash': int(item_hash), 'perks': roll, 'masterwork': masterwork})
+    return rolls
+
+@pytest.fixture
+def appraisers(normalized_dataset):
+    return (RollAppraiser(normalized_dataset),
+            BatchAppraiser(light_binary.ColumnarData(light_binary.encode(normalized_dataset))))
+
+def test_batch_matches_single(normalized_dataset, appraisers):
+    single, batch = appraisers
+    rolls = make_rolls(normalized_dataset)
+    profiles = [{'profile': str(start), 'items': rolls[start:start + 40]} for start in range(0, len(rolls), 40)]
+
+    scored = [item for profile in score_profiles(batch, profiles) for item in profile['items']]
+    assert len(scored) == len(rolls)
+    for roll, result in zip(rolls, scored):
+        ranking = single.get_weapon_ranking(roll['itemHash'], roll['perks'], roll['masterwork'])
+        perks = [single.get_perk_rank(roll['itemHash'], perk) for perk in roll['perks']]
+        trait = ranking.trait_combo_ranking
+        masterwork = ranking.masterwork_ranking
+
+        assert result['perkRanks'] == [perk.rank if perk else None for perk in perks]
+        assert result['perkCounts'] == [perk.count if perk else None for perk in perks]
+        assert (result['traitRank'], result['traitCount']) == ((trait.rank, trait.count) if trait else (None, None))
+        assert (result['masterworkRank'], result['masterworkCount']) == (
+            (masterwork.rank, masterwork.count) if masterwork else (None, None))
+
+def test_trait_columns_are_positional(normalized_dataset, appraisers):
+    single, batch = appraisers
+    item_hash = next(iter(normalized_dataset['TraitStats']))
+    perk4, _, perk5, _, _, _ = normalized_dataset['TraitStats'][item_hash][0]
+
+    # A trailing 0 is still the fifth column, so the real pair before it is not a trait match
+    rolls = [[perk4, perk5, 0], [perk4, perk5, 0]]
+    result = batch.appraise([int(item_hash)] * 2, rolls, perk_lengths=[2, 3])
+
+    assert result.trait_found.tolist() == [True, False]
+    assert single.get_trait_combo_rank(item_hash, perk4, perk5).rank == result.trait_rank[0] == 1
+
+def test_zero_counts_are_not_missing(normalized_dataset, appraisers):
+    _, batch = appraisers
+    item_hash = next(iter(normalized_dataset['PerkStats']))
+    perk_hash = next(int(perk) for perk, row in normalized_dataset['PerkStats'][item_hash].items() if row[2] == 0)
+
+    scored = score_profiles(batch, [{'items': [{'itemHash': item_hash, 'perks': [perk_hash, 1]}]}])
+    assert scored[0]['items'][0]['perkCounts'] == [0, None]
+    assert scored[0]['items'][0]['perkRanks'][0] == 1
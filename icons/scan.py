@@ -8,27 +8,153 @@ and replaces them with versions based on input.svg template at the same resoluti
 import os
 import sys
 import csv
+import json
+import atexit
+import shutil
+import hashlib
+import argparse
+import tempfile
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import xml.etree.ElementTree as ET
 import re
+import struct
+import math
+import io
+import zlib
 from PIL import Image, ImageDraw
 try:
     import subprocess
     HAS_INKSCAPE = False
+    HAS_INKSCAPE_SHELL = False
     # Check if Inkscape is available
     try:
-        subprocess.run(['inkscape', '--version'], capture_output=True, check=True)
+        version_output = subprocess.run(['inkscape', '--version'], capture_output=True, check=True, text=True).stdout
         HAS_INKSCAPE = True
+        # The action-based --shell used by InkscapeShell arrived in Inkscape 1.0
+        version_match = re.search(r'Inkscape (\d+)\.', version_output)
+        HAS_INKSCAPE_SHELL = bool(version_match) and int(version_match.group(1)) >= 1
     except (subprocess.CalledProcessError, FileNotFoundError):
         pass
 except ImportError:
     HAS_INKSCAPE = False
+    HAS_INKSCAPE_SHELL = False
+
+INKSCAPE_PROMPT = b'> '
+ICON_EXTENSIONS = ('.svg', '.png')
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+SVG_PROBE_CHUNK = 4096
+
+class InkscapeShell:
+    """A long-lived `inkscape --shell` with the template already open.
+    
+    Every export is one action line on stdin, so Inkscape starts and parses the
+    template once per process instead of once per output file. Each worker
+    process of --jobs gets its own shell.
+    """
+    
+    def __init__(self, template_path):
+        self.template_path = Path(template_path).resolve()
+        self.process = subprocess.Popen(
+            ['inkscape', '--shell'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._read_until_prompt()
+        self._run(f"file-open:{self.template_path}")
+    
+    def _read_until_prompt(self):
+        output = b''
+        while not output.endswith(INKSCAPE_PROMPT):
+            chunk = os.read(self.process.stdout.fileno(), 4096)
+            if not chunk:
+                raise RuntimeError("Inkscape shell exited unexpectedly")
+            output += chunk
+        return output[:-len(INKSCAPE_PROMPT)].decode('utf-8', 'replace')
+    
+    def _run(self, actions):
+        self.process.stdin.write(actions.encode('utf-8') + b'\n')
+        self.process.stdin.flush()
+        return self._read_until_prompt()
+    
+    def is_alive(self):
+        return self.process.poll() is None
+    
+    def export_png(self, output_path, width, height):
+        """Export the open template to output_path; True if Inkscape wrote the file."""
+        output_path = Path(output_path).resolve()
+        before = output_path.stat().st_mtime_ns if output_path.exists() else None
+        self._run(f"export-filename:{output_path}; export-width:{width}; export-height:{height}; export-do")
+        return output_path.exists() and output_path.stat().st_mtime_ns != before and output_path.stat().st_size > 0
+    
+    def close(self):
+        if not self.is_alive():
+            return
+        try:
+            self.process.stdin.write(b"quit\n")
+            self.process.stdin.close()
+            self.process.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+
+# One shell per process; workers that die without running atexit still close its stdin, which ends it
+_inkscape_shell = None
+
+def get_inkscape_shell(template_path):
+    """Return this process's Inkscape shell for template_path, starting it if needed."""
+    global _inkscape_shell
+    if _inkscape_shell is not None and (
+        _inkscape_shell.template_path != Path(template_path).resolve() or not _inkscape_shell.is_alive()
+    ):
+        close_inkscape_shell()
+    if _inkscape_shell is None:
+        _inkscape_shell = InkscapeShell(template_path)
+    return _inkscape_shell
+
+def close_inkscape_shell():
+    global _inkscape_shell
+    if _inkscape_shell is not None:
+        _inkscape_shell.close()
+        _inkscape_shell = None
+
+atexit.register(close_inkscape_shell)
+
+def iter_icon_files(directory):
+    """Yield os.DirEntry objects for every .svg/.png file under directory.
+    
+    Uses os.scandir so file types come from the directory listing and each entry's
+    stat() is cached; names are filtered by extension before anything is stat'ed.
+    """
+    pending = [str(directory)]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in ICON_EXTENSIONS and entry.is_file():
+                        yield entry
+        except OSError as e:
+            print(f"Warning: Could not scan {current}: {e}")
 
 def get_svg_d2lensions(file_path):
     """Extract d2lensions from SVG file."""
     try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
+        # Only the root element's attributes matter, so feed small chunks and stop at its start tag
+        parser = ET.XMLPullParser(events=('start',))
+        root = None
+        with open(file_path, 'rb') as f:
+            while root is None:
+                chunk = f.read(SVG_PROBE_CHUNK)
+                if not chunk:
+                    return None, None
+                parser.feed(chunk)
+                for _, root in parser.read_events():
+                    break
         
         width = root.get('width')
         height = root.get('height')
@@ -65,44 +191,114 @@ def get_svg_d2lensions(file_path):
 
 def get_png_d2lensions(file_path):
     """Extract d2lensions from PNG file."""
+    # The IHDR chunk always comes first: signature (8), length (4), 'IHDR' (4), width (4), height (4)
+    try:
+        with open(file_path, 'rb') as f:
+            header = f.read(24)
+        if len(header) == 24 and header[:8] == PNG_SIGNATURE and header[12:16] == b'IHDR':
+            return struct.unpack('>II', header[16:24])
+    except OSError:
+        return None, None
+    
+    # Not a plain PNG (e.g. a misnamed file); let Pillow work it out
     try:
         with Image.open(file_path) as img:
             return img.width, img.height
     except Exception as e:
         return None, None
 
-def create_svg_from_template(template_path, output_path, width, height):
-    """Create SVG file from template with specified d2lensions."""
-    try:
-        tree = ET.parse(template_path)
+class SVGTemplate:
+    """The SVG template parsed, validated and serialized once, with slots for the root size.
+    
+    The root's width, height and viewBox are set exactly as the per-file ET
+    rewrite used to set them, but to slot markers; every variant is then just
+    the serialized bytes with the markers swapped for the requested size.
+    """
+    
+    WIDTH_SLOT = '@@d2l-width@@'
+    HEIGHT_SLOT = '@@d2l-height@@'
+    
+    def __init__(self, template_path):
+        source = Path(template_path).read_bytes()
+        if self.WIDTH_SLOT.encode() in source or self.HEIGHT_SLOT.encode() in source:
+            raise ValueError(f"{template_path} already contains a size slot marker")
+        
+        tree = ET.ElementTree(ET.fromstring(source))
         root = tree.getroot()
+        if root.tag.rsplit('}', 1)[-1] != 'svg':
+            raise ValueError(f"{template_path} root element is <{root.tag}>, not <svg>")
         
-        # Update d2lensions
-        root.set('width', str(width))
-        root.set('height', str(height))
+        root.set('width', self.WIDTH_SLOT)
+        root.set('height', self.HEIGHT_SLOT)
         
-        # Update viewBox if it exists, otherwise create one
+        # Keep the viewBox origin when it has one, leave malformed ones alone, otherwise create one
         viewbox = root.get('viewBox')
         if viewbox:
-            # Parse existing viewBox and update width/height
             vb_parts = viewbox.split()
             if len(vb_parts) >= 4:
-                root.set('viewBox', f"{vb_parts[0]} {vb_parts[1]} {width} {height}")
+                root.set('viewBox', f"{vb_parts[0]} {vb_parts[1]} {self.WIDTH_SLOT} {self.HEIGHT_SLOT}")
         else:
-            # Create new viewBox
-            root.set('viewBox', f"0 0 {width} {height}")
+            root.set('viewBox', f"0 0 {self.WIDTH_SLOT} {self.HEIGHT_SLOT}")
         
-        # Write the modified SVG
-        tree.write(output_path, encoding='utf-8', xml_declaration=True)
+        buffer = io.BytesIO()
+        tree.write(buffer, encoding='utf-8', xml_declaration=True)
+        slot_pattern = f"({re.escape(self.WIDTH_SLOT)}|{re.escape(self.HEIGHT_SLOT)})".encode()
+        # Alternating literal segments and slot names: [bytes, slot, bytes, slot, ..., bytes]
+        self.parts = re.split(slot_pattern, buffer.getvalue())
+    
+    def render(self, width, height):
+        values = {self.WIDTH_SLOT.encode(): str(width).encode(), self.HEIGHT_SLOT.encode(): str(height).encode()}
+        return b''.join(values.get(part, part) if index % 2 else part for index, part in enumerate(self.parts))
+
+_svg_templates = {}
+
+def get_svg_template(template_path):
+    """Compiled SVGTemplate for template_path, rebuilt only when the file changes."""
+    stat = os.stat(template_path)
+    memo_key = (str(template_path), stat.st_mtime_ns, stat.st_size)
+    if memo_key not in _svg_templates:
+        _svg_templates[memo_key] = SVGTemplate(template_path)
+    return _svg_templates[memo_key]
+
+def create_svg_from_template(template_path, output_path, width, height):
+    """Create SVG file from template with specified d2lensions."""
+    try:
+        data = get_svg_template(template_path).render(width, height)
+        with open(output_path, 'wb') as f:
+            f.write(data)
         return True
         
     except Exception as e:
         print(f"Error creating SVG {output_path}: {e}")
         return False
 
+def draw_placeholder(width, height):
+    """Simple stand-in image used when no SVG converter is available."""
+    img = Image.new('RGBA', (width, height), (100, 150, 200, 255))  # Light blue
+    draw = ImageDraw.Draw(img)
+    
+    # Add a simple border
+    border_width = max(1, min(width, height) // 20)
+    draw.rectangle([0, 0, width-1, height-1], outline=(50, 75, 100, 255), width=border_width)
+    
+    # Add an X pattern to indicate it's a placeholder
+    draw.line([0, 0, width-1, height-1], fill=(50, 75, 100, 255), width=border_width)
+    draw.line([0, height-1, width-1, 0], fill=(50, 75, 100, 255), width=border_width)
+    return img
+
 def create_png_from_template(template_path, output_path, width, height):
     """Create PNG file from SVG template with specified d2lensions."""
     try:
+        if HAS_INKSCAPE_SHELL:
+            # Reuse the persistent shell; fall back to a one-off export below if it misbehaves
+            try:
+                if get_inkscape_shell(template_path).export_png(output_path, width, height):
+                    return True
+                print(f"Inkscape shell did not write {output_path}; retrying with a one-off export")
+            except (OSError, RuntimeError) as e:
+                print(f"Inkscape shell failed ({e}); retrying with a one-off export")
+                close_inkscape_shell()
+        
         if HAS_INKSCAPE:
             # Use Inkscape if available (best quality)
             cmd = [
@@ -123,30 +319,703 @@ def create_png_from_template(template_path, output_path, width, height):
             # Fallback: Create a simple colored rectangle as placeholder
             # This is not ideal but works when no SVG converter is available
             print(f"Warning: Creating placeholder PNG for {output_path} (no SVG converter available)")
-            
-            # Create a simple placeholder image
-            img = Image.new('RGBA', (width, height), (100, 150, 200, 255))  # Light blue
-            draw = ImageDraw.Draw(img)
-            
-            # Add a simple border
-            border_width = max(1, min(width, height) // 20)
-            draw.rectangle([0, 0, width-1, height-1], outline=(50, 75, 100, 255), width=border_width)
-            
-            # Add an X pattern to indicate it's a placeholder
-            draw.line([0, 0, width-1, height-1], fill=(50, 75, 100, 255), width=border_width)
-            draw.line([0, height-1, width-1, 0], fill=(50, 75, 100, 255), width=border_width)
-            
-            img.save(output_path, 'PNG')
+            draw_placeholder(width, height).save(output_path, 'PNG')
             return True
             
     except Exception as e:
         print(f"Error creating PNG {output_path}: {e}")
         return False
 
-def scan_and_replace_icons(directory, template_path):
-    """Recursively scan directory for SVG and PNG files and replace them."""
+# zlib level/strategy pairs tried for every lossless form of a PNG (Pillow's compress_level/compress_type)
+PNG_ZLIB_SETTINGS = [
+    (level, strategy)
+    for level in (6, 9)
+    for strategy in (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_RLE, zlib.Z_HUFFMAN_ONLY)
+]
+# Modes whose pixels survive a round trip through 8-bit RGBA
+PNG_OPTIMIZE_MODES = ('1', 'L', 'LA', 'P', 'PA', 'RGB', 'RGBA')
+
+def palette_image(rgba, colors, opaque):
+    """Exact palette version of an image with at most 256 colors (from getcolors())."""
+    source = rgba.convert('RGB') if opaque else rgba
+    image = source.quantize(len(colors), method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    if image.convert('RGBA').tobytes() == rgba.tobytes():
+        return image
+    # The quantizer merged two colors; map every pixel to its own entry instead
+    index = {bytes(color): position for position, (_, color) in enumerate(colors)}
+    pixels = rgba.tobytes()
+    image = Image.frombytes('P', rgba.size, bytes(index[pixels[i:i + 4]] for i in range(0, len(pixels), 4)))
+    if opaque:
+        image.putpalette([channel for _, color in colors for channel in color[:3]], 'RGB')
+    else:
+        image.putpalette([channel for _, color in colors for channel in color], 'RGBA')
+    return image
+
+def lossless_candidates(image):
+    """The decoded RGBA pixels plus every smaller form that stores them exactly.
+    
+    Alpha is dropped when fully opaque, color when every pixel is gray, and a
+    palette is tried when there are 256 colors or fewer (Pillow writes 1/2/4-bit
+    palettes on its own when the palette is that short).
+    """
+    rgba = image.convert('RGBA')
+    red, green, blue, alpha = rgba.split()
+    opaque = alpha.getextrema() == (255, 255)
+    if red.tobytes() == green.tobytes() == blue.tobytes():
+        candidates = [red if opaque else Image.merge('LA', (red, alpha))]
+    else:
+        candidates = [rgba.convert('RGB') if opaque else rgba]
+    colors = rgba.getcolors(256)
+    if colors is not None:
+        candidates.append(palette_image(rgba, colors, opaque))
+    return rgba, candidates
+
+def smallest_png_encoding(image):
+    """Encode image with every PNG_ZLIB_SETTINGS pair and return the smallest PNG."""
+    # Only pixels and the palette are written: no text, time, EXIF or color profile chunks
+    image.info = {}
+    best = None
+    for level, strategy in PNG_ZLIB_SETTINGS:
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG', compress_level=level, compress_type=strategy)
+        if best is None or buffer.tell() < len(best):
+            best = buffer.getvalue()
+    return best
+
+def optimize_png(data):
+    """Smallest lossless re-encoding of the PNG bytes in data, or None if none is smaller.
+    
+    A candidate is only accepted after it has been decoded again and its pixels
+    compared with the original's. 16-bit PNGs are left alone.
+    """
+    # Byte 24 is the IHDR bit depth; Pillow reads 16-bit color down to 8 bits
+    if data[:8] != PNG_SIGNATURE or len(data) < 25 or data[24] > 8:
+        return None
+    with Image.open(io.BytesIO(data)) as image:
+        if image.mode not in PNG_OPTIMIZE_MODES:
+            return None
+        image.load()
+        rgba, candidates = lossless_candidates(image)
+    reference = rgba.tobytes()
+    
+    best = None
+    for candidate in candidates:
+        encoded = smallest_png_encoding(candidate)
+        if len(encoded) < len(best or data):
+            with Image.open(io.BytesIO(encoded)) as decoded:
+                if decoded.convert('RGBA').tobytes() == reference:
+                    best = encoded
+    return best
+
+def optimize_png_file(path):
+    """Replace the PNG at path with optimize_png()'s output if that saves bytes; returns (size before, size after).
+    
+    The smaller file is written beside path and renamed over it, so the original
+    inode (which a hardlinked output may share) is never modified.
+    """
+    path = Path(path)
+    data = path.read_bytes()
+    optimized = optimize_png(data)
+    if optimized is None:
+        return len(data), len(data)
+    temp_path = publish_temp_path(path)
+    try:
+        temp_path.write_bytes(optimized)
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    return len(data), len(optimized)
+
+class MasterRender:
+    """One large rasterization of the template that smaller PNGs are downscaled from.
+    
+    Rendered lazily on first use, so a group whose outputs all come from the
+    render cache never rasterizes anything.
+    """
+    
+    def __init__(self, template_path, width, height):
+        self.template_path = template_path
+        self.size = (width, height)
+        self._image = None
+    
+    @property
+    def image(self):
+        if self._image is None:
+            width, height = self.size
+            if HAS_INKSCAPE:
+                fd, temp_name = tempfile.mkstemp(suffix='.png')
+                os.close(fd)
+                try:
+                    if not create_png_from_template(self.template_path, temp_name, width, height):
+                        raise RuntimeError(f"could not render {width}x{height} master")
+                    with Image.open(temp_name) as img:
+                        self._image = img.convert('RGBA')
+                finally:
+                    Path(temp_name).unlink(missing_ok=True)
+            else:
+                print(f"Warning: Creating placeholder master at {width}x{height} (no SVG converter available)")
+                self._image = draw_placeholder(width, height)
+        return self._image
+    
+    def resized(self, width, height):
+        return downscale(self.image, width, height)
+    
+    def save_resized(self, output_path, width, height):
+        self.resized(width, height).save(output_path, 'PNG')
+        return True
+
+def downscale(image, width, height):
+    """LANCZOS-resize an RGBA image to width x height."""
+    if image.size == (width, height):
+        return image
+    # Resample in premultiplied alpha so transparent pixels don't bleed colour into the edges
+    return image.convert('RGBa').resize((width, height), Image.LANCZOS).convert('RGBA')
+
+def aspect_ratio(width, height):
+    divisor = math.gcd(width, height) or 1
+    return width // divisor, height // divisor
+
+SPLASH_BACKGROUND = (0x31, 0x32, 0x33, 255)  # #313233, as in build_icons.cjs
+ICO_SIZES = (48, 32, 16)
+ICON_VERSIONS = ('release', 'beta', 'dev', 'pr')
+
+def fit_within(svg_width, svg_height, width, height):
+    """Largest size with the SVG's aspect ratio that fits in width x height (rsvg-convert -a)."""
+    scale = min(width / svg_width, height / svg_height)
+    return max(1, round(svg_width * scale)), max(1, round(svg_height * scale))
+
+def splash_row(output_dir, width, height, status, bytes_written=0, bytes_saved=0):
+    return {
+        'filename': f"{Path(output_dir).name}/splash-{width}x{height}.png",
+        'resolution': f"{width}x{height}",
+        'format': 'PNG',
+        'status': status,
+        'bytes': bytes_written,
+        'bytes_saved': bytes_saved
+    }
+
+def build_splash_group(master_png, output_dir, targets, optimize=False, dry_run=False):
+    """Downscale the splash master to each target's logo size and pad it onto the splash background.
+    
+    targets are (width, height, (logo_width, logo_height)) tuples; master_png is
+    the single render of splash.svg at the largest logo size. Each screen is
+    written to a temp file and published with publish_file(). With optimize, it
+    is losslessly recompressed with optimize_png_file() first; with dry_run,
+    nothing is rendered or written.
+    """
+    if dry_run:
+        for width, height, _ in targets:
+            print(f"  ~ splash-{width}x{height}.png")
+        return [splash_row(output_dir, width, height, "~ Would replace") for width, height, _ in targets]
+    
+    with Image.open(master_png) as img:
+        master = img.convert('RGBA')
+    
+    rows = []
+    for width, height, (logo_width, logo_height) in targets:
+        output_path = Path(output_dir) / f"splash-{width}x{height}.png"
+        temp_path = publish_temp_path(output_path)
+        bytes_written = 0
+        bytes_saved = 0
+        try:
+            canvas = Image.new('RGBA', (width, height), SPLASH_BACKGROUND)
+            canvas.alpha_composite(downscale(master, logo_width, logo_height),
+                                   ((width - logo_width) // 2, (height - logo_height) // 2))
+            # The background is opaque, so drop the alpha channel
+            canvas.convert('RGB').save(temp_path, 'PNG')
+            if optimize:
+                before, after = optimize_png_file(temp_path)
+                bytes_saved = before - after
+            publish_file(temp_path, output_path)
+            bytes_written = output_path.stat().st_size
+            status = "✓ Replaced" if HAS_INKSCAPE else "✓ Replaced (placeholder)"
+            print(f"  ✓ {output_path.name}" + (f" (optimized: -{bytes_saved:,} bytes)" if bytes_saved else ""))
+        except Exception as e:
+            status = "✗ Failed"
+            print(f"  ✗ {output_path.name}: {e}")
+        finally:
+            temp_path.unlink(missing_ok=True)
+        rows.append(splash_row(output_dir, width, height, status, bytes_written, bytes_saved))
+    return rows
+
+def render_splash_master(splash_svg, targets):
+    """Render splash.svg once at the largest logo size any target needs.
+    
+    Returns (master PNG temp path, [(width, height, logo size)]). Every splash
+    screen is downscaled from this one render, whatever its aspect ratio.
+    Raises ValueError if the SVG's size can't be read.
+    """
+    # Zero or unreadable sizes would fail every target the same way
+    dimensions = get_svg_d2lensions(splash_svg)
+    if not dimensions or not all(dimensions):
+        raise ValueError(f"could not determine the size of {Path(splash_svg).name}")
+    svg_width, svg_height = dimensions
+    fitted = [(width, height, fit_within(svg_width, svg_height, width, height)) for width, height in targets]
+    master = MasterRender(splash_svg, *max((logo for _, _, logo in fitted), key=lambda logo: logo[0] * logo[1]))
+    
+    fd, temp_name = tempfile.mkstemp(suffix='.png')
+    os.close(fd)
+    try:
+        # Only read back by the workers, so favour speed over size
+        master.image.save(temp_name, 'PNG', compress_level=1)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    return Path(temp_name), fitted
+
+def build_favicon_ico(icons_dir, version, dry_run=False):
+    """Pack favicon-<version>.svg at 48/32/16 into <version>/favicon.ico, resampled from one 48px render.
+    
+    The icon is written to a temp file and published with publish_file(); with
+    dry_run, nothing is rendered or written.
+    """
+    output_path = Path(icons_dir) / version / 'favicon.ico'
+    temp_path = publish_temp_path(output_path)
+    bytes_written = 0
+    if dry_run:
+        status = "~ Would replace"
+        print(f"  ~ {version}/favicon.ico")
+    else:
+        try:
+            master = MasterRender(Path(icons_dir) / f"favicon-{version}.svg", ICO_SIZES[0], ICO_SIZES[0])
+            images = [master.resized(size, size) for size in ICO_SIZES]
+            output_path.parent.mkdir(exist_ok=True)
+            images[0].save(temp_path, format='ICO', sizes=[(size, size) for size in ICO_SIZES],
+                           append_images=images[1:])
+            publish_file(temp_path, output_path)
+            bytes_written = output_path.stat().st_size
+            status = "✓ Replaced" if HAS_INKSCAPE else "✓ Replaced (placeholder)"
+            print(f"  ✓ {version}/favicon.ico")
+        except Exception as e:
+            status = "✗ Failed"
+            print(f"  ✗ {version}/favicon.ico: {e}")
+        finally:
+            temp_path.unlink(missing_ok=True)
+    return [{
+        'filename': f"{version}/favicon.ico",
+        'resolution': 'x'.join(str(size) for size in ICO_SIZES),
+        'format': 'ICO',
+        'status': status,
+        'bytes': bytes_written
+    }]
+
+def build_splash_and_ico(icons_dir, splash=True, ico=True, jobs=1, optimize=False, dry_run=False):
+    """Regenerate splash screens from splash.json and/or each version's favicon.ico, like build_icons.cjs.
+    
+    Outputs are published with an atomic replace and each folder that changed is
+    fsynced once at the end. With dry_run, the files that would be written are
+    reported instead.
+    """
+    icons_dir = Path(icons_dir)
+    splash_dir = icons_dir / 'splash'
+    tasks = []
+    output_dirs = []
+    icons = []
+    master_png = None
+    if splash:
+        with open(icons_dir / 'splash.json', 'r', encoding='utf-8') as f:
+            targets = sorted({(entry[4], entry[5]) for entry in json.load(f)})
+        output_dirs.append(splash_dir)
+        print(f"Splash: {len(targets)} screens downscaled from one render of splash.svg")
+        fitted = [(width, height, None) for width, height in targets]
+        if not dry_run:
+            splash_dir.mkdir(exist_ok=True)
+            try:
+                master_png, fitted = render_splash_master(icons_dir / 'splash.svg', targets)
+            except Exception as e:
+                print(f"  ✗ splash.svg: {e}")
+                icons += [splash_row(splash_dir, width, height, "✗ Failed") for width, height in targets]
+                fitted = []
+        # Largest screens first, dealt round-robin so each worker gets a similar share
+        fitted.sort(key=lambda target: -target[0] * target[1])
+        chunks = [fitted[start::max(jobs, 1)] for start in range(min(max(jobs, 1), len(fitted)))]
+        tasks += [(build_splash_group, (master_png, splash_dir, chunk, optimize, dry_run)) for chunk in chunks]
+    if ico:
+        print(f"Favicons: {len(ICON_VERSIONS)} favicon.ico files at {'/'.join(str(size) for size in ICO_SIZES)}px")
+        tasks += [(build_favicon_ico, (icons_dir, version, dry_run)) for version in ICON_VERSIONS]
+        output_dirs += [icons_dir / version for version in ICON_VERSIONS]
+    
+    # Left behind by an interrupted run; the originals next to them are still intact
+    if not dry_run:
+        for directory in output_dirs:
+            for leftover in directory.glob(f"{PUBLISH_PREFIX}*"):
+                leftover.unlink(missing_ok=True)
+                print(f"Removed unfinished render: {leftover.relative_to(icons_dir)}")
+    
+    try:
+        if jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(function, *arguments) for function, arguments in tasks]
+                for future in as_completed(futures):
+                    icons.extend(future.result())
+        else:
+            for function, arguments in tasks:
+                icons.extend(function(*arguments))
+    finally:
+        if master_png:
+            master_png.unlink(missing_ok=True)
+    
+    if dry_run:
+        print(f"\nDry run complete:")
+        print(f"~ Would replace: {len(icons)}")
+        return icons
+    
+    fsync_directories(directory for directory in output_dirs if directory.exists())
+    print(f"\nProcessing complete:")
+    print(f"✓ Written: {sum(1 for icon in icons if icon['status'].startswith('✓'))}")
+    print(f"✗ Errors: {sum(1 for icon in icons if icon['status'].startswith('✗'))}")
+    return icons
+
+DEFAULT_CACHE_MB = 256
+# Replacements are rendered to "<prefix><pid>-<name>" next to the original, then renamed over it
+PUBLISH_PREFIX = '.d2l-publish-'
+# Each cache entry has a ".<name>.stamp" sidecar with the size and mtime it was stored with
+CACHE_STAMP_SUFFIX = '.stamp'
+MANIFEST_NAME = '.icon-manifest.json'
+MANIFEST_VERSION = 1
+
+_template_digests = {}
+
+def template_digest(template_path):
+    """sha256 of the template, memoized on its path, mtime and size."""
+    stat = os.stat(template_path)
+    memo_key = (str(template_path), stat.st_mtime_ns, stat.st_size)
+    if memo_key not in _template_digests:
+        _template_digests[memo_key] = hashlib.sha256(Path(template_path).read_bytes()).hexdigest()
+    return _template_digests[memo_key]
+
+def renderer_for(extension, downscale=False, optimize=False):
+    """What produces files of this type; placeholder PNGs must be redone once Inkscape is installed."""
+    if extension == '.svg':
+        return 'svg'
+    renderer = 'inkscape' if HAS_INKSCAPE else 'placeholder'
+    return renderer + ('-lanczos' if downscale else '') + ('-opt' if optimize else '')
+
+def load_icon_manifest(directory):
+    try:
+        with open(Path(directory) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'version': MANIFEST_VERSION, 'files': {}}
+
+def save_icon_manifest(directory, manifest):
+    path = Path(directory) / MANIFEST_NAME
+    fd, temp_name = tempfile.mkstemp(dir=directory, prefix=f'{MANIFEST_NAME}.', suffix='.tmp')
+    try:
+        # mkstemp files are 0600; keep the manifest readable like the icons around it
+        os.chmod(temp_name, path.stat().st_mode & 0o777 if path.exists() else 0o644)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(temp_name, path)
+    except OSError as e:
+        Path(temp_name).unlink(missing_ok=True)
+        print(f"Warning: could not write {path}: {e}")
+
+def default_cache_dir():
+    """Per-user cache location (XDG_CACHE_HOME, LOCALAPPDATA on Windows, else ~/.cache)."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.environ.get('LOCALAPPDATA') or Path.home() / '.cache'
+    return Path(base) / 'd2l-icons'
+
+class RenderCache:
+    """Content-addressed store of rendered icons, keyed on (template hash, renderer, format, width, height).
+    
+    Hits are copied into place, or hardlinked with hardlink=True (copied anyway when
+    the cache is on another drive), and evict() drops the least recently used
+    entries once the cache grows past max_bytes. Linked outputs share an inode with
+    the cache and with each other, so an in-place edit of one changes them all; each
+    entry's size and mtime are recorded in a sidecar stamp when it is stored, so such
+    an edit is noticed and the entry re-rendered instead of being fanned out again.
+    Entries keep their real mtimes, and so do linked outputs.
+    """
+    
+    def __init__(self, directory=None, max_bytes=DEFAULT_CACHE_MB * 1024 * 1024, hardlink=False):
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hardlink = hardlink
+    
+    def entry_path(self, template_path, renderer, extension, width, height):
+        name = f"{template_digest(template_path)[:20]}-{renderer}-{width}x{height}{extension}"
+        return self.directory / name
+    
+    def stamp_path(self, entry):
+        return entry.with_name(f".{entry.name}{CACHE_STAMP_SUFFIX}")
+    
+    def discard(self, entry):
+        entry.unlink(missing_ok=True)
+        self.stamp_path(entry).unlink(missing_ok=True)
+    
+    def fetch(self, template_path, renderer, extension, width, height, output_path):
+        """Place a cached render at output_path; False on a miss."""
+        entry = self.entry_path(template_path, renderer, extension, width, height)
+        try:
+            stat = entry.stat()
+            try:
+                stamp = self.stamp_path(entry).read_text(encoding='ascii').split()
+            except FileNotFoundError:
+                stamp = None
+            if stamp != [str(stat.st_size), str(stat.st_mtime_ns)]:
+                self.discard(entry)
+                return False
+            linked = link_or_copy(entry, output_path) if self.hardlink else copy_file(entry, output_path)
+        except FileNotFoundError:
+            return False
+        # A new link already bumps the shared inode's ctime, which evict() reads
+        if not linked:
+            os.utime(entry, ns=(time.time_ns(), stat.st_mtime_ns))
+        return True
+    
+    def store(self, template_path, renderer, extension, width, height, rendered_path):
+        entry = self.entry_path(template_path, renderer, extension, width, height)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=self.directory, prefix='.', suffix=extension)
+        os.close(fd)
+        stamp_fd, stamp_temp_name = tempfile.mkstemp(dir=self.directory, prefix='.', suffix=CACHE_STAMP_SUFFIX)
+        try:
+            shutil.copyfile(rendered_path, temp_name)
+            # mkstemp files are 0600; linked outputs share this mode, so make it a normal readable file
+            os.chmod(temp_name, 0o644)
+            # The rename keeps the inode, so the temp file's size and mtime are the entry's
+            stat = os.stat(temp_name)
+            with os.fdopen(stamp_fd, 'w', encoding='ascii') as f:
+                f.write(f"{stat.st_size} {stat.st_mtime_ns}\n")
+            os.replace(stamp_temp_name, self.stamp_path(entry))
+            os.replace(temp_name, entry)
+        except OSError:
+            Path(temp_name).unlink(missing_ok=True)
+            Path(stamp_temp_name).unlink(missing_ok=True)
+            raise
+    
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes; returns bytes freed."""
+        if not self.directory.exists():
+            return 0
+        entries = []
+        stamps = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            if not entry.name.startswith('.'):
+                stat = entry.stat()
+                entries.append((max(stat.st_atime, stat.st_ctime), stat.st_size, entry.path))
+            elif entry.name.endswith(CACHE_STAMP_SUFFIX):
+                stamps.append(Path(entry.path))
+        # Stamps whose entry was deleted by hand
+        names = {Path(path).name for _, _, path in entries}
+        for stamp in stamps:
+            if stamp.name[1:-len(CACHE_STAMP_SUFFIX)] not in names:
+                stamp.unlink(missing_ok=True)
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            self.discard(Path(path))
+            freed += size
+        return freed
+
+def copy_file(source, destination):
+    """Copy source's bytes to destination as a new file with its own inode; always False (not linked)."""
+    shutil.copyfile(source, destination)
+    return False
+
+def link_or_copy(source, destination):
+    """Hardlink source to destination, copying instead where links aren't possible; True if linked."""
+    try:
+        os.link(source, destination)
+        return True
+    except FileNotFoundError:
+        raise
+    except OSError:
+        return copy_file(source, destination)
+
+def publish_temp_path(file_path):
+    """Sibling path a replacement for file_path is rendered into before it is swapped in."""
+    file_path = Path(file_path)
+    # The pid keeps worker processes apart; the original extension stays last for the renderers
+    return file_path.with_name(f"{PUBLISH_PREFIX}{os.getpid()}-{file_path.name}")
+
+def publish_file(temp_path, file_path):
+    """Flush a finished render to disk and move it over file_path in one rename."""
+    # Windows can only flush handles opened for writing
+    with open(temp_path, 'r+b') as f:
+        os.fsync(f.fileno())
+    os.replace(temp_path, file_path)
+
+def publish_icon(template_path, file_path, extension, width, height, cache=None, master=None, stages=None,
+                 optimized=None):
+    """Render into a temp file beside file_path and os.replace() it over the original.
+    
+    An interrupted run leaves either the old file or the new one in place, never a
+    half-written icon. Returns (success, cached); the caller fsyncs the directory.
+    Seconds spent rendering and publishing are added to the stages dict when given;
+    optimized is passed through to render_icon().
+    """
+    temp_path = publish_temp_path(file_path)
+    temp_path.unlink(missing_ok=True)
+    start = time.perf_counter()
+    success, cached = render_icon(template_path, temp_path, extension, width, height, cache, master, optimized)
+    rendered = time.perf_counter()
+    try:
+        if success:
+            publish_file(temp_path, file_path)
+    except OSError as e:
+        print(f"  Warning: could not publish {file_path}: {e}")
+        success = False
+    finally:
+        if not success:
+            temp_path.unlink(missing_ok=True)
+        if stages is not None:
+            stages['render'] = rendered - start - (optimized or {}).get('seconds', 0.0)
+            if optimized:
+                stages['optimize'] = optimized['seconds']
+            stages['publish'] = time.perf_counter() - rendered
+    return success, cached
+
+def fsync_directories(directories):
+    """fsync each directory once so the renames in it survive a crash; a no-op on Windows."""
+    if os.name == 'nt':
+        return
+    for directory in sorted(set(map(str, directories))):
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            print(f"Warning: could not sync {directory}: {e}")
+
+def render_icon(template_path, output_path, extension, width, height, cache=None, master=None, optimized=None):
+    """Render the template to output_path, going through cache when given; returns (success, cached).
+    
+    PNGs are downscaled from master (a MasterRender) when one is given. When
+    optimized is a dict, fresh PNG renders go through optimize_png_file() before
+    they are cached, and its 'before'/'after' sizes and 'seconds' are stored there.
+    """
+    downscale = master is not None and extension == '.png'
+    optimize = optimized is not None and extension == '.png'
+    renderer = renderer_for(extension, downscale, optimize)
+    if cache is not None:
+        try:
+            if cache.fetch(template_path, renderer, extension, width, height, output_path):
+                return True, True
+        except OSError as e:
+            print(f"  Warning: render cache unavailable ({e})")
+    
+    success = False
+    if extension == '.svg':
+        success = create_svg_from_template(template_path, output_path, width, height)
+    elif downscale:
+        try:
+            success = master.save_resized(output_path, width, height)
+        except Exception as e:
+            print(f"Error creating PNG {output_path}: {e}")
+    elif extension == '.png':
+        success = create_png_from_template(template_path, output_path, width, height)
+    
+    if success and optimize:
+        start = time.perf_counter()
+        try:
+            optimized['before'], optimized['after'] = optimize_png_file(output_path)
+        except Exception as e:
+            print(f"  Warning: could not optimize {output_path} ({e})")
+        optimized['seconds'] = time.perf_counter() - start
+    
+    if success and cache is not None:
+        try:
+            cache.store(template_path, renderer, extension, width, height, output_path)
+        except OSError as e:
+            print(f"  Warning: could not add {output_path} to the render cache ({e})")
+    return success, False
+
+def replace_icon(file_info, template_path, cache=None, master=None, optimize=False):
+    """Render the template over one file, leaving the original untouched on failure.
+    
+    Runs in a worker process when --jobs is above 1, so it only takes picklable
+    arguments and returns the CSV row instead of touching shared state. The row
+    also carries per-stage timings, the bytes written and, with optimize, the bytes
+    saved by optimize_png() for the event log.
+    """
+    file_path = file_info['path']
+    relative_path = file_info['relative_path']
+    width = file_info['width']
+    height = file_info['height']
+    resolution = file_info['resolution']
+    format_type = file_info['format']
+    extension = file_info['extension']
+    
+    print(f"Processing: {relative_path} -> {resolution}")
+    
+    # Replace with template-based version at the discovered resolution
+    stages = {'probe': file_info['probe_seconds']}
+    optimized = {} if optimize else None
+    success, cached = publish_icon(template_path, file_path, extension, width, height, cache, master, stages,
+                                   optimized)
+    
+    bytes_written = 0
+    bytes_saved = optimized['before'] - optimized['after'] if optimized and 'after' in optimized else 0
+    if success:
+        status = "✓ Replaced (cached)" if cached else "✓ Replaced"
+        print(f"  ✓ {relative_path}: replaced with {resolution} version" + (" from cache" if cached else "")
+              + (f" (optimized: -{bytes_saved:,} bytes, {bytes_saved / optimized['before']:.0%})" if bytes_saved else ""))
+        bytes_written = file_path.stat().st_size
+    else:
+        status = "✗ Failed"
+        print(f"  ✗ {relative_path}: failed to replace, original kept")
+    
+    return {
+        'filename': str(relative_path),
+        'resolution': resolution,
+        'format': format_type,
+        'status': status,
+        'stages': stages,
+        'bytes': bytes_written,
+        'bytes_saved': bytes_saved
+    }
+
+def replace_icon_group(file_infos, template_path, cache=None, downscale=False, optimize=False):
+    """Replace a batch of files; with a cache, files of the same format and size render once.
+    
+    With downscale, the batch holds PNGs of one aspect ratio: the largest is rendered
+    once and every other size is resampled from it in memory.
+    """
+    master = None
+    if downscale and file_infos and file_infos[0]['extension'] == '.png':
+        largest = max(file_infos, key=lambda file_info: file_info['width'] * file_info['height'])
+        master = MasterRender(template_path, largest['width'], largest['height'])
+    return [replace_icon(file_info, template_path, cache, master, optimize) for file_info in file_infos]
+
+def scan_and_replace_icons(directory, template_path, jobs=1, cache=None, force=False, downscale=False,
+                           dry_run=False, log=None, optimize=False):
+    """Recursively scan directory for SVG and PNG files and replace them.
+    
+    With jobs > 1, Phase 2 runs across that many worker processes. With a
+    RenderCache, files are grouped by format and size so each unique size is
+    rendered at most once and fanned out to the rest of its group.
+    
+    Files recorded in the directory's .icon-manifest.json with the same template
+    hash, renderer, size and mtime are skipped without being opened, unless force.
+    
+    With downscale, PNGs are grouped by aspect ratio and resampled from one
+    master render per group instead of being rasterized one by one.
+    
+    Each output is published with an atomic replace, and every folder that changed
+    is fsynced once at the end. With dry_run, nothing is written: the files that
+    would be rendered are reported instead.
+    
+    With optimize, every freshly rendered PNG is losslessly recompressed with
+    optimize_png() before it is cached and published.
+    
+    Result rows go to log (a RunLog) as each file finishes, along with phase
+    timings; the rows it kept are returned.
+    """
     directory_path = Path(directory)
     template_file = Path(template_path)
+    if log is None:
+        log = RunLog(keep=None)
     
     if not directory_path.exists():
         print(f"Error: Directory '{directory}' does not exist.")
@@ -156,151 +1025,324 @@ def scan_and_replace_icons(directory, template_path):
         print(f"Error: Template file '{template_path}' does not exist.")
         return []
     
-    icons = []
-    processed = 0
-    errors = 0
     skipped = 0
+    up_to_date = 0
+    seen = set()
+    manifest = load_icon_manifest(directory_path)
+    digest = template_digest(template_file)
+    template_stat = template_file.stat()
     
     print("Phase 1: Scanning and analyzing existing icons...")
     
     # First pass: Scan and collect information about existing files
     files_to_process = []
-    for file_path in directory_path.rglob('*'):
-        if file_path.is_file():
-            extension = file_path.suffix.lower()
-            
-            if extension in ['.svg', '.png']:
-                relative_path = file_path.relative_to(directory_path)
-                
-                # Skip the template file itself
-                try:
-                    if file_path.samefile(template_file):
-                        print(f"Skipping template file: {relative_path}")
-                        continue
-                except (OSError, ValueError):
-                    # Files might not exist or be comparable, continue with name check
-                    if file_path.name == template_file.name:
-                        print(f"Skipping template file: {relative_path}")
-                        continue
-                
-                # Analyze current file to get its resolution
-                if extension == '.svg':
-                    width, height = get_svg_d2lensions(file_path)
-                    format_type = 'SVG'
-                elif extension == '.png':
-                    width, height = get_png_d2lensions(file_path)
-                    format_type = 'PNG'
-                
-                if width is not None and height is not None:
-                    resolution = f"{width}x{height}"
-                    files_to_process.append({
-                        'path': file_path,
-                        'relative_path': relative_path,
-                        'width': width,
-                        'height': height,
-                        'resolution': resolution,
-                        'format': format_type,
-                        'extension': extension
-                    })
-                    print(f"Found: {relative_path} ({resolution}, {format_type})")
-                else:
-                    icons.append({
-                        'filename': str(relative_path),
-                        'resolution': "Unknown",
-                        'format': format_type,
-                        'status': "- Skipped (unknown resolution)"
-                    })
-                    skipped += 1
-                    print(f"Skipped: {relative_path} (unknown resolution)")
-    
-    print(f"\nPhase 2: Replacing {len(files_to_process)} files with template...")
-    
-    # Second pass: Replace files with template-based versions
-    for file_info in files_to_process:
-        file_path = file_info['path']
-        relative_path = file_info['relative_path']
-        width = file_info['width']
-        height = file_info['height']
-        resolution = file_info['resolution']
-        format_type = file_info['format']
-        extension = file_info['extension']
+    phase_start = time.perf_counter()
+    probe_total = 0.0
+    for dir_entry in iter_icon_files(directory_path):
+        file_path = Path(dir_entry.path)
+        extension = os.path.splitext(dir_entry.name)[1].lower()
+        relative_path = file_path.relative_to(directory_path)
         
-        print(f"Processing: {relative_path} -> {resolution}")
+        # Left behind by an interrupted run; the original next to it is still intact
+        if dir_entry.name.startswith(PUBLISH_PREFIX):
+            if not dry_run:
+                file_path.unlink(missing_ok=True)
+                print(f"Removed unfinished render: {relative_path}")
+            continue
         
-        # Create backup
-        backup_path = file_path.with_suffix(f'.backup{file_path.suffix}')
-        try:
-            file_path.rename(backup_path)
-        except Exception as e:
-            print(f"  Warning: Could not create backup for {file_path}: {e}")
-            icons.append({
+        # Skip the template file itself (inode first, so samefile() only runs on a likely match)
+        if dir_entry.inode() == template_stat.st_ino and os.path.samefile(dir_entry.path, template_file):
+            print(f"Skipping template file: {relative_path}")
+            continue
+        
+        # Unchanged since we last wrote it from this template: nothing to do
+        manifest_key = relative_path.as_posix()
+        seen.add(manifest_key)
+        entry = manifest['files'].get(manifest_key)
+        stat = dir_entry.stat()
+        if (not force and entry
+                and entry['template'] == digest
+                and entry['renderer'] == renderer_for(extension, downscale, optimize)
+                and entry['size'] == stat.st_size
+                and entry['mtime_ns'] == stat.st_mtime_ns):
+            log.add({
                 'filename': str(relative_path),
-                'resolution': resolution,
-                'format': format_type,
-                'status': "✗ Failed (backup error)"
+                'resolution': f"{entry['width']}x{entry['height']}",
+                'format': extension[1:].upper(),
+                'status': "- Skipped (up to date)"
             })
-            errors += 1
+            up_to_date += 1
             continue
         
-        # Replace with template-based version at the discovered resolution
-        success = False
+        # Analyze current file to get its resolution
+        probe_start = time.perf_counter()
         if extension == '.svg':
-            success = create_svg_from_template(template_path, file_path, width, height)
+            width, height = get_svg_d2lensions(file_path)
+            format_type = 'SVG'
         elif extension == '.png':
-            success = create_png_from_template(template_path, file_path, width, height)
+            width, height = get_png_d2lensions(file_path)
+            format_type = 'PNG'
+        probe_seconds = time.perf_counter() - probe_start
+        probe_total += probe_seconds
         
-        if success:
+        if width is not None and height is not None:
+            resolution = f"{width}x{height}"
+            files_to_process.append({
+                'path': file_path,
+                'relative_path': relative_path,
+                'width': width,
+                'height': height,
+                'resolution': resolution,
+                'format': format_type,
+                'extension': extension,
+                'probe_seconds': probe_seconds
+            })
+            print(f"Found: {relative_path} ({resolution}, {format_type})")
+        else:
+            log.add({
+                'filename': str(relative_path),
+                'resolution': "Unknown",
+                'format': format_type,
+                'status': "- Skipped (unknown resolution)",
+                'stages': {'probe': probe_seconds}
+            })
+            skipped += 1
+            print(f"Skipped: {relative_path} (unknown resolution)")
+    log.add_phase('walk', time.perf_counter() - phase_start - probe_total)
+    log.add_phase('probe', probe_total)
+    
+    if dry_run:
+        for file_info in files_to_process:
+            extension = file_info['extension']
+            cached = cache is not None and cache.entry_path(
+                template_file, renderer_for(extension, downscale, optimize), extension,
+                file_info['width'], file_info['height']).exists()
+            log.add({
+                'filename': str(file_info['relative_path']),
+                'resolution': file_info['resolution'],
+                'format': file_info['format'],
+                'status': "~ Would replace (cached)" if cached else "~ Would replace",
+                'stages': {'probe': file_info['probe_seconds']}
+            })
+        
+        print(f"\nDry run complete:")
+        print(f"~ Would replace: {len(files_to_process)}")
+        print(f"- Skipped (up to date): {up_to_date}")
+        print(f"- Skipped (unknown resolution): {skipped}")
+        print(f"- Would remove from manifest: {sum(1 for key in manifest['files'] if key not in seen)}")
+        return log.rows
+    
+    print(f"\nPhase 2: Replacing {len(files_to_process)} files with template"
+          + (f" using {jobs} workers..." if jobs > 1 else "..."))
+    
+    # Second pass: Replace files with template-based versions
+    if cache is not None or downscale:
+        groups = {}
+        for file_info in files_to_process:
+            if downscale and file_info['extension'] == '.png':
+                group_key = ('.png', aspect_ratio(file_info['width'], file_info['height']))
+            else:
+                group_key = (file_info['extension'], file_info['width'], file_info['height'])
+            groups.setdefault(group_key, []).append(file_info)
+        batches = list(groups.values())
+    else:
+        batches = [[file_info] for file_info in files_to_process]
+    
+    # Record what was written so the next run can skip it, as each result comes back
+    file_infos = {str(file_info['relative_path']): file_info for file_info in files_to_process}
+    changed_directories = set()
+    processed = 0
+    errors = 0
+    
+    def finish(icon):
+        nonlocal processed, errors
+        file_info = file_infos[icon['filename']]
+        manifest_key = file_info['relative_path'].as_posix()
+        if icon['status'].startswith('✓'):
             processed += 1
-            status = "✓ Replaced"
-            print(f"  ✓ Successfully replaced with {resolution} version")
-            # Remove backup if successful
-            try:
-                backup_path.unlink()
-            except:
-                pass
+            changed_directories.add(file_info['path'].parent)
+            stat = file_info['path'].stat()
+            manifest['files'][manifest_key] = {
+                'template': digest,
+                'renderer': renderer_for(file_info['extension'], downscale, optimize),
+                'width': file_info['width'],
+                'height': file_info['height'],
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+            }
         else:
             errors += 1
-            status = "✗ Failed"
-            print(f"  ✗ Failed to replace")
-            # Restore backup if failed
-            try:
-                backup_path.rename(file_path)
-            except:
-                print(f"  ✗ Could not restore backup!")
-        
-        icons.append({
-            'filename': str(relative_path),
-            'resolution': resolution,
-            'format': format_type,
-            'status': status
-        })
+            manifest['files'].pop(manifest_key, None)
+        log.add(icon)
+    
+    with log.phase('render'):
+        if jobs > 1 and len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [
+                    executor.submit(replace_icon_group, batch, template_path, cache, downscale, optimize)
+                    for batch in batches
+                ]
+                for future in as_completed(futures):
+                    for icon in future.result():
+                        finish(icon)
+        else:
+            for batch in batches:
+                for icon in replace_icon_group(batch, template_path, cache, downscale, optimize):
+                    finish(icon)
+    
+    # Forget files that are gone
+    removed = [key for key in manifest['files'] if key not in seen]
+    for key in removed:
+        del manifest['files'][key]
+    with log.phase('manifest'):
+        if files_to_process or removed:
+            save_icon_manifest(directory_path, manifest)
+            changed_directories.add(directory_path)
+    with log.phase('fsync'):
+        fsync_directories(changed_directories)
+    
+    if cache is not None:
+        with log.phase('evict'):
+            freed = cache.evict()
+        if freed:
+            print(f"Evicted {freed / 1024 / 1024:.1f} MB from the render cache")
     
     print(f"\nProcessing complete:")
-    print(f"✓ Successfully processed: {processed}")
+    print(f"✓ Rendered: {processed}")
     print(f"✗ Errors: {errors}")
+    print(f"- Skipped (up to date): {up_to_date}")
     print(f"- Skipped (unknown resolution): {skipped}")
+    print(f"- Removed from manifest: {len(removed)}")
     
-    return icons
+    return log.rows
 
-def write_to_csv(icons, output_file):
-    """Write results to CSV file."""
-    try:
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['filename', 'resolution', 'format', 'status']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for icon in sorted(icons, key=lambda x: x['filename'].lower()):
-                writer.writerow(icon)
+CSV_FIELDS = ['filename', 'resolution', 'format', 'status']
+# Only this many rows are kept in memory for the table printed at the end
+TABLE_ROW_LIMIT = 2000
+# Upper bounds, in milliseconds, of the per-stage duration histogram buckets
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, math.inf)
+
+class RunLog:
+    """Streams result rows to the CSV log and a JSONL event log as files finish.
+    
+    Rows are written in completion order the moment they arrive, so a large tree is
+    never held in memory; only the first `keep` rows are retained for the closing
+    table (None keeps them all). Rows may carry 'stages' (seconds per stage),
+    'bytes' and 'bytes_saved', which feed the histograms and totals of print_summary().
+    """
+    
+    def __init__(self, csv_path=None, events_path=None, keep=TABLE_ROW_LIMIT):
+        self.csv_path = csv_path
+        self.keep = keep
+        self.rows = []
+        self.total_rows = 0
+        self.statuses = {}
+        self.bytes_written = 0
+        self.bytes_saved = 0
+        self.phases = {}
+        # stage -> [count, total seconds, max seconds, bucket counts]
+        self.stages = {}
+        self.started = time.perf_counter()
+        self._csv_file = None
+        self._csv = None
+        self._events = None
+        if csv_path:
+            try:
+                self._csv_file = open(csv_path, 'w', newline='', encoding='utf-8')
+                self._csv = csv.DictWriter(self._csv_file, fieldnames=CSV_FIELDS, extrasaction='ignore')
+                self._csv.writeheader()
+            except OSError as e:
+                print(f"Error writing to CSV: {e}")
+        if events_path:
+            try:
+                self._events = open(events_path, 'w', encoding='utf-8')
+            except OSError as e:
+                print(f"Error writing event log: {e}")
+    
+    def _event(self, event):
+        if self._events:
+            self._events.write(json.dumps(event, ensure_ascii=False) + '\n')
+    
+    def add(self, row):
+        """Record one file's result row."""
+        self.total_rows += 1
+        if self.keep is None or len(self.rows) < self.keep:
+            self.rows.append(row)
+        self.statuses[row['status']] = self.statuses.get(row['status'], 0) + 1
+        self.bytes_written += row.get('bytes', 0)
+        self.bytes_saved += row.get('bytes_saved', 0)
+        stages = row.get('stages', {})
+        for stage, seconds in stages.items():
+            counts = self.stages.setdefault(stage, [0, 0.0, 0.0, [0] * len(HISTOGRAM_BOUNDS_MS)])
+            counts[0] += 1
+            counts[1] += seconds
+            counts[2] = max(counts[2], seconds)
+            counts[3][next(i for i, bound in enumerate(HISTOGRAM_BOUNDS_MS) if seconds * 1000 < bound)] += 1
+        if self._csv:
+            self._csv.writerow(row)
+        self._event({
+            'event': 'file',
+            **{field: row[field] for field in CSV_FIELDS},
+            'stages': {stage: round(seconds, 6) for stage, seconds in stages.items()},
+            'bytes': row.get('bytes', 0),
+            'bytes_saved': row.get('bytes_saved', 0),
+        })
+    
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        self._event({'event': 'phase', 'phase': name, 'seconds': round(seconds, 6)})
+    
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as phase `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+    
+    def close(self):
+        self._event({
+            'event': 'summary',
+            'files': self.total_rows,
+            'bytes': self.bytes_written,
+            'bytes_saved': self.bytes_saved,
+            'seconds': round(time.perf_counter() - self.started, 6),
+            'statuses': self.statuses,
+            'phases': {name: round(seconds, 6) for name, seconds in self.phases.items()},
+        })
+        for handle in (self._csv_file, self._events):
+            if handle:
+                handle.close()
+        if self._csv_file:
+            print(f"\nResults written to: {self.csv_path}")
+    
+    def print_summary(self):
+        """Print phase times, status counters and a duration histogram per stage."""
+        total = time.perf_counter() - self.started
+        print("\nTiming:")
+        for name, seconds in self.phases.items():
+            print(f"  {name:<10} {seconds:9.3f}s")
+        print(f"  {'total':<10} {total:9.3f}s")
         
-        print(f"\nResults written to: {output_file}")
-        return True
-    except Exception as e:
-        print(f"Error writing to CSV: {e}")
-        return False
+        print("\nCounters:")
+        for status, count in sorted(self.statuses.items()):
+            print(f"  {status}: {count}")
+        print(f"  Bytes written: {self.bytes_written:,}")
+        if self.bytes_saved:
+            saved_share = self.bytes_saved / (self.bytes_written + self.bytes_saved)
+            print(f"  Bytes saved by PNG optimization: {self.bytes_saved:,} ({saved_share:.1%})")
+        
+        for stage, (count, seconds, longest, buckets) in self.stages.items():
+            print(f"\n{stage}: {count} files, mean {seconds / count * 1000:.2f} ms, max {longest * 1000:.2f} ms")
+            used = [i for i, bucket in enumerate(buckets) if bucket]
+            peak = max(buckets)
+            for i in range(used[0], used[-1] + 1):
+                label = f"< {HISTOGRAM_BOUNDS_MS[i]:g} ms" if HISTOGRAM_BOUNDS_MS[i] != math.inf else ">= 10 s"
+                print(f"  {label:>10} {buckets[i]:6} {'#' * round(buckets[i] / peak * 40)}")
 
-def print_results(icons):
-    """Print results in a formatted table."""
+def print_results(icons, total=None):
+    """Print results in a formatted table; total is the row count when only some rows were kept."""
     if not icons:
         print("No SVG or PNG files found.")
         return
@@ -326,9 +1368,11 @@ def print_results(icons):
     for icon in sorted(icons, key=lambda x: x['filename'].lower()):
         print(f"{icon['filename']:<{filename_width}} | {icon['resolution']:<{resolution_width}} | {icon['format']:<{format_width}} | {icon['status']:<{status_width}}")
     
-    print(f"\nTotal files found: {len(icons)}")
+    if total is not None and total > len(icons):
+        print(f"... {total - len(icons)} more rows in the CSV log")
+    print(f"\nTotal files found: {total if total is not None else len(icons)}")
 
-def process_single_file(file_path, template_path):
+def process_single_file(file_path, template_path, cache=None, dry_run=False, optimize=False):
     """Process a single file instead of scanning directory."""
     file_path = Path(file_path)
     template_file = Path(template_path)
@@ -359,12 +1403,14 @@ def process_single_file(file_path, template_path):
     print(f"Processing single file: {file_path}")
     
     # Analyze current file to get its resolution
+    probe_start = time.perf_counter()
     if extension == '.svg':
         width, height = get_svg_d2lensions(file_path)
         format_type = 'SVG'
     elif extension == '.png':
         width, height = get_png_d2lensions(file_path)
         format_type = 'PNG'
+    stages = {'probe': time.perf_counter() - probe_start}
     
     if width is None or height is None:
         print(f"Error: Could not determine resolution of {file_path}")
@@ -372,150 +1418,128 @@ def process_single_file(file_path, template_path):
             'filename': str(file_path.name),
             'resolution': "Unknown",
             'format': format_type,
-            'status': "- Skipped (unknown resolution)"
+            'status': "- Skipped (unknown resolution)",
+            'stages': stages
         }]
     
     resolution = f"{width}x{height}"
     print(f"Found resolution: {resolution}")
     
-    # Create backup
-    backup_path = file_path.with_suffix(f'.backup{file_path.suffix}')
-    try:
-        file_path.rename(backup_path)
-        print(f"Created backup: {backup_path.name}")
-    except Exception as e:
-        print(f"Error: Could not create backup for {file_path}: {e}")
+    if dry_run:
+        print(f"Dry run: would replace {file_path.name} with a {resolution} render")
         return [{
             'filename': str(file_path.name),
             'resolution': resolution,
             'format': format_type,
-            'status': "✗ Failed (backup error)"
+            'status': "~ Would replace",
+            'stages': stages
         }]
     
     # Replace with template-based version at the discovered resolution
     print(f"Replacing with template at {resolution}...")
-    success = False
-    if extension == '.svg':
-        success = create_svg_from_template(template_path, file_path, width, height)
-    elif extension == '.png':
-        success = create_png_from_template(template_path, file_path, width, height)
+    optimized = {} if optimize else None
+    success, cached = publish_icon(template_path, file_path, extension, width, height, cache, stages=stages,
+                                   optimized=optimized)
     
+    bytes_written = 0
+    bytes_saved = optimized['before'] - optimized['after'] if optimized and 'after' in optimized else 0
     if success:
-        print(f"✓ Successfully replaced {file_path.name} with {resolution} version")
-        status = "✓ Replaced"
-        # Remove backup if successful
-        try:
-            backup_path.unlink()
-            print("Backup removed (replacement successful)")
-        except:
-            print("Warning: Could not remove backup file")
+        fsync_directories([file_path.parent])
+        bytes_written = file_path.stat().st_size
+        print(f"✓ Successfully replaced {file_path.name} with {resolution} version" + (" from cache" if cached else ""))
+        if bytes_saved:
+            print(f"  Optimized: {optimized['before']:,} -> {optimized['after']:,} bytes")
+        status = "✓ Replaced (cached)" if cached else "✓ Replaced"
     else:
-        print(f"✗ Failed to replace {file_path.name}")
+        print(f"✗ Failed to replace {file_path.name}; original file left untouched")
         status = "✗ Failed"
-        # Restore backup if failed
-        try:
-            backup_path.rename(file_path)
-            print("Original file restored from backup")
-        except:
-            print("✗ Critical error: Could not restore backup!")
     
     return [{
         'filename': str(file_path.name),
         'resolution': resolution,
         'format': format_type,
-        'status': status
+        'status': status,
+        'stages': stages,
+        'bytes': bytes_written,
+        'bytes_saved': bytes_saved
     }]
 
 def main():
     """Main function."""
-    if len(sys.argv) > 3:
-        print("Usage:")
-        print("  python icon_replacer.py [directory_path]          # Process directory")
-        print("  python icon_replacer.py --file <file_path>        # Process single file")
-        print("")
-        print("Examples:")
-        print("  python icon_replacer.py ./icons                   # Process icons directory") 
-        print("  python icon_replacer.py                           # Process current directory")
-        print("  python icon_replacer.py --file icon.svg           # Process single file")
-        print("  python icon_replacer.py --file ./icons/test.png   # Process single file with path")
-        print("")
-        print("Requires 'input.svg' template file in the same directory as the script.")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Replace SVG and PNG icons with versions of input.svg at their current resolutions.",
+        epilog="Requires 'input.svg' template file in the same directory as the script.",
+    )
+    parser.add_argument('directory', nargs='?', default='.',
+                        help="directory to scan recursively (default: current directory)")
+    parser.add_argument('--file', metavar='FILE_PATH',
+                        help="process a single file instead of scanning a directory")
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help="render files in N worker processes (0 = one per CPU core; default: 1)")
+    parser.add_argument('--cache-dir', default=None,
+                        help=f"render cache location (default: {default_cache_dir()})")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_MB, metavar='MB',
+                        help=f"evict least recently used renders beyond this size (default: {DEFAULT_CACHE_MB})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="render every file from scratch without the render cache")
+    parser.add_argument('--hardlink-cache', action='store_true',
+                        help="hardlink render cache hits into place instead of copying them; saves disk space, "
+                             "but outputs then share an inode with the cache and with each other")
+    parser.add_argument('--downscale', action='store_true',
+                        help="render each PNG aspect ratio once at its largest size and resample "
+                             "the smaller sizes from it with Pillow (LANCZOS)")
+    parser.add_argument('--splash', action='store_true',
+                        help="regenerate splash/splash-WxH.png from splash.json and splash.svg "
+                             "instead of scanning (replaces build_icons.cjs's splash loop)")
+    parser.add_argument('--ico', action='store_true',
+                        help="regenerate <version>/favicon.ico (48/32/16) from favicon-<version>.svg "
+                             "instead of scanning")
+    parser.add_argument('--allow-placeholders', action='store_true',
+                        help="with --splash/--ico, write placeholder images when Inkscape is not installed "
+                             "instead of refusing to overwrite the real ones")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="report which files would be re-rendered without writing anything")
+    parser.add_argument('--events', metavar='PATH',
+                        help="write a JSONL event log: one line per file with stage timings and bytes written, "
+                             "plus phase timings and a closing summary")
+    parser.add_argument('--optimize-png', action='store_true',
+                        help="losslessly recompress rendered PNGs (palette/gray/alpha reduction, metadata "
+                             "stripped, zlib level/strategy sweep), keeping the smallest pixel-identical file")
+    parser.add_argument('--force', action='store_true',
+                        help=f"re-render files even if {MANIFEST_NAME} says they are up to date")
+    args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache = None if args.no_cache else RenderCache(args.cache_dir, args.cache_size * 1024 * 1024,
+                                                   args.hardlink_cache)
     
     script_dir = Path(__file__).parent
     template_path = script_dir / "input.svg"
     
-    # Check for single file mode
-    if len(sys.argv) == 3 and sys.argv[1] == '--file':
-        single_file = sys.argv[2]
-        
-        print("Icon Template Replacer - Single File Mode")
+    if args.splash or args.ico:
+        print("Icon Template Replacer - Splash/ICO Mode")
         print("=" * 50)
-        print(f"Processing file: {os.path.abspath(single_file)}")
-        print(f"Using template: {template_path}")
-        
-        if HAS_INKSCAPE:
-            print("✓ Inkscape found - high quality PNG conversion available")
-        else:
-            print("⚠ Inkscape not found - will create placeholder PNGs")
-            print("  For best results, install Inkscape: https://inkscape.org/")
-        print()
-        
-        # Check if template exists
-        if not template_path.exists():
-            print(f"Error: Template file 'input.svg' not found in {script_dir}")
-            print("Please ensure 'input.svg' exists in the same directory as this script.")
+        if not HAS_INKSCAPE and not args.allow_placeholders and not args.dry_run:
+            print("Error: Inkscape not found; refusing to overwrite splash screens and favicons with placeholders.")
+            print("  Install Inkscape (https://inkscape.org/) or pass --allow-placeholders.")
             sys.exit(1)
-        
-        print("Checking dependencies...")
-        if not HAS_INKSCAPE:
-            print("Note: Inkscape not found. PNG generation will use placeholders.")
-            print("For high-quality PNG conversion, install Inkscape from: https://inkscape.org/")
-        print()
-        
-        icons = process_single_file(single_file, template_path)
-        
-        # Generate output filename based on the processed file
-        file_stem = Path(single_file).stem
-        output_file = f"icon_replacement_log_{file_stem}.csv"
-        
+        log = RunLog(None if args.dry_run else "icon_replacement_log_splash.csv", args.events)
+        with log.phase('render'):
+            icons = build_splash_and_ico(script_dir, args.splash, args.ico, jobs, args.optimize_png, args.dry_run)
+        for icon in icons:
+            log.add(icon)
+        log.close()
+        print_results(log.rows, log.total_rows)
+        log.print_summary()
+        return
+    
+    if args.file:
+        print("Icon Template Replacer - Single File Mode")
+        print("=" * 50)
+        print(f"Processing file: {os.path.abspath(args.file)}")
     else:
-        # Directory mode (original behavior)
-        directory = sys.argv[1] if len(sys.argv) == 2 else "."
-        
         print("Icon Template Replacer - Directory Mode")
         print("=" * 50)
-        print(f"Scanning directory: {os.path.abspath(directory)}")
-        print(f"Using template: {template_path}")
-        
-        if HAS_INKSCAPE:
-            print("✓ Inkscape found - high quality PNG conversion available")
-        else:
-            print("⚠ Inkscape not found - will create placeholder PNGs")
-            print("  For best results, install Inkscape: https://inkscape.org/")
-        
-        print("Looking for SVG and PNG files recursively...\n")
-        
-        # Check if template exists
-        if not template_path.exists():
-            print(f"Error: Template file 'input.svg' not found in {script_dir}")
-            print("Please ensure 'input.svg' exists in the same directory as this script.")
-            sys.exit(1)
-        
-        print("Checking dependencies...")
-        if not HAS_INKSCAPE:
-            print("Note: Inkscape not found. PNG generation will use placeholders.")
-            print("For high-quality PNG conversion, install Inkscape from: https://inkscape.org/")
-        print()
-        
-        icons = scan_and_replace_icons(directory, template_path)
-        
-        # Generate output filename
-        output_file = "icon_replacement_log.csv"
-    
-    print("Icon Template Replacer")
-    print("=" * 50)
-    print(f"Scanning directory: {os.path.abspath(directory)}")
+        print(f"Scanning directory: {os.path.abspath(args.directory)}")
     print(f"Using template: {template_path}")
     
     if HAS_INKSCAPE:
@@ -523,8 +1547,7 @@ def main():
     else:
         print("⚠ Inkscape not found - will create placeholder PNGs")
         print("  For best results, install Inkscape: https://inkscape.org/")
-    
-    print("Looking for SVG and PNG files recursively...\n")
+    print()
     
     # Check if template exists
     if not template_path.exists():
@@ -532,21 +1555,24 @@ def main():
         print("Please ensure 'input.svg' exists in the same directory as this script.")
         sys.exit(1)
     
-    # Check for required dependencies
-    print("Checking dependencies...")
-    if not HAS_INKSCAPE:
-        print("Note: Inkscape not found. PNG generation will use placeholders.")
-        print("For high-quality PNG conversion, install Inkscape from: https://inkscape.org/")
-    print()
-    
-    icons = scan_and_replace_icons(directory, template_path)
+    # Generate output filename based on the processed file; a dry run leaves the last real log alone
+    output_file = f"icon_replacement_log_{Path(args.file).stem}.csv" if args.file else "icon_replacement_log.csv"
+    log = RunLog(None if args.dry_run else output_file, args.events)
     
-    # Generate output filename
-    output_file = "icon_replacement_log.csv"
+    # Rows are written to the CSV (and event log) as files finish
+    if args.file:
+        with log.phase('process'):
+            icons = process_single_file(args.file, template_path, cache, args.dry_run, args.optimize_png)
+        for icon in icons:
+            log.add(icon)
+    else:
+        print("Looking for SVG and PNG files recursively...\n")
+        scan_and_replace_icons(args.directory, template_path, jobs, cache, args.force, args.downscale,
+                               args.dry_run, log, args.optimize_png)
     
-    # Write to CSV and display results
-    write_to_csv(icons, output_file)
-    print_results(icons)
+    log.close()
+    print_results(log.rows, log.total_rows)
+    log.print_summary()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmarks
+Times the roll appraiser data pipeline (backend/get_light.py) and the icon
+pipeline (icons/scan.py) stage by stage on synthetic inputs, and compares the
+results against a saved baseline. Everything runs offline: the download stage
+talks to light_standin on localhost.
+
+Data stages, on appraiser-shaped JSON at N x today's size:
+    download   light_download from a local light_standin, gzip-encoded, decoded
+    parse      json.loads of the raw payload
+    normalize  light_normalize.normalize + dumps
+    write      atomic_write_bytes of the normalized payload
+    compress   get_light.write_compressed_variants: .br and .gz, each written atomically
+               (skipped without the 'brotli' package, as in get_light)
+
+Icon stages, on a tree of N mixed SVG/PNG targets:
+    walk       iter_icon_files, stat'ing each entry
+    probe      get_svg_d2lensions / get_png_d2lensions
+    render     render_icon into each target's publish temp file (no render cache)
+    publish    publish_file over every target, then one fsync per directory
+
+Each case runs in a fresh interpreter so peak RSS is not inherited from the one
+before; on Linux the peak is reset between stages through /proc/self/clear_refs.
+Scales default to 1,5; pass --scales 1,5,20 explicitly for the 20x case, whose
+raw payload is over 1 GB and needs several times that in RAM to parse.
+
+Usage:
+    python scripts/benchmark_pipelines.py run [--scales 1,5] [--icons 1000,5000] [--repeat N] [-o baseline.json]
+    python scripts/benchmark_pipelines.py compare <baseline.json> [current.json] [--threshold 0.10]
+
+compare without current.json re-runs the baseline's cases first. It exits with
+status 1 when any stage got slower or used more memory than the threshold allows.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BACKEND_DIR = REPO_ROOT / 'backend'
+ICONS_DIR = REPO_ROOT / 'icons'
+
+BASELINE_VERSION = 1
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+DEFAULT_SCALES = '1,5'
+DEFAULT_ICON_COUNTS = '1000,5000'
+DEFAULT_THRESHOLD = 0.10
+# Stages faster than this in both runs are too noisy to flag
+DEFAULT_MIN_SECONDS = 0.05
+SEED = 2018
+
+# Shape of today's light.gg payload (about 68 MB of JSON)
+BASE_WEAPONS = 1706
+BASE_STAT_ITEMS = 1112
+BASE_MW_ITEMS = 1094
+BASE_REVIEWS = 4472
+PERK_COLUMNS = 5
+PERKS_PER_COLUMN = 8
+TRAITS_PER_ITEM = 176
+MWS_PER_ITEM = 40
+ROLL_COLUMNS = 6
+PERK_POOL = 1500
+
+# Target sizes seen in icons/, weighted towards the small favicons
+ICON_SIZES = [(16, 16), (32, 32), (48, 48), (96, 96), (180, 180), (192, 192), (512, 512),
+              (640, 1136), (1136, 640), (750, 1334), (1242, 2208)]
+ICON_SIZE_WEIGHTS = [6, 6, 4, 4, 3, 3, 2, 1, 1, 1, 1]
+ICONS_PER_DIRECTORY = 100
+
+def reset_peak_rss():
+    """Reset the kernel's peak-RSS mark for this process (Linux only); False if unsupported."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def peak_rss_bytes():
+    """Peak resident set size since the last reset_peak_rss(), or for the whole process."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class StageTimer:
+    """Collects wall time, CPU time, peak RSS and throughput for named stages."""
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Time the block; it may set 'items' and 'bytes' on the yielded dict for throughput."""
+        counts = {'items': 0, 'bytes': 0}
+        reset_peak_rss()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        yield counts
+        wall = time.perf_counter() - wall
+        self.stages[name] = {
+            'wall_seconds': round(wall, 6),
+            'cpu_seconds': round(time.process_time() - cpu, 6),
+            'peak_rss_mb': round(peak_rss_bytes() / 1024 / 1024, 2),
+            'items': counts['items'],
+            'bytes': counts['bytes'],
+            'items_per_second': round(counts['items'] / wall, 2) if wall else None,
+            'mb_per_second': round(counts['bytes'] / 1024 / 1024 / wall, 3) if wall else None,
+        }
+
+def write_table(f, name, entries, first=False):
+    """Stream one top-level {key: value} table of the payload to f."""
+    f.write(f'{"" if first else ", "}"{name}": {{')
+    for index, (key, value) in enumerate(entries):
+        f.write(f'{", " if index else ""}"{key}": {json.dumps(value)}')
+    f.write('}')
+
+def generate_appraiser_json(path, scale, seed=SEED):
+    """Write a light.gg-shaped payload at `scale` x today's size to path; returns its size in bytes.
+
+    Weapons with roll stats carry standard/enhanced perk pairs in RandomRolls so
+    the enhanced mapping is exercised, and the per-item tables have today's
+    average widths.
+    """
+    rng = random.Random(seed)
+    hashes = rng.sample(range(1, 2**32), int(BASE_WEAPONS * scale) + PERK_POOL * 2)
+    items, perk_hashes = hashes[:int(BASE_WEAPONS * scale)], hashes[int(BASE_WEAPONS * scale):]
+    # Every other pool perk has an enhanced version, which gets the higher hash
+    perks = []
+    for index in range(PERK_POOL):
+        standard, enhanced = sorted(perk_hashes[2 * index:2 * index + 2])
+        perks.append((f"Perk {index}", standard, enhanced if index % 2 == 0 else None))
+
+    def perk_entry(item_hash, perk, rank, column):
+        name, standard, enhanced = perk
+        return {
+            'IntItemHash': item_hash - 2**32 if item_hash >= 2**31 else item_hash,
+            'ItemHash': item_hash,
+            'IntPerkHash': standard - 2**32 if standard >= 2**31 else standard,
+            'PerkHash': standard,
+            'PerkEnhancedHash': enhanced,
+            'Count': rng.randint(1, 20000),
+            'Rank': rank,
+            'PerkIDX': column,
+            'Show': rng.random() < 0.8,
+        }
+
+    rolled = set(items[:int(BASE_STAT_ITEMS * scale)])
+
+    def weapon(item_hash):
+        def plug(perk, enhanced=False):
+            name, standard, enhanced_hash = perk
+            return {
+                'ItemHash': enhanced_hash if enhanced else standard,
+                'Name': name,
+                'EnhancedItemHash': None if enhanced else enhanced_hash,
+                'EnhancedVersionOfItemHash': standard if enhanced else None,
+                'Tier': 2,
+                'ImageURL': f"https://www.bungie.net/common/destiny2_content/icons/{rng.getrandbits(128):032x}.png",
+                'PrefMode': None,
+            }
+        rolls = [] if item_hash in rolled else None
+        for _ in range(ROLL_COLUMNS if item_hash in rolled else 0):
+            column = []
+            for perk in rng.sample(perks, PERKS_PER_COLUMN):
+                column.append(plug(perk))
+                if perk[2]:
+                    column.append(plug(perk, enhanced=True))
+            rolls.append(column)
+        return {
+            'ItemHash': item_hash,
+            'Class': 3,
+            'Name': f"Weapon {item_hash}",
+            'Description': "",
+            'ItemTypeDisplayName': rng.choice(["Auto Rifle", "Hand Cannon", "Pulse Rifle", "Sniper Rifle"]),
+            'IconPath': f"/common/destiny2_content/icons/{rng.getrandbits(128):032x}.jpg",
+            'ScreenshotPath': f"/common/destiny2_content/screenshots/{item_hash}.jpg",
+            'HasIcon': False,
+            'Tier': 5,
+            'Stats': [{'StatHash': rng.getrandbits(32), 'Value': rng.randint(0, 100), 'Scalable': True}
+                      for _ in range(13)],
+            'CuratedRolls': [[plug(rng.choice(perks))] for _ in range(ROLL_COLUMNS - 1)],
+            'RandomRolls': rolls,
+        }
+
+    def perk_stats(item_hash):
+        return [[perk_entry(item_hash, perk, rank + 1, column)
+                 for rank, perk in enumerate(rng.sample(perks, PERKS_PER_COLUMN))]
+                for column in range(PERK_COLUMNS)]
+
+    def trait_stats(_):
+        traits = []
+        for _ in range(TRAITS_PER_ITEM):
+            (_, perk4, perk4_enhanced), (_, perk5, perk5_enhanced) = rng.sample(perks, 2)
+            traits.append({
+                'Perk4Hash': perk4,
+                'Perk4EnhancedHash': perk4_enhanced,
+                'Perk5Hash': perk5,
+                'Perk5EnhancedHash': perk5_enhanced,
+                'Count': rng.randint(1, 5000),
+                'Show': rng.random() < 0.5,
+                'DateSaved': "2025-08-25T05:01:00" if rng.random() < 0.5 else None,
+            })
+        return traits
+
+    def mw_stats(item_hash):
+        return [perk_entry(item_hash, perk, rank + 1, 7) for rank, perk in enumerate(rng.sample(perks, MWS_PER_ITEM))]
+
+    def review(_):
+        pve, pvp = rng.randint(0, 50) / 10, rng.randint(0, 50) / 10
+        return {'ReviewCount': rng.randint(1, 500), 'PVEAvg': pve, 'PVPAvg': pvp, 'OverallAvg': (pve + pvp) / 2}
+
+    def table(count, build):
+        return ((item_hash, build(item_hash)) for item_hash in items[:int(count * scale)])
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{')
+        write_table(f, 'Weapons', table(BASE_WEAPONS, weapon), first=True)
+        write_table(f, 'PerkStats', table(BASE_STAT_ITEMS, perk_stats))
+        write_table(f, 'TraitStats', table(BASE_STAT_ITEMS, trait_stats))
+        write_table(f, 'MWStats', table(BASE_MW_ITEMS, mw_stats))
+        # Reviews cover more items than there are weapons; reuse hashes past the end
+        reviews = ((rng.getrandbits(32), review(None)) for _ in range(int(BASE_REVIEWS * scale)))
+        write_table(f, 'ReviewSummary', reviews)
+        f.write('}')
+    return path.stat().st_size
+
+def generate_icon_tree(root, count, seed=SEED):
+    """Fill root with `count` SVG/PNG targets spread over subdirectories; returns the template path."""
+    from PIL import Image
+
+    rng = random.Random(seed)
+    template_path = root / 'input.svg'
+    shutil.copyfile(ICONS_DIR / 'input.svg', template_path)
+    png_bytes = {}
+    for index in range(count):
+        width, height = rng.choices(ICON_SIZES, ICON_SIZE_WEIGHTS)[0]
+        directory = root / f"set-{index // ICONS_PER_DIRECTORY:03d}"
+        directory.mkdir(exist_ok=True)
+        if index % 2:
+            if (width, height) not in png_bytes:
+                buffer = BytesIO()
+                Image.new('RGBA', (width, height), (49, 50, 51, 255)).save(buffer, 'PNG')
+                png_bytes[(width, height)] = buffer.getvalue()
+            (directory / f"icon-{index:05d}.png").write_bytes(png_bytes[(width, height)])
+        else:
+            (directory / f"icon-{index:05d}.svg").write_text(
+                f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+                f'viewBox="0 0 {width} {height}"><rect width="{width}" height="{height}" fill="#313233"/></svg>',
+                encoding='utf-8')
+    return template_path
+
+def run_data_case(scale, workdir):
+    """Generate one payload and time every data stage on it."""
+    sys.path.insert(0, str(BACKEND_DIR))
+    import get_light
+    import light_download
+    import light_normalize
+    import light_standin
+    import requests
+    from light_files import atomic_write_bytes
+
+    raw_path = workdir / 'rollAppraiserData.json'
+    generate_started = time.perf_counter()
+    input_bytes = generate_appraiser_json(raw_path, scale)
+    result = {
+        'kind': 'data',
+        'scale': scale,
+        'input_bytes': input_bytes,
+        'generate_seconds': round(time.perf_counter() - generate_started, 3),
+    }
+    timer = StageTimer()
+
+    server = light_standin.serve(light_standin.StandinState(raw_path, encoding='gzip'), port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/data/"
+        body_path = workdir / 'download.body'
+        with timer.stage('download') as counts:
+            with requests.Session() as session:
+                transfer = light_download.download(session, url, body_path)
+            counts['bytes'] = sum(len(chunk) for chunk in
+                                  light_download.iter_decoded(body_path, transfer['content_encoding']))
+            counts['items'] = 1
+        body_path.unlink()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    with timer.stage('parse') as counts:
+        raw = json.loads(raw_path.read_bytes())
+        counts['bytes'] = input_bytes
+        counts['items'] = len(raw.get('PerkStats', {}))
+
+    with timer.stage('normalize') as counts:
+        normalized = light_normalize.normalize(raw)
+        payload = light_normalize.dumps(normalized)
+        counts['bytes'] = input_bytes
+        counts['items'] = len(normalized['PerkStats'])
+    del raw, normalized
+
+    normalized_path = workdir / 'rollAppraiserData.normalized.json'
+    with timer.stage('write') as counts:
+        atomic_write_bytes(normalized_path, payload)
+        counts['bytes'] = len(payload)
+        counts['items'] = 1
+
+    result['output_bytes'] = {'normalized': len(payload)}
+    if get_light.HAS_BROTLI:
+        with timer.stage('compress') as counts:
+            get_light.write_compressed_variants(normalized_path, payload, write_gzip=True)
+            counts['bytes'] = len(payload) * 2
+            counts['items'] = 2
+        result['output_bytes'].update({suffix: Path(f"{normalized_path}{suffix}").stat().st_size
+                                       for suffix in ('.br', '.gz')})
+    result['stages'] = timer.stages
+    return result
+
+def run_icon_case(count, workdir):
+    """Generate one icon tree and time every icon stage on it."""
+    sys.path.insert(0, str(ICONS_DIR))
+    import scan
+
+    root = workdir / 'icons'
+    root.mkdir()
+    generate_started = time.perf_counter()
+    template_path = generate_icon_tree(root, count)
+    result = {
+        'kind': 'icons',
+        'count': count,
+        'renderer': scan.renderer_for('.png'),
+        'generate_seconds': round(time.perf_counter() - generate_started, 3),
+    }
+    timer = StageTimer()
+
+    with timer.stage('walk') as counts:
+        entries = [entry for entry in scan.iter_icon_files(root) if entry.name != template_path.name]
+        for entry in entries:
+            entry.stat()
+        counts['items'] = len(entries)
+
+    with timer.stage('probe') as counts:
+        targets = []
+        for entry in entries:
+            path = Path(entry.path)
+            extension = path.suffix.lower()
+            if extension == '.svg':
+                width, height = scan.get_svg_d2lensions(path)
+            else:
+                width, height = scan.get_png_d2lensions(path)
+            targets.append((path, extension, width, height))
+        counts['items'] = len(targets)
+
+    with timer.stage('render') as counts:
+        rendered = []
+        for path, extension, width, height in targets:
+            temp_path = scan.publish_temp_path(path)
+            success, _ = scan.render_icon(template_path, temp_path, extension, width, height)
+            if success:
+                rendered.append((temp_path, path))
+                counts['bytes'] += temp_path.stat().st_size
+        counts['items'] = len(rendered)
+
+    with timer.stage('publish') as counts:
+        for temp_path, path in rendered:
+            scan.publish_file(temp_path, path)
+        scan.fsync_directories(path.parent for _, path in rendered)
+        counts['items'] = len(rendered)
+        counts['bytes'] = timer.stages['render']['bytes']
+
+    result['failed'] = len(targets) - len(rendered)
+    result['stages'] = timer.stages
+    return result
+
+def case_name(kind, size):
+    return f"data@{size:g}x" if kind == 'data' else f"icons@{size}"
+
+def run_case_subprocess(kind, size, workdir, verbose=False):
+    """Run one case in a fresh interpreter and return its result dict."""
+    result_path = Path(workdir) / 'result.json'
+    command = [sys.executable, str(Path(__file__).resolve()), 'case', kind, str(size),
+               '--workdir', str(workdir), '--result', str(result_path)]
+    output = None if verbose else subprocess.DEVNULL
+    completed = subprocess.run(command, stdout=output, stderr=None if verbose else subprocess.PIPE)
+    if completed.returncode != 0:
+        error = (completed.stderr or b'').decode('utf-8', 'replace').strip().splitlines()
+        raise RuntimeError(f"{case_name(kind, size)} failed: {error[-1] if error else completed.returncode}")
+    with open(result_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def best_of(runs):
+    """Merge repeated runs of a case, keeping each stage's fastest wall time and lowest peak RSS."""
+    best = runs[0]
+    for run in runs[1:]:
+        for stage, metrics in run['stages'].items():
+            kept = best['stages'][stage]
+            if metrics['wall_seconds'] < kept['wall_seconds']:
+                for key in ('wall_seconds', 'cpu_seconds', 'items_per_second', 'mb_per_second'):
+                    kept[key] = metrics[key]
+            kept['peak_rss_mb'] = min(kept['peak_rss_mb'], metrics['peak_rss_mb'])
+    best['repeat'] = len(runs)
+    return best
+
+def environment():
+    sys.path.insert(0, str(BACKEND_DIR))
+    import light_binary
+    import light_download
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'brotli': light_download.HAS_BROTLI,
+        'numpy': light_binary.HAS_NUMPY,
+        'peak_rss_per_stage': reset_peak_rss(),
+    }
+
+def run_benchmarks(scales, icon_counts, repeat=1, workdir=None, verbose=False):
+    results = {}
+    cases = [('data', scale) for scale in scales] + [('icons', count) for count in icon_counts]
+    for kind, size in cases:
+        name = case_name(kind, size)
+        runs = []
+        for attempt in range(repeat):
+            print(f"Running {name}" + (f" ({attempt + 1}/{repeat})" if repeat > 1 else "") + "...", flush=True)
+            with tempfile.TemporaryDirectory(prefix='d2l-bench-', dir=workdir) as case_dir:
+                runs.append(run_case_subprocess(kind, size, case_dir, verbose))
+        results[name] = best_of(runs)
+        print_case(name, results[name])
+    return {
+        'version': BASELINE_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': environment(),
+        'results': results,
+    }
+
+def print_case(name, result):
+    detail = (f"{result['input_bytes'] / 1024 / 1024:.1f} MB input" if result['kind'] == 'data'
+              else f"{result['count']} files, {result['renderer']} renderer")
+    print(f"\n{name} ({detail})")
+    print(f"  {'stage':<10} {'wall s':>9} {'cpu s':>9} {'peak MB':>9} {'items/s':>11} {'MB/s':>9}")
+    for stage, metrics in result['stages'].items():
+        items_per_second = f"{metrics['items_per_second']:.1f}" if metrics['items_per_second'] else '-'
+        mb_per_second = f"{metrics['mb_per_second']:.2f}" if metrics['mb_per_second'] and metrics['bytes'] else '-'
+        print(f"  {stage:<10} {metrics['wall_seconds']:9.3f} {metrics['cpu_seconds']:9.3f} "
+              f"{metrics['peak_rss_mb']:9.1f} {items_per_second:>11} {mb_per_second:>9}")
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, min_seconds=DEFAULT_MIN_SECONDS):
+    """Print per-stage changes from baseline to current; returns the list of regressions."""
+    regressions = []
+    for key in ('python', 'machine', 'cpu_count', 'brotli'):
+        if baseline['environment'].get(key) != current['environment'].get(key):
+            print(f"Note: {key} differs ({baseline['environment'].get(key)} -> {current['environment'].get(key)}); "
+                  f"timings may not be comparable")
+
+    for name, base in baseline['results'].items():
+        result = current['results'].get(name)
+        if result is None:
+            print(f"\n{name}: not in the current run")
+            continue
+        if base.get('renderer') != result.get('renderer'):
+            print(f"\n{name}: renderer changed ({base.get('renderer')} -> {result.get('renderer')}); skipping")
+            continue
+        print(f"\n{name}")
+        print(f"  {'stage':<10} {'wall s':>17} {'change':>8} {'peak MB':>17} {'change':>8}")
+        for stage, before in base['stages'].items():
+            after = result['stages'].get(stage)
+            if after is None:
+                continue
+            wall_change = after['wall_seconds'] / before['wall_seconds'] - 1 if before['wall_seconds'] else 0.0
+            rss_change = after['peak_rss_mb'] / before['peak_rss_mb'] - 1 if before['peak_rss_mb'] else 0.0
+            flags = []
+            if wall_change > threshold and max(before['wall_seconds'], after['wall_seconds']) >= min_seconds:
+                flags.append('slower')
+            if rss_change > threshold:
+                flags.append('more memory')
+            if flags:
+                regressions.append(f"{name} {stage}: {', '.join(flags)}")
+            print(f"  {stage:<10} {before['wall_seconds']:8.3f}>{after['wall_seconds']:<8.3f} {wall_change:+8.1%} "
+                  f"{before['peak_rss_mb']:8.1f}>{after['peak_rss_mb']:<8.1f} {rss_change:+8.1%}"
+                  + (f"  ✗ {', '.join(flags)}" if flags else ""))
+    return regressions
+
+def parse_list(value, cast):
+    return [cast(part) for part in value.split(',') if part.strip()] if value else []
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the roll appraiser data and icon pipelines offline.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="run the benchmarks and write a baseline")
+    run_parser.add_argument('--scales', default=DEFAULT_SCALES,
+                            help=f"data sizes as multiples of today's payload (default: {DEFAULT_SCALES}; '' to skip)")
+    run_parser.add_argument('--icons', default=DEFAULT_ICON_COUNTS,
+                            help=f"icon tree sizes in files (default: {DEFAULT_ICON_COUNTS}; '' to skip)")
+    run_parser.add_argument('-o', '--output', default=DEFAULT_BASELINE,
+                            help=f"where to write the results (default: {DEFAULT_BASELINE})")
+
+    compare_parser = commands.add_parser('compare', help="compare a run against a baseline")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current', nargs='?',
+                                help="results to compare; re-runs the baseline's cases when omitted")
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help=f"allowed slowdown / memory growth as a fraction (default: {DEFAULT_THRESHOLD})")
+    compare_parser.add_argument('--min-seconds', type=float, default=DEFAULT_MIN_SECONDS,
+                                help=f"ignore slowdowns of stages faster than this (default: {DEFAULT_MIN_SECONDS})")
+    compare_parser.add_argument('-o', '--output', default=None, help="also save the re-run results here")
+
+    for command_parser in (run_parser, compare_parser):
+        command_parser.add_argument('--repeat', type=int, default=1, metavar='N',
+                                    help="run each case N times and keep the best (default: 1)")
+        command_parser.add_argument('--workdir', default=None,
+                                    help="where to generate inputs (default: the system temp directory)")
+        command_parser.add_argument('--verbose', action='store_true', help="show the pipelines' own output")
+
+    # Internal: one case in this interpreter, called by run_case_subprocess()
+    case_parser = commands.add_parser('case')
+    case_parser.add_argument('kind', choices=['data', 'icons'])
+    case_parser.add_argument('size', type=float)
+    case_parser.add_argument('--workdir', required=True)
+    case_parser.add_argument('--result', required=True)
+
+    args = parser.parse_args()
+
+    if args.command == 'case':
+        workdir = Path(args.workdir)
+        result = run_data_case(args.size, workdir) if args.kind == 'data' else run_icon_case(int(args.size), workdir)
+        with open(args.result, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return
+
+    if args.command == 'run':
+        results = run_benchmarks(parse_list(args.scales, float), parse_list(args.icons, int),
+                                 args.repeat, args.workdir, args.verbose)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to: {args.output}")
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        scales = [result['scale'] for result in baseline['results'].values() if result['kind'] == 'data']
+        counts = [result['count'] for result in baseline['results'].values() if result['kind'] == 'icons']
+        current = run_benchmarks(scales, counts, args.repeat, args.workdir, args.verbose)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(current, f, indent=2)
+
+    print(f"\nComparing against {args.baseline} ({baseline['created_at']})")
+    regressions = compare(baseline, current, args.threshold, args.min_seconds)
+    if regressions:
+        print(f"\n✗ {len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\n✓ No regressions")
+
+if __name__ == "__main__":
+    main()